@@ -0,0 +1,67 @@
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+from database.normalization import (
+    build_datasets,
+    merge_dataset_frames,
+    normalize_datasets_frame,
+)
+from logging_utils.app_logger import AppLogger
+
+INITIAL_CSV = "data/datasets_publishers_themes.csv"
+ENRICHED_CSV = "data/enriched_datasets.csv"
+SYNTHETIC_ROWS = 200_000
+
+
+def write_synthetic_csvs(output_dir: Path, rows: int) -> tuple[str, str]:
+    """Repeat the bundled CSVs up to `rows` rows with unique dataset URIs."""
+    paths = []
+    for source in (INITIAL_CSV, ENRICHED_CSV):
+        df = pd.read_csv(source)
+        repeated = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).head(rows)
+        repeated["dataset"] = repeated["dataset"] + "/" + repeated.index.astype(str)
+        path = output_dir / Path(source).name
+        repeated.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths[0], paths[1]
+
+
+def load_normalized_frame(initial_csv: str, enriched_csv: str) -> pd.DataFrame:
+    return normalize_datasets_frame(
+        merge_dataset_frames(pd.read_csv(initial_csv), pd.read_csv(enriched_csv))
+    )
+
+
+def measure(normalized_df: pd.DataFrame, fast_validation: bool) -> float:
+    """Validated datasets per second for one build_datasets pass."""
+    start = time.perf_counter()
+    datasets = build_datasets(normalized_df, fast_validation=fast_validation)
+    return len(datasets) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logger = AppLogger()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        inputs = {
+            "bundled": (INITIAL_CSV, ENRICHED_CSV),
+            f"synthetic ({SYNTHETIC_ROWS} rows)": write_synthetic_csvs(
+                Path(tmp_dir), SYNTHETIC_ROWS
+            ),
+        }
+
+        results = {}
+        for name, paths in inputs.items():
+            normalized_df = load_normalized_frame(*paths)
+            results[name] = (
+                measure(normalized_df, False),
+                measure(normalized_df, True),
+            )
+
+    logger.info("VALIDATION THROUGHPUT (datasets/s)")
+    for name, (row_wise, fast) in results.items():
+        logger.info(
+            f"{name}: row by row {row_wise:,.0f}, "
+            f"whole frame {fast:,.0f} ({fast / row_wise:.1f}x)"
+        )
@@ -0,0 +1,405 @@
+import asyncio
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+from dotenv import load_dotenv
+from neo4j import (
+    AsyncDriver,
+    AsyncGraphDatabase,
+    AsyncManagedTransaction,
+    AsyncSession,
+    SummaryCounters,
+)
+from logging_utils.app_logger import AppLogger
+from database.models import Dataset
+from database.batch_queries import (
+    DATASET_RELATIONSHIP_STATEMENTS,
+    DEFAULT_BATCH_SIZE,
+    DISTRIBUTION_BATCH_STATEMENTS,
+    HUB_NODE_STATEMENTS,
+    THEME_LABEL_BATCH_STATEMENTS,
+    chunked,
+    collect_hub_values,
+    created_count,
+    dataset_to_row,
+    flatten_theme_labels,
+)
+from database.database_manager import (
+    DEFAULT_CONNECTION_ACQUISITION_TIMEOUT,
+    DEFAULT_DELETE_BATCH_SIZE,
+    DEFAULT_FETCH_SIZE,
+    DEFAULT_MAX_CONNECTION_POOL_SIZE,
+    DELETE_NODES,
+    DELETE_RELATIONSHIPS,
+    LIST_LABELS,
+    _empty_dataset_stats,
+    driver_settings_from_env,
+)
+from database.schema import (
+    AWAIT_INDEXES,
+    INDEX_WAIT_TIMEOUT_SECONDS,
+    LIST_INDEX_KEYS,
+    constraint_statement,
+    missing_schema_keys,
+    required_schema_keys,
+)
+
+DEFAULT_MAX_CONCURRENT_WRITES = 4
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _run_statements(
+    tx: AsyncManagedTransaction, statements: List[str], parameters: dict
+) -> List[SummaryCounters]:
+    counters = []
+    for query in statements:
+        result = await tx.run(query, parameters)
+        counters.append((await result.consume()).counters)
+    return counters
+
+
+@dataclass
+class AsyncDatabaseManager:
+    uri: str
+    username: str
+    password: str
+    max_concurrent_writes: int = DEFAULT_MAX_CONCURRENT_WRITES
+    database: Optional[str] = None
+    max_connection_pool_size: int = DEFAULT_MAX_CONNECTION_POOL_SIZE
+    connection_acquisition_timeout: float = DEFAULT_CONNECTION_ACQUISITION_TIMEOUT
+    fetch_size: int = DEFAULT_FETCH_SIZE
+    driver: AsyncDriver = field(init=False)
+    logger: AppLogger = field(default_factory=AppLogger)
+    _write_slots: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.username, self.password),
+            max_connection_pool_size=self.max_connection_pool_size,
+            connection_acquisition_timeout=self.connection_acquisition_timeout,
+        )
+        self._write_slots = asyncio.Semaphore(self.max_concurrent_writes)
+
+    async def verify_connectivity(self) -> bool:
+        try:
+            await self.driver.verify_authentication()
+            await self.driver.verify_connectivity()
+            self.logger.success(
+                f"Connected to Neo4j database at {self.uri} as {self.username} (async)"
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to connect to Neo4j database: {e}")
+            return False
+
+    async def close(self) -> None:
+        if self.driver is not None:
+            await self.driver.close()
+            self.logger.info("Neo4j database connection closed")
+
+    def session(self, **kwargs: Any) -> AsyncSession:
+        return self.driver.session(
+            database=self.database, fetch_size=self.fetch_size, **kwargs
+        )
+
+    async def write(
+        self, statements: List[str], parameters: dict
+    ) -> List[SummaryCounters]:
+        """
+        Run `statements` in one managed write transaction within the write limit and
+        return the result counters of each statement.
+        """
+        async with self._write_slots:
+            async with self.session() as session:
+                return await session.execute_write(
+                    _run_statements, statements, parameters
+                )
+
+    async def write_all(
+        self,
+        items: Iterable[T],
+        write: Callable[[T], Awaitable[R]],
+        handle: Callable[[T, Optional[R], Optional[Exception]], None],
+    ) -> None:
+        """
+        Call `write` on every item with at most max_concurrent_writes writes
+        pending. Items are fed through a queue of that size to as many worker
+        tasks, so they are taken from `items` only as writes finish, and each
+        outcome is passed to `handle` as (item, result, None) or (item, None, error).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrent_writes)
+        done = object()
+
+        async def worker() -> None:
+            while (item := await queue.get()) is not done:
+                try:
+                    result = await write(item)
+                except Exception as e:
+                    handle(item, None, e)
+                else:
+                    handle(item, result, None)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.max_concurrent_writes)
+        ]
+        try:
+            for item in items:
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(done)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def load_constraints(self) -> bool:
+        try:
+            constraints_file = Path("queries/neo4j_constraints.cypher")
+            if not constraints_file.exists():
+                self.logger.error(f"Constraints file not found: {constraints_file}")
+                return False
+
+            statements = [
+                stmt.strip()
+                for stmt in constraints_file.read_text().split(";")
+                if stmt.strip()
+            ]
+
+            async with self.session() as session:
+                for statement in statements:
+                    await (await session.run(statement)).consume()
+
+                required = required_schema_keys()
+                index_records = await (await session.run(LIST_INDEX_KEYS)).data()
+                for (label, properties), state in missing_schema_keys(
+                    required, index_records
+                ).items():
+                    if state == "missing":
+                        statement = constraint_statement(label, properties)
+                        await (await session.run(statement)).consume()
+                        self.logger.info(f"Created derived constraint: {statement}")
+
+                await (
+                    await session.run(AWAIT_INDEXES, timeout=INDEX_WAIT_TIMEOUT_SECONDS)
+                ).consume()
+                index_records = await (await session.run(LIST_INDEX_KEYS)).data()
+
+            missing = missing_schema_keys(required, index_records)
+            for (label, properties), state in missing.items():
+                self.logger.error(
+                    f"No online index for :{label}({', '.join(properties)}) "
+                    f"used as a loader key (state: {state})"
+                )
+            if missing:
+                return False
+
+            self.logger.success(
+                f"Neo4j constraints loaded successfully ({len(statements)} statements)"
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to load constraints: {e}")
+            return False
+
+    async def write_hub_nodes(
+        self, rows: List[dict], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        MERGE the distinct hub node keys of `rows`, `batch_size` values per
+        transaction like DatabaseManager._create_hub_nodes. Chunks of every label
+        run concurrently through write_all; the first failure is raised.
+        """
+        hub_values = collect_hub_values(rows)
+        created = {stat_key: 0 for stat_key, _, _ in HUB_NODE_STATEMENTS}
+        errors = []
+
+        async def write_chunk(chunk: tuple) -> List[SummaryCounters]:
+            _, query, values = chunk
+            return await self.write([query], {"values": values})
+
+        def handle(
+            chunk: tuple,
+            results: Optional[List[SummaryCounters]],
+            error: Optional[Exception],
+        ) -> None:
+            if error is not None:
+                errors.append(error)
+                return
+            created[chunk[0]] += results[0].nodes_created
+
+        chunks = (
+            (stat_key, query, values)
+            for stat_key, _, query in HUB_NODE_STATEMENTS
+            for values in chunked(hub_values[stat_key], batch_size)
+        )
+        await self.write_all(chunks, write_chunk, handle)
+        if errors:
+            raise errors[0]
+        return created
+
+    async def write_dataset_batch(self, rows: List[dict]) -> Dict[str, int]:
+        """
+        Write Dataset nodes and their relationships for one batch of rows. The hub
+        nodes the rows point to must already exist (see write_hub_nodes).
+        """
+        results = await self.write(
+            [query for _, query in DATASET_RELATIONSHIP_STATEMENTS], {"rows": rows}
+        )
+        return {
+            stat_key: created_count(stat_key, counters)
+            for (stat_key, _), counters in zip(DATASET_RELATIONSHIP_STATEMENTS, results)
+        }
+
+    async def create_dataset_nodes_and_relationships(
+        self, datasets: List[Dataset], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        stats = _empty_dataset_stats()
+        rows = [dataset_to_row(dataset) for dataset in datasets]
+
+        batch_count = 0
+
+        def handle(
+            batch: List[dict], counts: Optional[dict], error: Optional[Exception]
+        ) -> None:
+            nonlocal batch_count
+            batch_count += 1
+            if error is not None:
+                error_msg = (
+                    f"Failed to create nodes for batch starting at dataset "
+                    f"{batch[0]['uri']}: {error}"
+                )
+                self.logger.error(error_msg)
+                stats["errors"].append(error_msg)
+                return
+            for stat_key, count in counts.items():
+                stats[stat_key] += count
+
+        try:
+            stats.update(await self.write_hub_nodes(rows, batch_size))
+            await self.write_all(
+                chunked(rows, batch_size), self.write_dataset_batch, handle
+            )
+
+            self.logger.success(
+                f"Loaded {stats['datasets_created']} datasets with relationships "
+                f"({batch_count} batches, "
+                f"up to {self.max_concurrent_writes} concurrent)"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create dataset nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    async def create_theme_label_nodes_and_relationships(
+        self, theme_labels_map: Dict[str, Dict[str, str]]
+    ) -> dict:
+        stats = {
+            "theme_labels_created": 0,
+            "has_label_relationships": 0,
+            "errors": [],
+        }
+
+        rows = flatten_theme_labels(theme_labels_map)
+
+        try:
+            results = await self.write(
+                [query for _, query in THEME_LABEL_BATCH_STATEMENTS], {"rows": rows}
+            )
+            for (stat_key, _), counters in zip(THEME_LABEL_BATCH_STATEMENTS, results):
+                stats[stat_key] = created_count(stat_key, counters)
+            self.logger.success(
+                f"Created {stats['theme_labels_created']} theme labels with relationships"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create theme label nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    async def create_distribution_relationships(
+        self, rows: List[Dict[str, str]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        """
+        DatabaseManager.create_distribution_relationships_batched with the batches
+        written concurrently through write_all.
+        """
+        stats = {
+            "download_urls_created": 0,
+            "has_download_url_relationships": 0,
+            "errors": [],
+        }
+
+        async def write_batch(batch: List[dict]) -> List[SummaryCounters]:
+            return await self.write(
+                [query for _, query in DISTRIBUTION_BATCH_STATEMENTS], {"rows": batch}
+            )
+
+        def handle(
+            batch: List[dict],
+            results: Optional[List[SummaryCounters]],
+            error: Optional[Exception],
+        ) -> None:
+            if error is not None:
+                error_msg = (
+                    f"Failed to create distribution relationships for batch "
+                    f"starting at dataset {batch[0]['dataset_uri']}: {error}"
+                )
+                self.logger.error(error_msg)
+                stats["errors"].append(error_msg)
+                return
+            for (stat_key, _), counters in zip(DISTRIBUTION_BATCH_STATEMENTS, results):
+                stats[stat_key] += created_count(stat_key, counters)
+
+        await self.write_all(chunked(rows, batch_size), write_batch, handle)
+        self.logger.success(
+            f"Linked {len(rows)} distribution download URLs, created "
+            f"{stats['download_urls_created']} download URLs and "
+            f"{stats['has_download_url_relationships']} relationships"
+        )
+        return stats
+
+    async def clear_graph(self, batch_size: int = DEFAULT_DELETE_BATCH_SIZE) -> None:
+        try:
+            async with self.session() as session:
+                labels = [
+                    record["label"]
+                    for record in await (await session.run(LIST_LABELS)).data()
+                ]
+                for template in (DELETE_RELATIONSHIPS, DELETE_NODES):
+                    for label in labels + [None]:
+                        pattern = f"(n:`{label}`)" if label else "(n)"
+                        result = await session.run(
+                            template.format(pattern=pattern), batch_size=batch_size
+                        )
+                        await result.consume()
+            self.logger.success("Graph successfully cleared")
+        except Exception as e:
+            error_msg = f"Failed to clear nodes and relationships: {e}"
+            self.logger.error(error_msg)
+
+
+def load_async_db_config(
+    max_concurrent_writes: int = DEFAULT_MAX_CONCURRENT_WRITES,
+) -> AsyncDatabaseManager:
+    load_dotenv()
+
+    uri = os.getenv("NEO4J_URI", "neo4j://localhost")
+    username = os.getenv("NEO4J_USER", "neo4j")
+    password = os.getenv("NEO4J_PASSWORD", "password")
+
+    return AsyncDatabaseManager(
+        uri=uri,
+        username=username,
+        password=password,
+        max_concurrent_writes=max_concurrent_writes,
+        **driver_settings_from_env(),
+    )
@@ -0,0 +1,312 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, TypeVar
+from neo4j import SummaryCounters
+from database.models import Dataset
+
+T = TypeVar("T")
+
+DEFAULT_BATCH_SIZE = 1000
+
+# One UNWIND statement per entity/relationship type. Every statement receives the
+# same `$rows` parameter built by `dataset_to_row`, so a whole chunk of datasets is
+# written with a fixed number of round trips instead of several per dataset.
+DATASET_BATCH_STATEMENTS: List[tuple[str, str]] = [
+    (
+        "datasets_created",
+        "UNWIND $rows AS row "
+        "MERGE (d:Dataset {uri: row.uri}) "
+        "SET d.content_hash = row.content_hash",
+    ),
+    (
+        "titles_created",
+        "UNWIND $rows AS row MERGE (t:Title {value: row.title})",
+    ),
+    (
+        "has_title_relationships",
+        "UNWIND $rows AS row "
+        "MATCH (d:Dataset {uri: row.uri}) "
+        "MATCH (t:Title {value: row.title}) "
+        "MERGE (d)-[:HAS_TITLE]->(t)",
+    ),
+    (
+        "publishers_created",
+        "UNWIND $rows AS row MERGE (p:Publisher {uri: row.publisher})",
+    ),
+    (
+        "published_by_relationships",
+        "UNWIND $rows AS row "
+        "MATCH (d:Dataset {uri: row.uri}) "
+        "MATCH (p:Publisher {uri: row.publisher}) "
+        "MERGE (d)-[:PUBLISHED_BY]->(p)",
+    ),
+    (
+        "themes_created",
+        "UNWIND $rows AS row "
+        "UNWIND row.themes AS theme_uri "
+        "MERGE (t:Theme {uri: theme_uri})",
+    ),
+    (
+        "has_theme_relationships",
+        "UNWIND $rows AS row "
+        "MATCH (d:Dataset {uri: row.uri}) "
+        "UNWIND row.themes AS theme_uri "
+        "MATCH (t:Theme {uri: theme_uri}) "
+        "MERGE (d)-[:HAS_THEME]->(t)",
+    ),
+    (
+        "landing_pages_created",
+        "UNWIND $rows AS row "
+        "WITH row WHERE row.landing_page IS NOT NULL "
+        "MERGE (lp:LandingPage {url: row.landing_page})",
+    ),
+    (
+        "has_landing_page_relationships",
+        "UNWIND $rows AS row "
+        "WITH row WHERE row.landing_page IS NOT NULL "
+        "MATCH (d:Dataset {uri: row.uri}) "
+        "MATCH (lp:LandingPage {url: row.landing_page}) "
+        "MERGE (d)-[:HAS_LANDING_PAGE]->(lp)",
+    ),
+    (
+        "download_urls_created",
+        "UNWIND $rows AS row "
+        "WITH row WHERE row.download_url IS NOT NULL "
+        "MERGE (du:DownloadURL {url: row.download_url})",
+    ),
+    (
+        "has_download_url_relationships",
+        "UNWIND $rows AS row "
+        "WITH row WHERE row.download_url IS NOT NULL "
+        "MATCH (d:Dataset {uri: row.uri}) "
+        "MATCH (du:DownloadURL {url: row.download_url}) "
+        "MERGE (d)-[:HAS_DOWNLOAD_URL]->(du)",
+    ),
+]
+
+
+# Shared hub nodes, keyed by the loader stat they feed. The loaders plan these up
+# front: each distinct value of a load is merged once, and the dataset writes that
+# follow (DATASET_RELATIONSHIP_STATEMENTS) only MERGE Dataset nodes and MATCH hubs.
+HUB_NODE_STATEMENTS: List[tuple[str, str, str]] = [
+    (
+        "titles_created",
+        "title",
+        "UNWIND $values AS value MERGE (:Title {value: value})",
+    ),
+    (
+        "publishers_created",
+        "publisher",
+        "UNWIND $values AS value MERGE (:Publisher {uri: value})",
+    ),
+    ("themes_created", "themes", "UNWIND $values AS value MERGE (:Theme {uri: value})"),
+    (
+        "landing_pages_created",
+        "landing_page",
+        "UNWIND $values AS value MERGE (:LandingPage {url: value})",
+    ),
+    (
+        "download_urls_created",
+        "download_url",
+        "UNWIND $values AS value MERGE (:DownloadURL {url: value})",
+    ),
+]
+
+HUB_STAT_KEYS = {stat_key for stat_key, _, _ in HUB_NODE_STATEMENTS}
+
+DATASET_RELATIONSHIP_STATEMENTS: List[tuple[str, str]] = [
+    (stat_key, query)
+    for stat_key, query in DATASET_BATCH_STATEMENTS
+    if stat_key not in HUB_STAT_KEYS
+]
+
+
+# The same writes for a DatasetBatch, which passes its columns as parallel lists
+# instead of one map per row (see DatasetBatch.parameters). Publishers and themes
+# are dictionary encoded, so their hub nodes are merged once per distinct value.
+_EACH_DATASET = "UNWIND range(0, size($uris) - 1) AS i "
+
+COLUMNAR_DATASET_STATEMENTS: List[tuple[str, str]] = [
+    (
+        "datasets_created",
+        _EACH_DATASET + "MERGE (d:Dataset {uri: $uris[i]}) "
+        "SET d.content_hash = $content_hashes[i]",
+    ),
+    (
+        "titles_created",
+        "UNWIND $titles AS title MERGE (t:Title {value: title})",
+    ),
+    (
+        "has_title_relationships",
+        _EACH_DATASET + "MATCH (d:Dataset {uri: $uris[i]}) "
+        "MATCH (t:Title {value: $titles[i]}) "
+        "MERGE (d)-[:HAS_TITLE]->(t)",
+    ),
+    (
+        "publishers_created",
+        "UNWIND $publishers AS publisher MERGE (p:Publisher {uri: publisher})",
+    ),
+    (
+        "published_by_relationships",
+        _EACH_DATASET + "MATCH (d:Dataset {uri: $uris[i]}) "
+        "MATCH (p:Publisher {uri: $publishers[$publisher_ids[i]]}) "
+        "MERGE (d)-[:PUBLISHED_BY]->(p)",
+    ),
+    (
+        "themes_created",
+        "UNWIND $themes AS theme MERGE (t:Theme {uri: theme})",
+    ),
+    (
+        "has_theme_relationships",
+        _EACH_DATASET + "MATCH (d:Dataset {uri: $uris[i]}) "
+        "UNWIND range($theme_offsets[i], $theme_offsets[i + 1] - 1) AS j "
+        "MATCH (t:Theme {uri: $themes[$theme_ids[j]]}) "
+        "MERGE (d)-[:HAS_THEME]->(t)",
+    ),
+    (
+        "landing_pages_created",
+        "UNWIND $landing_pages AS url "
+        "WITH url WHERE url IS NOT NULL "
+        "MERGE (lp:LandingPage {url: url})",
+    ),
+    (
+        "has_landing_page_relationships",
+        _EACH_DATASET + "WITH i WHERE $landing_pages[i] IS NOT NULL "
+        "MATCH (d:Dataset {uri: $uris[i]}) "
+        "MATCH (lp:LandingPage {url: $landing_pages[i]}) "
+        "MERGE (d)-[:HAS_LANDING_PAGE]->(lp)",
+    ),
+    (
+        "download_urls_created",
+        "UNWIND $download_urls AS url "
+        "WITH url WHERE url IS NOT NULL "
+        "MERGE (du:DownloadURL {url: url})",
+    ),
+    (
+        "has_download_url_relationships",
+        _EACH_DATASET + "WITH i WHERE $download_urls[i] IS NOT NULL "
+        "MATCH (d:Dataset {uri: $uris[i]}) "
+        "MATCH (du:DownloadURL {url: $download_urls[i]}) "
+        "MERGE (d)-[:HAS_DOWNLOAD_URL]->(du)",
+    ),
+]
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    if size <= 0:
+        raise ValueError(f"Batch size must be positive, got {size}")
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+# The dataset_to_row keys that row_content_hash reads.
+HASHED_FIELDS = ["uri", "title", "publisher", "themes", "landing_page", "download_url"]
+
+
+def row_content_hash(row: Dict[str, Any]) -> str:
+    """Hash everything the loader writes for a dataset, ignoring theme order."""
+    content = {
+        "uri": row["uri"],
+        "title": row["title"],
+        "publisher": row["publisher"],
+        "themes": sorted(row["themes"]),
+        "landing_page": row["landing_page"],
+        "download_url": row["download_url"],
+    }
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def dataset_fields(dataset: Dataset) -> Dict[str, Any]:
+    return {
+        "uri": dataset.uri,
+        "title": dataset.title.value,
+        "publisher": dataset.publisher.uri,
+        "themes": [theme.uri for theme in dataset.themes],
+        "landing_page": dataset.landing_page.url if dataset.landing_page else None,
+        "download_url": dataset.download_url.url if dataset.download_url else None,
+    }
+
+
+def dataset_to_row(dataset: Dataset) -> Dict[str, Any]:
+    row = dataset_fields(dataset)
+    row["content_hash"] = row_content_hash(row)
+    return row
+
+
+def collect_hub_values(rows: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Collect the distinct hub node keys of `rows`, keyed like HUB_NODE_STATEMENTS."""
+    values: Dict[str, Dict[str, None]] = {
+        stat_key: {} for stat_key, _, _ in HUB_NODE_STATEMENTS
+    }
+    for row in rows:
+        for stat_key, field_name, _ in HUB_NODE_STATEMENTS:
+            value = row[field_name]
+            if isinstance(value, list):
+                values[stat_key].update(dict.fromkeys(value))
+            elif value is not None:
+                values[stat_key][value] = None
+    return {stat_key: list(keys) for stat_key, keys in values.items()}
+
+
+def created_count(stat_key: str, counters: SummaryCounters) -> int:
+    """What a statement really created, read from its result counters for a stat key."""
+    if stat_key.endswith("_relationships"):
+        return counters.relationships_created
+    return counters.nodes_created
+
+
+# Every distribution's download URL, from the rows of
+# normalization.distribution_download_urls. The dataset statements only link the
+# first distribution; these add the others for datasets already in the graph.
+DISTRIBUTION_BATCH_STATEMENTS: List[tuple[str, str]] = [
+    (
+        "download_urls_created",
+        "UNWIND $rows AS row "
+        "MATCH (:Dataset {uri: row.dataset_uri}) "
+        "MERGE (du:DownloadURL {url: row.download_url})",
+    ),
+    (
+        "has_download_url_relationships",
+        "UNWIND $rows AS row "
+        "MATCH (d:Dataset {uri: row.dataset_uri}) "
+        "MATCH (du:DownloadURL {url: row.download_url}) "
+        "MERGE (d)-[:HAS_DOWNLOAD_URL]->(du)",
+    ),
+]
+
+
+THEME_LABEL_BATCH_STATEMENTS: List[tuple[str, str]] = [
+    (
+        "theme_labels_created",
+        "UNWIND $rows AS row "
+        "MERGE (tl:ThemeLabel {title: row.title, language: row.language})",
+    ),
+    (
+        "has_label_relationships",
+        "UNWIND $rows AS row "
+        "MATCH (t:Theme {uri: row.theme_uri}) "
+        "MATCH (tl:ThemeLabel {title: row.title, language: row.language}) "
+        "MERGE (t)-[:HAS_LABEL]->(tl)",
+    ),
+]
+
+
+def flatten_theme_labels(
+    theme_labels_map: Dict[str, Dict[str, str]],
+) -> List[Dict[str, str]]:
+    """Flatten theme -> {language: label} into one row per non-blank label."""
+    rows = []
+    for theme_uri, labels in theme_labels_map.items():
+        for language, label_text in labels.items():
+            if not label_text or not label_text.strip():
+                continue
+            rows.append(
+                {
+                    "theme_uri": theme_uri,
+                    "title": label_text.strip(),
+                    "language": language,
+                }
+            )
+    return rows
@@ -0,0 +1,200 @@
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from database.batch_queries import dataset_to_row
+from database.interning import InternRegistry
+from database.models import Dataset
+from logging_utils.app_logger import AppLogger
+
+BULK_IMPORT_DIR = Path("neo4j/import")
+# Where BULK_IMPORT_DIR is mounted inside the container (see docker-compose.yml).
+CONTAINER_IMPORT_DIR = "/import"
+
+NODE_HEADERS: Dict[str, List[str]] = {
+    "Dataset": ["uri:ID(Dataset)", "content_hash"],
+    "Title": ["value:ID(Title)"],
+    "Publisher": [":ID(Publisher)", "uri"],
+    "Theme": [":ID(Theme)", "uri"],
+    "LandingPage": ["url:ID(LandingPage)"],
+    "DownloadURL": ["url:ID(DownloadURL)"],
+    "ThemeLabel": [":ID(ThemeLabel)", "title", "language"],
+}
+
+NODE_FILE_STEMS: Dict[str, str] = {
+    "Dataset": "datasets",
+    "Title": "titles",
+    "Publisher": "publishers",
+    "Theme": "themes",
+    "LandingPage": "landing_pages",
+    "DownloadURL": "download_urls",
+    "ThemeLabel": "theme_labels",
+}
+
+RELATIONSHIP_HEADERS: Dict[str, List[str]] = {
+    "HAS_TITLE": [":START_ID(Dataset)", ":END_ID(Title)"],
+    "PUBLISHED_BY": [":START_ID(Dataset)", ":END_ID(Publisher)"],
+    "HAS_THEME": [":START_ID(Dataset)", ":END_ID(Theme)"],
+    "HAS_LANDING_PAGE": [":START_ID(Dataset)", ":END_ID(LandingPage)"],
+    "HAS_DOWNLOAD_URL": [":START_ID(Dataset)", ":END_ID(DownloadURL)"],
+    "HAS_LABEL": [":START_ID(Theme)", ":END_ID(ThemeLabel)"],
+}
+
+
+@dataclass
+class BulkImportTables:
+    """Deduplicated node and relationship rows keyed by label / relationship type."""
+
+    nodes: Dict[str, Dict[tuple, None]] = field(
+        default_factory=lambda: {label: {} for label in NODE_HEADERS}
+    )
+    relationships: Dict[str, Dict[tuple, None]] = field(
+        default_factory=lambda: {rel_type: {} for rel_type in RELATIONSHIP_HEADERS}
+    )
+
+    def add_node(self, label: str, *values: str) -> None:
+        self.nodes[label][values] = None
+
+    def add_relationship(self, rel_type: str, start_id: str, end_id: str) -> None:
+        self.relationships[rel_type][(start_id, end_id)] = None
+
+
+def build_bulk_import_tables(
+    datasets: List[Dataset],
+    theme_labels_map: Dict[str, Dict[str, str]],
+    distribution_rows: Iterable[Dict[str, str]] = (),
+    registry: Optional[InternRegistry] = None,
+) -> BulkImportTables:
+    """
+    Publishers and themes are identified by their InternRegistry IDs, so the
+    relationship files repeat small integers instead of URIs.
+    """
+    tables = BulkImportTables()
+    registry = registry if registry is not None else InternRegistry()
+
+    # A repeated uri would give two rows the same Dataset ID, which neo4j-admin
+    # rejects; the last row wins, as it does for the Cypher writers.
+    for dataset in {dataset.uri: dataset for dataset in datasets}.values():
+        registry.intern_dataset(dataset)
+        tables.add_node("Dataset", dataset.uri, dataset_to_row(dataset)["content_hash"])
+
+        tables.add_node("Title", dataset.title.value)
+        tables.add_relationship("HAS_TITLE", dataset.uri, dataset.title.value)
+
+        publisher_id = str(registry.publisher_id(dataset.publisher.uri))
+        tables.add_node("Publisher", publisher_id, dataset.publisher.uri)
+        tables.add_relationship("PUBLISHED_BY", dataset.uri, publisher_id)
+
+        for theme in dataset.themes:
+            theme_id = str(registry.theme_id(theme.uri))
+            tables.add_node("Theme", theme_id, theme.uri)
+            tables.add_relationship("HAS_THEME", dataset.uri, theme_id)
+
+        if dataset.landing_page:
+            tables.add_node("LandingPage", dataset.landing_page.url)
+            tables.add_relationship(
+                "HAS_LANDING_PAGE", dataset.uri, dataset.landing_page.url
+            )
+
+        if dataset.download_url:
+            tables.add_node("DownloadURL", dataset.download_url.url)
+            tables.add_relationship(
+                "HAS_DOWNLOAD_URL", dataset.uri, dataset.download_url.url
+            )
+
+    # The download URLs of the other distributions (see
+    # normalization.distribution_download_urls), for datasets that were exported.
+    for row in distribution_rows:
+        if (row["dataset_uri"],) not in tables.nodes["Dataset"]:
+            continue
+        tables.add_node("DownloadURL", row["download_url"])
+        tables.add_relationship(
+            "HAS_DOWNLOAD_URL", row["dataset_uri"], row["download_url"]
+        )
+
+    # HAS_LABEL needs a Theme node, so labels of themes no dataset uses are skipped.
+    theme_ids = {uri: theme_id for theme_id, uri in tables.nodes["Theme"]}
+    label_ids: Dict[tuple, str] = {}
+    for theme_uri, labels in theme_labels_map.items():
+        if theme_uri not in theme_ids:
+            continue
+        for language, label_text in labels.items():
+            if not label_text or not label_text.strip():
+                continue
+            key = (label_text.strip(), language)
+            label_id = label_ids.setdefault(key, f"label-{len(label_ids)}")
+            tables.add_node("ThemeLabel", label_id, *key)
+            tables.add_relationship("HAS_LABEL", theme_ids[theme_uri], label_id)
+
+    return tables
+
+
+def _write_csv(path: Path, rows) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerows(rows)
+
+
+def build_import_command(tables: BulkImportTables, database: str = "neo4j") -> str:
+    args = ["neo4j-admin database import full", "--multiline-fields=true"]
+    for label in tables.nodes:
+        stem = NODE_FILE_STEMS[label]
+        args.append(
+            f"--nodes={label}={CONTAINER_IMPORT_DIR}/{stem}_header.csv,"
+            f"{CONTAINER_IMPORT_DIR}/{stem}.csv"
+        )
+    for rel_type in tables.relationships:
+        stem = rel_type.lower()
+        args.append(
+            f"--relationships={rel_type}={CONTAINER_IMPORT_DIR}/{stem}_header.csv,"
+            f"{CONTAINER_IMPORT_DIR}/{stem}.csv"
+        )
+    args.append("--overwrite-destination")
+    args.append(database)
+    return " \\\n    ".join(args)
+
+
+def export_bulk_import_files(
+    datasets: List[Dataset],
+    theme_labels_map: Dict[str, Dict[str, str]],
+    output_dir: Path = BULK_IMPORT_DIR,
+    distribution_rows: Iterable[Dict[str, str]] = (),
+    registry: Optional[InternRegistry] = None,
+) -> dict:
+    logger = AppLogger()
+    stats = {"nodes": {}, "relationships": {}, "command": "", "errors": []}
+
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tables = build_bulk_import_tables(
+            datasets, theme_labels_map, distribution_rows, registry
+        )
+
+        for label, rows in tables.nodes.items():
+            stem = NODE_FILE_STEMS[label]
+            _write_csv(output_dir / f"{stem}_header.csv", [NODE_HEADERS[label]])
+            _write_csv(output_dir / f"{stem}.csv", rows)
+            stats["nodes"][label] = len(rows)
+
+        for rel_type, rows in tables.relationships.items():
+            stem = rel_type.lower()
+            _write_csv(
+                output_dir / f"{stem}_header.csv", [RELATIONSHIP_HEADERS[rel_type]]
+            )
+            _write_csv(output_dir / f"{stem}.csv", rows)
+            stats["relationships"][rel_type] = len(rows)
+
+        stats["command"] = build_import_command(tables)
+        (output_dir / "import_command.sh").write_text(stats["command"] + "\n")
+
+        logger.success(
+            f"Exported {sum(stats['nodes'].values())} nodes and "
+            f"{sum(stats['relationships'].values())} relationships to {output_dir}"
+        )
+        return stats
+
+    except Exception as e:
+        error_msg = f"Failed to export bulk import files: {e}"
+        logger.error(error_msg)
+        stats["errors"].append(error_msg)
+        return stats
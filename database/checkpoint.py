@@ -0,0 +1,84 @@
+import os
+from typing import IO, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are not locked against each other
+    fcntl = None
+
+
+class EnrichmentCheckpoint:
+    """
+    Sidecar file with one line per dataset written to the enrichment outputs: the
+    dataset URI and the size of every output right after its row(s). Resuming
+    truncates the outputs to the last recorded sizes, which drops anything a
+    crash left half written, and reports the recorded URIs as completed. The
+    sidecar stays locked while open, so two runs cannot append to the same
+    outputs.
+    """
+
+    def __init__(self, output_paths: List[str], path: Optional[str] = None):
+        self.output_paths = output_paths
+        self.path = path or f"{output_paths[0]}.checkpoint"
+        self.completed: Set[str] = set()
+        self._file = None
+
+    def __enter__(self) -> "EnrichmentCheckpoint":
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._file.close()
+                raise RuntimeError(f"Another enrichment run is using {self.path}")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._file.close()
+
+    def resume(self) -> bool:
+        """
+        Load the completed datasets and truncate the outputs to match. Returns
+        False, with the sidecar emptied, if there is nothing to resume from.
+        """
+        self._file.seek(0)
+        completed, sizes, end = set(), None, 0
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break
+            dataset_uri, _, recorded = (
+                line.decode("utf-8").rstrip("\n").rpartition("\t")
+            )
+            completed.add(dataset_uri)
+            sizes = [int(size) for size in recorded.split(",")]
+            end += len(line)
+
+        if sizes is None or not all(
+            os.path.exists(path) and os.path.getsize(path) >= size
+            for path, size in zip(self.output_paths, sizes)
+        ):
+            self.reset()
+            return False
+
+        for path, size in zip(self.output_paths, sizes):
+            os.truncate(path, size)
+        self._file.truncate(end)
+        self.completed = completed
+        return True
+
+    def reset(self) -> None:
+        self._file.truncate(0)
+        self.completed = set()
+
+    def record(self, dataset_uri: str, outputs: List[IO]) -> None:
+        """Call once the rows of `dataset_uri` are written to `outputs`."""
+        for output in outputs:
+            output.flush()
+        sizes = ",".join(str(output.tell()) for output in outputs)
+        self._file.write(f"{dataset_uri}\t{sizes}\n".encode("utf-8"))
+        self._file.flush()
+
+    def remove(self) -> None:
+        """Delete the sidecar once a run finished, so the next run starts afresh."""
+        self._file.close()
+        os.remove(self.path)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+import pandas as pd
+import pyarrow as pa
+from logging_utils.app_logger import AppLogger
+
+CACHE_DIR = Path("data/.cache")
+HASH_CHUNK_SIZE = 1 << 20
+
+_SOURCES_KEY = b"sources"
+_MISSING_KEY = b"missing"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for chunk in iter(lambda: infile.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: Path) -> Dict[str, object]:
+    stat = path.stat()
+    return {
+        "path": str(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+    }
+
+
+def is_current(fingerprint: Dict[str, object]) -> bool:
+    """mtime and size decide quickly; a touched but unchanged file is hashed."""
+    path = Path(fingerprint["path"])
+    if not path.exists():
+        return False
+    stat = path.stat()
+    if stat.st_size != fingerprint["size"]:
+        return False
+    if stat.st_mtime_ns == fingerprint["mtime_ns"]:
+        return True
+    return file_sha256(path) == fingerprint["sha256"]
+
+
+def _column_to_arrow(values: pd.Series) -> tuple[pa.Array, str]:
+    """
+    Convert an object column whose present values all share one Python type. The
+    returned marker records whether missing values were None or NaN, since model
+    validation reports the two differently.
+    """
+    missing = pd.isna(values)
+    missing_types = set(map(type, values[missing]))
+    if len(missing_types) > 1 or missing_types - {float, type(None)}:
+        raise ValueError(f"Column {values.name} mixes kinds of missing values")
+    present_types = set(map(type, values[~missing]))
+    if len(present_types) > 1:
+        raise ValueError(
+            f"Column {values.name} mixes {sorted(t.__name__ for t in present_types)}"
+        )
+    marker = "nan" if float in missing_types else "none"
+    return pa.array(values.where(~missing, None).tolist()), marker
+
+
+def frame_to_table(frame: pd.DataFrame) -> pa.Table:
+    if not frame.index.equals(pd.RangeIndex(len(frame))):
+        raise ValueError("Only frames with a default index can be cached")
+
+    arrays, missing = [], {}
+    for column in frame.columns:
+        array, missing[column] = _column_to_arrow(frame[column].astype(object))
+        arrays.append(array)
+    return pa.Table.from_arrays(
+        arrays,
+        names=list(frame.columns),
+        metadata={_MISSING_KEY: json.dumps(missing)},
+    )
+
+
+def table_to_frame(table: pa.Table) -> pd.DataFrame:
+    missing = json.loads(table.schema.metadata[_MISSING_KEY])
+    columns = {}
+    for name in table.column_names:
+        values = pd.Series(table.column(name).to_pylist(), dtype=object)
+        if missing[name] == "nan":
+            values = values.where(values.notna(), float("nan"))
+        columns[name] = values
+    return pd.DataFrame(columns, columns=table.column_names)
+
+
+def read_cached_frame(cache_path: Path) -> pd.DataFrame | None:
+    """Memory-map a cache file; None if it is missing or any source changed."""
+    if not cache_path.exists():
+        return None
+    with pa.memory_map(str(cache_path)) as source:
+        reader = pa.ipc.open_file(source)
+        sources = json.loads(reader.schema.metadata[_SOURCES_KEY])
+        if not all(is_current(fingerprint) for fingerprint in sources):
+            return None
+        return table_to_frame(reader.read_all())
+
+
+def write_cached_table(
+    cache_path: Path, table: pa.Table, sources: Sequence[Dict[str, object]]
+) -> None:
+    """Write `table` with the fingerprints of the sources it was built from."""
+    metadata = dict(table.schema.metadata or {})
+    metadata[_SOURCES_KEY] = json.dumps(list(sources))
+    table = table.replace_schema_metadata(metadata)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = cache_path.with_suffix(".partial")
+    with pa.OSFile(str(partial_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    partial_path.replace(cache_path)
+
+
+def cached_frame(
+    name: str,
+    source_paths: List[str],
+    build: Callable[[], pd.DataFrame],
+    cache_dir: Path = CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    Return the frame `build` makes from `source_paths`, stored as an Arrow IPC file
+    in `cache_dir`. The file records the size, mtime and SHA-256 of every source,
+    so a changed source rebuilds it; otherwise it is memory-mapped and no CSV is
+    parsed. Each list of sources gets its own file. A frame that cannot be stored
+    losslessly is returned uncached.
+    """
+    logger = AppLogger()
+    key = hashlib.sha256("\n".join(map(str, source_paths)).encode()).hexdigest()
+    cache_path = cache_dir / f"{name}-{key[:16]}.arrow"
+
+    try:
+        frame = read_cached_frame(cache_path)
+        if frame is not None:
+            logger.info(f"Loaded {len(frame)} {name} rows from cache {cache_path}")
+            return frame
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache {cache_path}: {e}")
+
+    # Fingerprint before building, so a source edited meanwhile invalidates it.
+    sources = [source_fingerprint(Path(path)) for path in source_paths]
+    frame = build()
+
+    try:
+        write_cached_table(cache_path, frame_to_table(frame), sources)
+        logger.info(f"Cached {len(frame)} {name} rows in {cache_path}")
+    except Exception as e:
+        logger.warning(f"Could not cache {name} rows: {e}")
+
+    return frame
@@ -1,25 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 import os
+import random
+import time
 from dotenv import load_dotenv
-from neo4j import GraphDatabase, Neo4jDriver
+from neo4j import GraphDatabase, ManagedTransaction, Neo4jDriver, Session
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 from logging_utils.app_logger import AppLogger
 from database.models import Dataset, ThemeLabel
-from typing import List, Dict
+from database.batch_queries import (
+    COLUMNAR_DATASET_STATEMENTS,
+    DATASET_RELATIONSHIP_STATEMENTS,
+    DEFAULT_BATCH_SIZE,
+    DISTRIBUTION_BATCH_STATEMENTS,
+    HUB_NODE_STATEMENTS,
+    THEME_LABEL_BATCH_STATEMENTS,
+    chunked,
+    collect_hub_values,
+    created_count,
+    dataset_fields,
+    dataset_to_row,
+    flatten_theme_labels,
+)
+from typing import Any, Callable, Iterable, List, Dict, Optional
+from database.dataset_batch import DatasetBatch
+from database.delta_sync import (
+    DELETE_DATASETS,
+    DELETE_ORPHANED_HUB_NODES,
+    DELETE_STALE_RELATIONSHIPS,
+    FETCH_DATASET_HASHES,
+    plan_delta,
+)
+from database.load_csv import (
+    DEFAULT_ROWS_PER_TRANSACTION,
+    build_load_csv_statements,
+    stage_csv_files,
+    theme_label_languages,
+)
+from database.schema import (
+    AWAIT_INDEXES,
+    INDEX_WAIT_TIMEOUT_SECONDS,
+    LIST_INDEX_KEYS,
+    constraint_statement,
+    missing_schema_keys,
+    required_schema_keys,
+)
 from pathlib import Path
 
+DEFAULT_MAX_CONNECTION_POOL_SIZE = 100
+DEFAULT_CONNECTION_ACQUISITION_TIMEOUT = 60.0
+DEFAULT_FETCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.2
+DEADLOCK_ERROR_CODE = "Neo.TransientError.Transaction.DeadlockDetected"
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+DEFAULT_DELETE_BATCH_SIZE = 10000
+
+LIST_LABELS = "CALL db.labels() YIELD label RETURN label"
+LIST_CONSTRAINTS = "SHOW CONSTRAINTS YIELD name RETURN name"
+# Token lookup indexes back label scans and are not part of queries/*.cypher
+LIST_INDEXES = (
+    "SHOW INDEXES YIELD name, type, owningConstraint "
+    "WHERE type <> 'LOOKUP' AND owningConstraint IS NULL RETURN name"
+)
+DELETE_RELATIONSHIPS = (
+    "MATCH {pattern}-[r]->() "
+    "CALL {{ WITH r DELETE r }} IN TRANSACTIONS OF $batch_size ROWS"
+)
+DELETE_NODES = (
+    "MATCH {pattern} "
+    "CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF $batch_size ROWS"
+)
+
 
 @dataclass
 class DatabaseManager:
     uri: str
     username: str
     password: str
+    database: Optional[str] = None
+    max_connection_pool_size: int = DEFAULT_MAX_CONNECTION_POOL_SIZE
+    connection_acquisition_timeout: float = DEFAULT_CONNECTION_ACQUISITION_TIMEOUT
+    fetch_size: int = DEFAULT_FETCH_SIZE
     driver: Neo4jDriver = field(init=False)
     logger: AppLogger = field(default_factory=AppLogger)
 
     def __post_init__(self) -> None:
         try:
             self.driver = GraphDatabase.driver(
-                self.uri, auth=(self.username, self.password)
+                self.uri,
+                auth=(self.username, self.password),
+                max_connection_pool_size=self.max_connection_pool_size,
+                connection_acquisition_timeout=self.connection_acquisition_timeout,
             )
             self.driver.verify_authentication()
             self.driver.verify_connectivity()
@@ -34,6 +107,11 @@ class DatabaseManager:
             self.driver.close()
             self.logger.info("Neo4j database connection closed")
 
+    def session(self, **kwargs: Any) -> Session:
+        return self.driver.session(
+            database=self.database, fetch_size=self.fetch_size, **kwargs
+        )
+
     def load_constraints(self) -> bool:
         try:
             constraints_file = Path("queries/neo4j_constraints.cypher")
@@ -47,7 +125,7 @@ class DatabaseManager:
                 stmt.strip() for stmt in constraints_content.split(";") if stmt.strip()
             ]
 
-            with self.driver.session() as session:
+            with self.session() as session:
                 for statement in statements:
                     try:
                         session.run(statement)
@@ -59,134 +137,229 @@ class DatabaseManager:
                 self.logger.success(
                     f"Neo4j constraints loaded successfully ({len(statements)} statements)"
                 )
-                return True
+
+            return self.ensure_schema()
         except Exception as e:
             self.logger.error(f"Failed to load constraints: {e}")
             return False
 
+    def ensure_schema(self, timeout: int = INDEX_WAIT_TIMEOUT_SECONDS) -> bool:
+        try:
+            required = required_schema_keys()
+
+            with self.session() as session:
+                missing = missing_schema_keys(
+                    required, session.run(LIST_INDEX_KEYS).data()
+                )
+                for (label, properties), state in missing.items():
+                    if state != "missing":
+                        continue
+                    statement = constraint_statement(label, properties)
+                    session.run(statement).consume()
+                    self.logger.info(f"Created derived constraint: {statement}")
+
+                self.logger.info(f"Waiting up to {timeout}s for indexes to come online")
+                session.run(AWAIT_INDEXES, timeout=timeout).consume()
+
+            return self.verify_schema()
+        except Exception as e:
+            self.logger.error(f"Failed to ensure schema: {e}")
+            return False
+
+    def verify_schema(self) -> bool:
+        try:
+            required = required_schema_keys()
+
+            with self.session() as session:
+                missing = missing_schema_keys(
+                    required, session.run(LIST_INDEX_KEYS).data()
+                )
+
+            for (label, properties), state in missing.items():
+                self.logger.error(
+                    f"No online index for :{label}({', '.join(properties)}) "
+                    f"used as a loader key (state: {state})"
+                )
+
+            if not missing:
+                self.logger.success(
+                    f"All {len(required)} loader MERGE/MATCH keys are backed by online indexes"
+                )
+            return not missing
+        except Exception as e:
+            self.logger.error(f"Failed to verify schema: {e}")
+            return False
+
     def create_dataset_nodes_and_relationships(self, datasets: List[Dataset]) -> dict:
-        stats = {
-            "datasets_created": 0,
-            "titles_created": 0,
-            "publishers_created": 0,
-            "themes_created": 0,
-            "landing_pages_created": 0,
-            "download_urls_created": 0,
-            "has_title_relationships": 0,
-            "published_by_relationships": 0,
-            "has_theme_relationships": 0,
-            "has_landing_page_relationships": 0,
-            "has_download_url_relationships": 0,
-            "errors": [],
-        }
+        stats = _empty_dataset_stats()
 
         try:
-            with self.driver.session() as session:
+            with self.session() as session:
+                stats.update(
+                    self._create_hub_nodes(session, map(dataset_fields, datasets))
+                )
+
                 for dataset in datasets:
                     try:
-                        session.run(
-                            "MERGE (d:Dataset {uri: $uri})",
-                            {"uri": dataset.uri},
-                        )
-                        stats["datasets_created"] += 1
+                        counts = session.execute_write(_write_dataset, dataset)
+                        for stat_key, count in counts.items():
+                            stats[stat_key] += count
 
-                        session.run(
-                            "MERGE (t:Title {value: $value})",
-                            {"value": dataset.title.value},
+                    except Exception as e:
+                        error_msg = (
+                            f"Failed to create nodes for dataset {dataset.uri}: {e}"
                         )
-                        stats["titles_created"] += 1
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
 
-                        session.run(
-                            "MATCH (d:Dataset {uri: $dataset_uri}) "
-                            "MATCH (t:Title {value: $title_value}) "
-                            "MERGE (d)-[:HAS_TITLE]->(t)",
-                            {
-                                "dataset_uri": dataset.uri,
-                                "title_value": dataset.title.value,
-                            },
+            self.logger.success(
+                f"Loaded {stats['datasets_created']} datasets with relationships"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create dataset nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    def create_dataset_nodes_and_relationships_batched(
+        self, datasets: List[Dataset], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        stats = _empty_dataset_stats()
+        written = 0
+
+        try:
+            with self.session() as session:
+                stats.update(
+                    self._create_hub_nodes(
+                        session, map(dataset_fields, datasets), batch_size
+                    )
+                )
+
+                for batch in chunked(datasets, batch_size):
+                    rows = [dataset_to_row(dataset) for dataset in batch]
+                    try:
+                        counts = session.execute_write(
+                            _run_statements, DATASET_RELATIONSHIP_STATEMENTS, rows
                         )
-                        stats["has_title_relationships"] += 1
 
-                        session.run(
-                            "MERGE (p:Publisher {uri: $uri})",
-                            {"uri": dataset.publisher.uri},
+                        for stat_key, count in counts.items():
+                            stats[stat_key] += count
+                        written += len(rows)
+                        self.logger.debug(
+                            f"Committed batch of {len(rows)} datasets "
+                            f"({written}/{len(datasets)})"
                         )
-                        stats["publishers_created"] += 1
 
-                        session.run(
-                            "MATCH (d:Dataset {uri: $dataset_uri}) "
-                            "MATCH (p:Publisher {uri: $publisher_uri}) "
-                            "MERGE (d)-[:PUBLISHED_BY]->(p)",
-                            {
-                                "dataset_uri": dataset.uri,
-                                "publisher_uri": dataset.publisher.uri,
-                            },
+                    except Exception as e:
+                        error_msg = (
+                            f"Failed to create nodes for batch starting at dataset "
+                            f"{batch[0].uri}: {e}"
                         )
-                        stats["published_by_relationships"] += 1
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
 
-                        for theme in dataset.themes:
-                            session.run(
-                                "MERGE (t:Theme {uri: $uri})",
-                                {"uri": theme.uri},
-                            )
-                            stats["themes_created"] += 1
+            self.logger.success(
+                f"Loaded {stats['datasets_created']} datasets with relationships "
+                f"in batches of {batch_size}"
+            )
+            return stats
 
-                            session.run(
-                                "MATCH (d:Dataset {uri: $dataset_uri}) "
-                                "MATCH (t:Theme {uri: $theme_uri}) "
-                                "MERGE (d)-[:HAS_THEME]->(t)",
-                                {
-                                    "dataset_uri": dataset.uri,
-                                    "theme_uri": theme.uri,
-                                },
-                            )
-                            stats["has_theme_relationships"] += 1
+        except Exception as e:
+            error_msg = f"Failed to create dataset nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
 
-                        if dataset.landing_page:
-                            session.run(
-                                "MERGE (lp:LandingPage {url: $url})",
-                                {"url": dataset.landing_page.url},
-                            )
-                            stats["landing_pages_created"] += 1
+    def create_dataset_nodes_and_relationships_streamed(
+        self, batches: Iterable[DatasetBatch]
+    ) -> dict:
+        """
+        Write batches as they are produced (see database.streaming), so that only
+        one batch of datasets is held in memory at a time. Each batch is sent as
+        column parameters rather than one map per dataset.
+        """
+        stats = _empty_dataset_stats()
+        batch_count = 0
 
-                            session.run(
-                                "MATCH (d:Dataset {uri: $dataset_uri}) "
-                                "MATCH (lp:LandingPage {url: $landing_page_url}) "
-                                "MERGE (d)-[:HAS_LANDING_PAGE]->(lp)",
-                                {
-                                    "dataset_uri": dataset.uri,
-                                    "landing_page_url": dataset.landing_page.url,
-                                },
-                            )
-                            stats["has_landing_page_relationships"] += 1
+        try:
+            with self.session() as session:
+                for batch in batches:
+                    if not len(batch):
+                        continue
+                    batch_count += 1
+                    try:
+                        counts = session.execute_write(_write_dataset_batch, batch)
 
-                        if dataset.download_url:
-                            session.run(
-                                "MERGE (du:DownloadURL {url: $url})",
-                                {"url": dataset.download_url.url},
-                            )
-                            stats["download_urls_created"] += 1
+                        for stat_key, count in counts.items():
+                            stats[stat_key] += count
+                        self.logger.debug(
+                            f"Committed streamed batch of {len(batch)} datasets "
+                            f"({stats['datasets_created']} created so far)"
+                        )
 
-                            session.run(
-                                "MATCH (d:Dataset {uri: $dataset_uri}) "
-                                "MATCH (du:DownloadURL {url: $download_url}) "
-                                "MERGE (d)-[:HAS_DOWNLOAD_URL]->(du)",
-                                {
-                                    "dataset_uri": dataset.uri,
-                                    "download_url": dataset.download_url.url,
-                                },
-                            )
-                            stats["has_download_url_relationships"] += 1
+                    except Exception as e:
+                        error_msg = (
+                            f"Failed to create nodes for batch starting at dataset "
+                            f"{batch.uris[0]}: {e}"
+                        )
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
 
+            self.logger.success(
+                f"Loaded {stats['datasets_created']} datasets with relationships "
+                f"from {batch_count} streamed batches"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create dataset nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    def create_dataset_nodes_and_relationships_parallel(
+        self,
+        datasets: List[Dataset],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> dict:
+        _check_max_retries(max_retries)
+        stats = _empty_dataset_stats()
+        rows = [dataset_to_row(dataset) for dataset in datasets]
+
+        try:
+            with self.session() as session:
+                stats.update(
+                    self._create_hub_nodes(session, rows, batch_size, max_retries)
+                )
+
+            partitions = list(chunked(rows, batch_size))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._write_partition, partition, max_retries): (
+                        partition
+                    )
+                    for partition in partitions
+                }
+                for future in as_completed(futures):
+                    partition = futures[future]
+                    try:
+                        for stat_key, count in future.result().items():
+                            stats[stat_key] += count
                     except Exception as e:
                         error_msg = (
-                            f"Failed to create nodes for dataset {dataset.uri}: {e}"
+                            f"Failed to create nodes for partition starting at dataset "
+                            f"{partition[0]['uri']}: {e}"
                         )
                         self.logger.error(error_msg)
                         stats["errors"].append(error_msg)
 
             self.logger.success(
-                f"Loaded {stats['datasets_created']} datasets with relationships"
+                f"Loaded {stats['datasets_created']} datasets with relationships "
+                f"using {workers} workers over {len(partitions)} partitions"
             )
             return stats
 
@@ -196,6 +369,166 @@ class DatabaseManager:
             stats["errors"].append(error_msg)
             return stats
 
+    def _create_hub_nodes(
+        self,
+        session: Session,
+        rows: Iterable[dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> Dict[str, int]:
+        """
+        Planning stage of the dataset loaders: MERGE every distinct hub node key of
+        `rows` exactly once, so that the dataset writes only MATCH them. Returns the
+        nodes the server reports as created, keyed like the loader stats.
+        """
+        hub_values = collect_hub_values(rows)
+        created = {}
+        for stat_key, _, query in HUB_NODE_STATEMENTS:
+            created[stat_key] = 0
+            for values in chunked(hub_values[stat_key], batch_size):
+                created[stat_key] += self._execute_write_with_retries(
+                    session, max_retries, _run_unwind, query, values
+                )
+
+        self.logger.info(
+            f"Planned {sum(map(len, hub_values.values()))} distinct hub nodes, "
+            f"created {created['titles_created']} titles, "
+            f"{created['publishers_created']} publishers, "
+            f"{created['themes_created']} themes, "
+            f"{created['landing_pages_created']} landing pages, "
+            f"{created['download_urls_created']} download URLs"
+        )
+        return created
+
+    def _write_partition(self, rows: List[dict], max_retries: int) -> Dict[str, int]:
+        with self.session() as session:
+            return self._execute_write_with_retries(
+                session,
+                max_retries,
+                _run_statements,
+                DATASET_RELATIONSHIP_STATEMENTS,
+                rows,
+            )
+
+    def _execute_write_with_retries(
+        self, session: Session, max_retries: int, work: Callable, *args: Any
+    ) -> Any:
+        """
+        Run `work(tx, *args)` in an explicit write transaction and commit it, making
+        up to `max_retries` attempts while it fails with a transient error such as a
+        deadlock. Explicit transactions are not retried by the driver, so these
+        attempts and their backoff are the only ones.
+        """
+        _check_max_retries(max_retries)
+        for attempt in range(1, max_retries + 1):
+            try:
+                with session.begin_transaction() as tx:
+                    result = work(tx, *args)
+                    tx.commit()
+                return result
+            except RETRYABLE_ERRORS as e:
+                if attempt == max_retries:
+                    raise
+                reason = (
+                    "Deadlock"
+                    if getattr(e, "code", None) == DEADLOCK_ERROR_CODE
+                    else "Transient error"
+                )
+                delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) * (1 + random.random())
+                self.logger.warning(
+                    f"{reason} on attempt {attempt}/{max_retries}, "
+                    f"retrying in {delay:.2f}s: {e}"
+                )
+                time.sleep(delay)
+
+    def sync_dataset_nodes_and_relationships(
+        self, datasets: List[Dataset], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        stats = {
+            "datasets_added": 0,
+            "datasets_updated": 0,
+            "datasets_unchanged": 0,
+            "datasets_deleted": 0,
+            "relationships_removed": 0,
+            "errors": [],
+        }
+
+        try:
+            with self.session() as session:
+                existing_hashes = {
+                    record["uri"]: record["content_hash"]
+                    for record in session.run(FETCH_DATASET_HASHES)
+                }
+                plan = plan_delta(
+                    existing_hashes, [dataset_to_row(dataset) for dataset in datasets]
+                )
+                stats["datasets_unchanged"] = plan.unchanged
+                self.logger.info(
+                    f"Delta against {len(existing_hashes)} stored datasets: "
+                    f"{len(plan.new_rows)} new, {len(plan.changed_rows)} changed, "
+                    f"{plan.unchanged} unchanged, {len(plan.deleted_uris)} removed"
+                )
+                self._create_hub_nodes(
+                    session, plan.changed_rows + plan.new_rows, batch_size
+                )
+
+                orphan_candidates = set()
+
+                for stat_key, rows in (
+                    ("datasets_updated", plan.changed_rows),
+                    ("datasets_added", plan.new_rows),
+                ):
+                    for batch in chunked(rows, batch_size):
+                        try:
+                            removed, targets = session.execute_write(
+                                _sync_rows, batch, stat_key == "datasets_updated"
+                            )
+                            stats["relationships_removed"] += removed
+                            orphan_candidates.update(targets)
+                            stats[stat_key] += len(batch)
+                        except Exception as e:
+                            error_msg = (
+                                f"Failed to sync batch starting at dataset "
+                                f"{batch[0]['uri']}: {e}"
+                            )
+                            self.logger.error(error_msg)
+                            stats["errors"].append(error_msg)
+
+                for batch in chunked(plan.deleted_uris, batch_size):
+                    try:
+                        orphan_candidates.update(
+                            session.execute_write(_delete_datasets, batch)
+                        )
+                        stats["datasets_deleted"] += len(batch)
+                    except Exception as e:
+                        error_msg = f"Failed to delete batch starting at dataset {batch[0]}: {e}"
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
+
+                if orphan_candidates:
+                    session.execute_write(
+                        lambda tx: tx.run(
+                            DELETE_ORPHANED_HUB_NODES, ids=list(orphan_candidates)
+                        ).consume()
+                    )
+                    self.logger.info(
+                        f"Checked {len(orphan_candidates)} hub nodes for orphans"
+                    )
+
+            self.logger.success(
+                f"Synced datasets: {stats['datasets_added']} added, "
+                f"{stats['datasets_updated']} updated, "
+                f"{stats['datasets_deleted']} deleted, "
+                f"{stats['datasets_unchanged']} unchanged"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to sync dataset nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
     def create_theme_label_nodes_and_relationships(
         self, theme_labels_map: Dict[str, Dict[str, str]]
     ) -> dict:
@@ -206,30 +539,14 @@ class DatabaseManager:
         }
 
         try:
-            with self.driver.session() as session:
+            with self.session() as session:
                 for theme_uri, labels in theme_labels_map.items():
                     try:
-                        for language, label_text in labels.items():
-                            if not label_text or not label_text.strip():
-                                continue
-
-                            session.run(
-                                "MERGE (tl:ThemeLabel {title: $title, language: $language})",
-                                {"title": label_text.strip(), "language": language},
-                            )
-                            stats["theme_labels_created"] += 1
-
-                            session.run(
-                                "MATCH (t:Theme {uri: $theme_uri}) "
-                                "MATCH (tl:ThemeLabel {title: $title, language: $language}) "
-                                "MERGE (t)-[:HAS_LABEL]->(tl)",
-                                {
-                                    "theme_uri": theme_uri,
-                                    "title": label_text.strip(),
-                                    "language": language,
-                                },
-                            )
-                            stats["has_label_relationships"] += 1
+                        written = session.execute_write(
+                            _write_theme_labels, theme_uri, labels
+                        )
+                        stats["theme_labels_created"] += written
+                        stats["has_label_relationships"] += written
 
                     except Exception as e:
                         error_msg = (
@@ -249,15 +566,413 @@ class DatabaseManager:
             stats["errors"].append(error_msg)
             return stats
 
+    def create_theme_label_nodes_and_relationships_batched(
+        self, theme_labels_map: Dict[str, Dict[str, str]]
+    ) -> dict:
+        stats = {
+            "theme_labels_created": 0,
+            "has_label_relationships": 0,
+            "errors": [],
+        }
+
+        rows = flatten_theme_labels(theme_labels_map)
+        languages = sorted({row["language"] for row in rows})
+
+        try:
+            with self.session() as session:
+                stats.update(
+                    session.execute_write(
+                        _run_statements, THEME_LABEL_BATCH_STATEMENTS, rows
+                    )
+                )
+
+            self.logger.success(
+                f"Created {stats['theme_labels_created']} theme labels with relationships "
+                f"for {len(theme_labels_map)} themes in {len(languages)} languages"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create theme label nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    def create_distribution_relationships_batched(
+        self, rows: List[Dict[str, str]], batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> dict:
+        """
+        Link datasets to the download URLs of all their distributions, from the
+        rows of normalization.distribution_download_urls.
+        """
+        stats = {
+            "download_urls_created": 0,
+            "has_download_url_relationships": 0,
+            "errors": [],
+        }
+
+        try:
+            with self.session() as session:
+                for batch in chunked(rows, batch_size):
+                    counts = session.execute_write(
+                        _run_statements, DISTRIBUTION_BATCH_STATEMENTS, batch
+                    )
+                    for stat_key, count in counts.items():
+                        stats[stat_key] += count
+
+            self.logger.success(
+                f"Linked {len(rows)} distribution download URLs, created "
+                f"{stats['download_urls_created']} download URLs and "
+                f"{stats['has_download_url_relationships']} relationships"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to create distribution relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    def create_graph_with_load_csv(
+        self,
+        rows_per_transaction: int = DEFAULT_ROWS_PER_TRANSACTION,
+        symlink: bool = False,
+    ) -> dict:
+        stats = {
+            "statements_executed": 0,
+            "nodes_created": 0,
+            "relationships_created": 0,
+            "errors": [],
+        }
+
+        try:
+            staged = stage_csv_files(symlink=symlink)
+            self.logger.info(f"Staged {len(staged)} CSV files for LOAD CSV")
+
+            statements = build_load_csv_statements()
+            languages = theme_label_languages()
+
+            with self.session() as session:
+                for statement in statements:
+                    try:
+                        # CALL { ... } IN TRANSACTIONS needs an auto-commit transaction
+                        counters = (
+                            session.run(
+                                statement,
+                                rows_per_transaction=rows_per_transaction,
+                                languages=languages,
+                            )
+                            .consume()
+                            .counters
+                        )
+                        stats["statements_executed"] += 1
+                        stats["nodes_created"] += counters.nodes_created
+                        stats["relationships_created"] += counters.relationships_created
+                        self.logger.info(f"Executed LOAD CSV: {statement[:80]}...")
+                    except Exception as e:
+                        error_msg = f"Failed to execute LOAD CSV statement: {e}"
+                        self.logger.error(error_msg)
+                        stats["errors"].append(error_msg)
+
+            self.logger.success(
+                f"LOAD CSV created {stats['nodes_created']} nodes and "
+                f"{stats['relationships_created']} relationships "
+                f"({stats['statements_executed']}/{len(statements)} statements)"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to load graph with LOAD CSV: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
     def clear_graph(self) -> None:
         try:
-            with self.driver.session() as session:
+            with self.session() as session:
                 session.run("MATCH (n) DETACH DELETE n;")
                 self.logger.success(f"Graph successfully cleared")
         except Exception as e:
             error_msg = f"Failed to clear nodes and relationships: {e}"
             self.logger.error(error_msg)
 
+    def clear_graph_batched(self, batch_size: int = DEFAULT_DELETE_BATCH_SIZE) -> dict:
+        stats = {"relationships_deleted": 0, "nodes_deleted": 0, "errors": []}
+
+        try:
+            with self.session() as session:
+                labels = [record["label"] for record in session.run(LIST_LABELS)]
+
+                # Relationships first, so that no node delete has to detach a
+                # super node's relationships inside a single transaction. The
+                # unlabeled pass (None) picks up anything the label passes missed.
+                for phase, stat_key, template in (
+                    ("relationships", "relationships_deleted", DELETE_RELATIONSHIPS),
+                    ("nodes", "nodes_deleted", DELETE_NODES),
+                ):
+                    for index, label in enumerate(labels + [None], 1):
+                        pattern = f"(n:`{label}`)" if label else "(n)"
+                        try:
+                            counters = (
+                                session.run(
+                                    template.format(pattern=pattern),
+                                    batch_size=batch_size,
+                                )
+                                .consume()
+                                .counters
+                            )
+                            deleted = getattr(counters, stat_key)
+                            stats[stat_key] += deleted
+                            self.logger.info(
+                                f"Deleted {deleted} {phase} of "
+                                f"{label or 'remaining nodes'} "
+                                f"({index}/{len(labels) + 1}, "
+                                f"{stats[stat_key]} {phase} so far)"
+                            )
+                        except Exception as e:
+                            error_msg = f"Failed to delete {phase} of {label}: {e}"
+                            self.logger.error(error_msg)
+                            stats["errors"].append(error_msg)
+
+            self.logger.success(
+                f"Graph cleared: {stats['nodes_deleted']} nodes and "
+                f"{stats['relationships_deleted']} relationships deleted "
+                f"in batches of {batch_size}"
+            )
+            return stats
+
+        except Exception as e:
+            error_msg = f"Failed to clear nodes and relationships: {e}"
+            self.logger.error(error_msg)
+            stats["errors"].append(error_msg)
+            return stats
+
+    def reset_graph(
+        self,
+        batch_size: int = DEFAULT_DELETE_BATCH_SIZE,
+        replace_database: bool = False,
+    ) -> dict:
+        """
+        Full reset: drop the schema, remove all data and recreate the schema from
+        queries/neo4j_constraints.cypher. With replace_database the database is
+        recreated in one step (Enterprise only); otherwise, or if that fails, the
+        data is deleted in batches without index maintenance.
+        """
+        stats = {"nodes_deleted": 0, "relationships_deleted": 0, "errors": []}
+
+        database = self.database or "neo4j"
+        replaced = False
+        if replace_database:
+            try:
+                with self.driver.session(database="system") as session:
+                    session.run(
+                        f"CREATE OR REPLACE DATABASE `{database}` WAIT"
+                    ).consume()
+                replaced = True
+                self.logger.success(f"Database {database} replaced")
+            except Exception as e:
+                self.logger.warning(
+                    f"Could not replace database {database}, "
+                    f"falling back to batched deletes: {e}"
+                )
+
+        if not replaced:
+            try:
+                with self.session() as session:
+                    dropped = 0
+                    for record in session.run(LIST_CONSTRAINTS):
+                        session.run(
+                            f"DROP CONSTRAINT `{record['name']}` IF EXISTS"
+                        ).consume()
+                        dropped += 1
+                    for record in session.run(LIST_INDEXES):
+                        session.run(
+                            f"DROP INDEX `{record['name']}` IF EXISTS"
+                        ).consume()
+                        dropped += 1
+                    self.logger.info(f"Dropped {dropped} constraints and indexes")
+            except Exception as e:
+                error_msg = f"Failed to drop schema: {e}"
+                self.logger.error(error_msg)
+                stats["errors"].append(error_msg)
+
+            clear_stats = self.clear_graph_batched(batch_size=batch_size)
+            stats["nodes_deleted"] = clear_stats["nodes_deleted"]
+            stats["relationships_deleted"] = clear_stats["relationships_deleted"]
+            stats["errors"].extend(clear_stats["errors"])
+
+        if not self.load_constraints():
+            stats["errors"].append("Failed to recreate constraints")
+
+        return stats
+
+
+def _check_max_retries(max_retries: int) -> None:
+    if max_retries < 1:
+        raise ValueError(f"max_retries must be at least 1, got {max_retries}")
+
+
+def _run_unwind(tx: ManagedTransaction, query: str, values: List[str]) -> int:
+    return tx.run(query, values=values).consume().counters.nodes_created
+
+
+def _run_statements(
+    tx: ManagedTransaction, statements: List[tuple[str, str]], rows: List[dict]
+) -> Dict[str, int]:
+    return {
+        stat_key: created_count(stat_key, tx.run(query, rows=rows).consume().counters)
+        for stat_key, query in statements
+    }
+
+
+def _write_dataset_batch(tx: ManagedTransaction, batch: DatasetBatch) -> Dict[str, int]:
+    return {
+        stat_key: created_count(
+            stat_key, tx.run(query, batch.parameters_for(query)).consume().counters
+        )
+        for stat_key, query in COLUMNAR_DATASET_STATEMENTS
+    }
+
+
+def _write_dataset(tx: ManagedTransaction, dataset: Dataset) -> Dict[str, int]:
+    """
+    Write one dataset and its relationships, one statement each. Hub nodes are
+    created beforehand (see DatabaseManager._create_hub_nodes).
+    """
+    counts = {stat_key: 0 for stat_key, _ in DATASET_RELATIONSHIP_STATEMENTS}
+
+    def run(stat_key: str, query: str, parameters: dict) -> None:
+        counters = tx.run(query, parameters).consume().counters
+        counts[stat_key] += created_count(stat_key, counters)
+
+    run(
+        "datasets_created",
+        "MERGE (d:Dataset {uri: $uri}) SET d.content_hash = $content_hash",
+        {"uri": dataset.uri, "content_hash": dataset_to_row(dataset)["content_hash"]},
+    )
+
+    run(
+        "has_title_relationships",
+        "MATCH (d:Dataset {uri: $dataset_uri}) "
+        "MATCH (t:Title {value: $title_value}) "
+        "MERGE (d)-[:HAS_TITLE]->(t)",
+        {
+            "dataset_uri": dataset.uri,
+            "title_value": dataset.title.value,
+        },
+    )
+
+    run(
+        "published_by_relationships",
+        "MATCH (d:Dataset {uri: $dataset_uri}) "
+        "MATCH (p:Publisher {uri: $publisher_uri}) "
+        "MERGE (d)-[:PUBLISHED_BY]->(p)",
+        {
+            "dataset_uri": dataset.uri,
+            "publisher_uri": dataset.publisher.uri,
+        },
+    )
+
+    for theme in dataset.themes:
+        run(
+            "has_theme_relationships",
+            "MATCH (d:Dataset {uri: $dataset_uri}) "
+            "MATCH (t:Theme {uri: $theme_uri}) "
+            "MERGE (d)-[:HAS_THEME]->(t)",
+            {
+                "dataset_uri": dataset.uri,
+                "theme_uri": theme.uri,
+            },
+        )
+
+    if dataset.landing_page:
+        run(
+            "has_landing_page_relationships",
+            "MATCH (d:Dataset {uri: $dataset_uri}) "
+            "MATCH (lp:LandingPage {url: $landing_page_url}) "
+            "MERGE (d)-[:HAS_LANDING_PAGE]->(lp)",
+            {
+                "dataset_uri": dataset.uri,
+                "landing_page_url": dataset.landing_page.url,
+            },
+        )
+
+    if dataset.download_url:
+        run(
+            "has_download_url_relationships",
+            "MATCH (d:Dataset {uri: $dataset_uri}) "
+            "MATCH (du:DownloadURL {url: $download_url}) "
+            "MERGE (d)-[:HAS_DOWNLOAD_URL]->(du)",
+            {
+                "dataset_uri": dataset.uri,
+                "download_url": dataset.download_url.url,
+            },
+        )
+
+    return counts
+
+
+def _write_theme_labels(
+    tx: ManagedTransaction, theme_uri: str, labels: Dict[str, str]
+) -> int:
+    written = 0
+    for language, label_text in labels.items():
+        if not label_text or not label_text.strip():
+            continue
+
+        tx.run(
+            "MERGE (tl:ThemeLabel {title: $title, language: $language})",
+            {"title": label_text.strip(), "language": language},
+        ).consume()
+
+        tx.run(
+            "MATCH (t:Theme {uri: $theme_uri}) "
+            "MATCH (tl:ThemeLabel {title: $title, language: $language}) "
+            "MERGE (t)-[:HAS_LABEL]->(tl)",
+            {
+                "theme_uri": theme_uri,
+                "title": label_text.strip(),
+                "language": language,
+            },
+        ).consume()
+        written += 1
+    return written
+
+
+def _sync_rows(
+    tx: ManagedTransaction, rows: List[dict], remove_stale: bool
+) -> tuple[int, List[str]]:
+    removed, targets = 0, []
+    if remove_stale:
+        record = tx.run(DELETE_STALE_RELATIONSHIPS, rows=rows).single()
+        removed, targets = record["removed"], record["targets"]
+    _run_statements(tx, DATASET_RELATIONSHIP_STATEMENTS, rows)
+    return removed, targets
+
+
+def _delete_datasets(tx: ManagedTransaction, uris: List[str]) -> List[str]:
+    targets = []
+    for record in tx.run(DELETE_DATASETS, uris=uris):
+        targets.extend(record["targets"])
+    return targets
+
+
+def _empty_dataset_stats() -> dict:
+    return {
+        "datasets_created": 0,
+        "titles_created": 0,
+        "publishers_created": 0,
+        "themes_created": 0,
+        "landing_pages_created": 0,
+        "download_urls_created": 0,
+        "has_title_relationships": 0,
+        "published_by_relationships": 0,
+        "has_theme_relationships": 0,
+        "has_landing_page_relationships": 0,
+        "has_download_url_relationships": 0,
+        "errors": [],
+    }
+
 
 def load_db_config() -> DatabaseManager:
     load_dotenv()
@@ -266,4 +981,24 @@ def load_db_config() -> DatabaseManager:
     username = os.getenv("NEO4J_USER", "neo4j")
     password = os.getenv("NEO4J_PASSWORD", "password")
 
-    return DatabaseManager(uri=uri, username=username, password=password)
+    return DatabaseManager(
+        uri=uri, username=username, password=password, **driver_settings_from_env()
+    )
+
+
+def driver_settings_from_env() -> dict:
+    return {
+        "database": os.getenv("NEO4J_DATABASE") or None,
+        "max_connection_pool_size": int(
+            os.getenv(
+                "NEO4J_MAX_CONNECTION_POOL_SIZE", DEFAULT_MAX_CONNECTION_POOL_SIZE
+            )
+        ),
+        "connection_acquisition_timeout": float(
+            os.getenv(
+                "NEO4J_CONNECTION_ACQUISITION_TIMEOUT",
+                DEFAULT_CONNECTION_ACQUISITION_TIMEOUT,
+            )
+        ),
+        "fetch_size": int(os.getenv("NEO4J_FETCH_SIZE", DEFAULT_FETCH_SIZE)),
+    }
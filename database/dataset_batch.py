@@ -0,0 +1,231 @@
+from dataclasses import dataclass
+import re
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from database.batch_queries import HASHED_FIELDS, row_content_hash
+from database.interning import InternRegistry
+from database.models import Dataset
+from database.normalization import NORMALIZED_COLUMNS, build_dataset
+from logging_utils.app_logger import AppLogger
+
+
+def _offsets(lengths: Iterable[int], size: int) -> np.ndarray:
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(lengths, dtype=np.int64, count=size), out=offsets[1:])
+    return offsets
+
+
+def _objects(values: Iterable[Any], size: int) -> np.ndarray:
+    array = np.empty(size, dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, str) and value.strip() != ""
+
+
+def _is_optional_text(value: Any) -> bool:
+    return value is None or isinstance(value, str)
+
+
+def _is_optional_nonblank_text(value: Any) -> bool:
+    return value is None or _is_text(value)
+
+
+def _is_text_list(value: Any) -> bool:
+    return isinstance(value, list) and all(map(_is_text, value))
+
+
+def _is_optional_str_list(value: Any) -> bool:
+    return value is None or (
+        isinstance(value, list) and all(isinstance(item, str) for item in value)
+    )
+
+
+def _is_optional_int(value: Any) -> bool:
+    return value is None or type(value) is int
+
+
+# One check per normalized column that lets a row skip model validation because
+# it would pass unchanged; every other row goes through build_dataset.
+_PREVALIDATED_COLUMNS = {
+    "uri": _is_text,
+    "title": _is_text,
+    "publisher": _is_text,
+    "themes": _is_text_list,
+    "landing_page": _is_optional_nonblank_text,
+    "download_url": _is_optional_nonblank_text,
+    "issued": _is_optional_text,
+    "status": _is_optional_text,
+    "access_url": _is_optional_text,
+    "byte_size": _is_optional_int,
+    "keywords": _is_optional_str_list,
+}
+
+
+_PARAMETER_PATTERN = re.compile(r"\$(\w+)")
+
+
+def _normalized_values(dataset: Dataset) -> tuple:
+    """A validated dataset as a row of NORMALIZED_COLUMNS."""
+    return (
+        dataset.uri,
+        dataset.title.value,
+        dataset.publisher.uri,
+        [theme.uri for theme in dataset.themes],
+        dataset.landing_page.url if dataset.landing_page else None,
+        dataset.download_url.url if dataset.download_url else None,
+        dataset.issued,
+        dataset.status,
+        dataset.access_url,
+        dataset.byte_size,
+        dataset.keywords,
+    )
+
+
+@dataclass
+class DatasetBatch:
+    """
+    Validated datasets stored column-wise. Publishers and themes are dictionary
+    encoded: row i has publisher publishers[publisher_ids[i]] and the themes
+    themes[theme_ids[theme_offsets[i]:theme_offsets[i + 1]]], where publishers and
+    themes hold the distinct values of the batch in InternRegistry ID order.
+    Keywords use the same offsets encoding, an empty span standing for no
+    keywords. Optional columns hold None where a value is missing.
+    """
+
+    uris: np.ndarray
+    titles: np.ndarray
+    publishers: np.ndarray
+    publisher_ids: np.ndarray
+    themes: np.ndarray
+    theme_offsets: np.ndarray
+    theme_ids: np.ndarray
+    landing_pages: np.ndarray
+    download_urls: np.ndarray
+    issued: np.ndarray
+    statuses: np.ndarray
+    access_urls: np.ndarray
+    byte_sizes: np.ndarray
+    keyword_offsets: np.ndarray
+    keywords: np.ndarray
+    content_hashes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    def row_themes(self, index: int) -> List[str]:
+        start, end = self.theme_offsets[index], self.theme_offsets[index + 1]
+        return self.themes[self.theme_ids[start:end]].tolist()
+
+    def row_keywords(self, index: int) -> Optional[List[str]]:
+        start, end = self.keyword_offsets[index], self.keyword_offsets[index + 1]
+        return self.keywords[start:end].tolist() if end > start else None
+
+    def parameters(self) -> Dict[str, np.ndarray]:
+        """The Cypher parameters of COLUMNAR_DATASET_STATEMENTS, without copies."""
+        return {
+            "uris": self.uris,
+            "titles": self.titles,
+            "publishers": self.publishers,
+            "publisher_ids": self.publisher_ids,
+            "themes": self.themes,
+            "theme_offsets": self.theme_offsets,
+            "theme_ids": self.theme_ids,
+            "landing_pages": self.landing_pages,
+            "download_urls": self.download_urls,
+            "content_hashes": self.content_hashes,
+        }
+
+    def parameters_for(self, query: str) -> Dict[str, np.ndarray]:
+        columns = self.parameters()
+        return {name: columns[name] for name in _PARAMETER_PATTERN.findall(query)}
+
+    @classmethod
+    def from_normalized_frame(
+        cls, normalized_df: pd.DataFrame, registry: Optional[InternRegistry] = None
+    ) -> "DatasetBatch":
+        """
+        Validate a frame from normalize_datasets_frame. Rows whose values already
+        satisfy the models are taken as they are; the rest are validated through
+        build_dataset, and those that fail are logged and dropped exactly like
+        build_datasets does. Publishers and themes are encoded by their IDs in
+        `registry` (a new one if not given), so batches sharing a registry share
+        the IDs.
+        """
+        logger = AppLogger()
+        frame = normalized_df
+        keep = np.ones(len(frame), dtype=bool)
+        for column, check in _PREVALIDATED_COLUMNS.items():
+            keep &= np.fromiter(map(check, frame[column]), dtype=bool, count=len(frame))
+
+        if not keep.all():
+            frame = frame.copy()
+            for position in np.flatnonzero(~keep):
+                row = next(frame.iloc[[position]].itertuples())
+                try:
+                    dataset = build_dataset(row)
+                except Exception as e:
+                    logger.error(f"Failed to parse dataset at row {row.Index + 2}: {e}")
+                    continue
+                # Keep the values as the models coerced them.
+                for column, value in zip(
+                    NORMALIZED_COLUMNS, _normalized_values(dataset)
+                ):
+                    frame.iat[position, frame.columns.get_loc(column)] = value
+                keep[position] = True
+            frame = frame[keep]
+
+        size = len(frame)
+        registry = registry if registry is not None else InternRegistry()
+        publisher_keys, publisher_ids = np.unique(
+            registry.publisher_ids(frame["publisher"]), return_inverse=True
+        )
+        theme_keys, theme_ids = np.unique(
+            registry.theme_ids(chain.from_iterable(frame["themes"])),
+            return_inverse=True,
+        )
+        keywords = [value or [] for value in frame["keywords"]]
+
+        content_hashes = _objects(
+            map(row_content_hash, frame[HASHED_FIELDS].to_dict("records")), size
+        )
+
+        return cls(
+            uris=frame["uri"].to_numpy(object),
+            titles=frame["title"].to_numpy(object),
+            publishers=_objects(
+                (registry.publishers[key].uri for key in publisher_keys),
+                len(publisher_keys),
+            ),
+            publisher_ids=publisher_ids.astype(np.int64),
+            themes=_objects(
+                (registry.themes[key].uri for key in theme_keys), len(theme_keys)
+            ),
+            theme_offsets=_offsets(map(len, frame["themes"]), size),
+            theme_ids=theme_ids.astype(np.int64),
+            landing_pages=frame["landing_page"].to_numpy(object),
+            download_urls=frame["download_url"].to_numpy(object),
+            issued=frame["issued"].to_numpy(object),
+            statuses=frame["status"].to_numpy(object),
+            access_urls=frame["access_url"].to_numpy(object),
+            byte_sizes=frame["byte_size"].to_numpy(object),
+            keyword_offsets=_offsets(map(len, keywords), size),
+            keywords=_objects(chain.from_iterable(keywords), sum(map(len, keywords))),
+            content_hashes=content_hashes,
+        )
+
+    @classmethod
+    def from_datasets(
+        cls, datasets: List[Dataset], registry: Optional[InternRegistry] = None
+    ) -> "DatasetBatch":
+        """Columnize already validated Dataset models."""
+        frame = pd.DataFrame(
+            [_normalized_values(dataset) for dataset in datasets],
+            columns=NORMALIZED_COLUMNS,
+            dtype=object,
+        )
+        return cls.from_normalized_frame(frame, registry)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+FETCH_DATASET_HASHES = (
+    "MATCH (d:Dataset) RETURN d.uri AS uri, d.content_hash AS content_hash"
+)
+
+# Removes the outgoing loader relationships of changed datasets that no longer
+# match the source row. Matching relationships are kept, and the MERGEs of the
+# batched writer then add whatever is new.
+DELETE_STALE_RELATIONSHIPS = (
+    "UNWIND $rows AS row "
+    "MATCH (d:Dataset {uri: row.uri})"
+    "-[r:HAS_TITLE|PUBLISHED_BY|HAS_THEME|HAS_LANDING_PAGE|HAS_DOWNLOAD_URL]->(target) "
+    "WHERE NOT ("
+    "coalesce(type(r) = 'HAS_TITLE' AND target.value = row.title, false) "
+    "OR coalesce(type(r) = 'PUBLISHED_BY' AND target.uri = row.publisher, false) "
+    "OR coalesce(type(r) = 'HAS_THEME' AND target.uri IN row.themes, false) "
+    "OR coalesce(type(r) = 'HAS_LANDING_PAGE' AND target.url = row.landing_page, false) "
+    "OR coalesce(type(r) = 'HAS_DOWNLOAD_URL' AND target.url = row.download_url, false)"
+    ") "
+    "DELETE r "
+    "RETURN count(r) AS removed, collect(DISTINCT elementId(target)) AS targets"
+)
+
+DELETE_DATASETS = (
+    "UNWIND $uris AS uri "
+    "MATCH (d:Dataset {uri: uri}) "
+    "OPTIONAL MATCH (d)-->(target) "
+    "WITH d, collect(DISTINCT elementId(target)) AS targets "
+    "DETACH DELETE d "
+    "RETURN targets"
+)
+
+# Deletes hub nodes that lost their last Dataset, and the labels of deleted themes
+# that are not shared with another theme.
+DELETE_ORPHANED_HUB_NODES = (
+    "UNWIND $ids AS id "
+    "MATCH (n) WHERE elementId(n) = id AND NOT (n)<--(:Dataset) "
+    "OPTIONAL MATCH (n)-[:HAS_LABEL]->(tl:ThemeLabel) "
+    "WITH n, collect(tl) AS labels "
+    "DETACH DELETE n "
+    "WITH labels UNWIND labels AS tl "
+    "WITH DISTINCT tl WHERE NOT (tl)<-[:HAS_LABEL]-() "
+    "DELETE tl"
+)
+
+
+@dataclass
+class DeltaPlan:
+    new_rows: List[Dict[str, Any]] = field(default_factory=list)
+    changed_rows: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+    deleted_uris: List[str] = field(default_factory=list)
+
+
+def plan_delta(
+    existing_hashes: Dict[str, Optional[str]], rows: List[Dict[str, Any]]
+) -> DeltaPlan:
+    """Compare freshly built rows with the content hashes stored on Dataset nodes."""
+    plan = DeltaPlan()
+    seen = set()
+
+    # The last row of a repeated uri wins, as it does for MERGE ... SET.
+    for row in {row["uri"]: row for row in rows}.values():
+        seen.add(row["uri"])
+
+        if row["uri"] not in existing_hashes:
+            plan.new_rows.append(row)
+        elif existing_hashes[row["uri"]] != row["content_hash"]:
+            plan.changed_rows.append(row)
+        else:
+            plan.unchanged += 1
+
+    plan.deleted_uris = [uri for uri in existing_hashes if uri not in seen]
+    return plan
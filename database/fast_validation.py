@@ -0,0 +1,55 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from database.models import Dataset
+
+DATASET_LIST_ADAPTER = TypeAdapter(List[Dataset])
+
+
+def record_validation_error(errors: List[Dict[str, Any]]) -> ValidationError:
+    """
+    The ValidationError of one record from its errors in validate_dataset_records,
+    the same one Dataset.model_validate(record) raises.
+    """
+    return ValidationError.from_exception_data(
+        "Dataset",
+        [
+            {
+                "type": error["type"],
+                "loc": error["loc"],
+                "input": error["input"],
+                **({"ctx": error["ctx"]} if "ctx" in error else {}),
+            }
+            for error in errors
+        ],
+    )
+
+
+def validate_dataset_records(
+    records: List[Dict[str, Any]],
+) -> Tuple[List[Optional[Dataset]], Dict[int, List[Dict[str, Any]]]]:
+    """
+    Validate nested Dataset records as one list in pydantic-core. Returns one
+    Dataset per record (None where it is invalid) and the errors of each invalid
+    record, keyed by its position, with locations relative to the record. When
+    some records fail, the list error says which; only the others are then
+    validated again to build their models.
+    """
+    try:
+        return DATASET_LIST_ADAPTER.validate_python(records), {}
+    except ValidationError as e:
+        record_errors = defaultdict(list)
+        for error in e.errors():
+            position, *loc = error["loc"]
+            record_errors[position].append({**error, "loc": tuple(loc)})
+
+    valid_positions = [
+        position for position in range(len(records)) if position not in record_errors
+    ]
+    datasets: List[Optional[Dataset]] = [None] * len(records)
+    validated = DATASET_LIST_ADAPTER.validate_python(
+        [records[position] for position in valid_positions]
+    )
+    for position, dataset in zip(valid_positions, validated):
+        datasets[position] = dataset
+    return datasets, dict(sorted(record_errors.items()))
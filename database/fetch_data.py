@@ -1,25 +1,79 @@
 import csv
+import os
 import sys
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from SPARQLWrapper import SPARQLWrapper, JSON
+from typing import Dict, Iterator, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from logging_utils.app_logger import AppLogger
+from database.checkpoint import EnrichmentCheckpoint
+from database.rate_limiting import TokenBucket
+from database.sparql_cache import SparqlCache
+from database.sparql_client import SparqlClient
 
 logger = AppLogger()
 
 OUTPUT_FILE = "../data/enriched_datasets.csv"
+DISTRIBUTIONS_FILE = "../data/dataset_distributions.csv"
 INITIAL_DATASETS_FILE = "../data/datasets_publishers_themes.csv"
+SPARQL_CACHE_FILE = str(
+    Path(__file__).parent.parent / "data" / ".cache" / "sparql.sqlite"
+)
 SPARQL_ENDPOINT = "https://data.europa.eu/sparql"
-
-
-def get_initial_datasets(sparql: SPARQLWrapper):
+# The catalog is harvested in pages of HARVEST_PAGE_SIZE datasets, up to
+# MAX_DATASETS in total (None harvests the whole catalog).
+HARVEST_PAGE_SIZE = 500
+MAX_DATASETS: Optional[int] = 500
+# Detail queries in flight at once, and how many may start per second overall.
+MAX_IN_FLIGHT = 8
+REQUESTS_PER_SECOND = 4.0
+# "concurrent" queries one dataset per request, "batched" many per request.
+ENRICHMENT_MODE = "concurrent"
+# Continue an interrupted enrichment from its checkpoint instead of starting over.
+RESUME_ENRICHMENT = True
+# Datasets per batched request. The size grows towards TARGET_RESULT_ROWS result
+# rows and is halved after an error or a response that may have been cut off at
+# the endpoint's row limit. A failure also halves the ceiling the size may grow
+# back to, which then rises by a quarter per successful batch.
+INITIAL_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 500
+TARGET_RESULT_ROWS = 5000
+MAX_RESULT_ROWS = 10000
+
+ENRICHED_FIELDNAMES = [
+    "dataset",
+    "issued",
+    "status",
+    "accessURL",
+    "byteSize",
+    "downloadURL",
+    "landingPage",
+    "keywords",
+]
+INITIAL_FIELDNAMES = ["dataset", "datasetTitle", "publisher", "themes"]
+DISTRIBUTION_FIELDNAMES = ["dataset", "accessURL", "downloadURL", "byteSize"]
+
+
+def create_sparql_client() -> SparqlClient:
+    """The endpoint's client with the on-disk response cache; close() it when done."""
+    return SparqlClient(SPARQL_ENDPOINT, cache=SparqlCache(SPARQL_CACHE_FILE))
+
+
+def get_initial_datasets_page(
+    client: SparqlClient,
+    after: Optional[str],
+    limit: int,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> List[dict]:
     """
-    Fetch initial datasets from the SPARQL endpoint.
-    Returns all matching datasets, not just the first one.
+    Fetch up to `limit` datasets whose URI sorts after `after`, ordered by URI.
+    Paging on the last URI seen rather than an OFFSET keeps every page as cheap
+    as the first. Errors are raised to the caller.
     """
+    after_filter = f'FILTER(STR(?dataset) > "{after}")' if after is not None else ""
     query = f"""
         PREFIX dct: <http://purl.org/dc/terms/>
         PREFIX dcat: <http://www.w3.org/ns/dcat#>
@@ -34,35 +88,54 @@ def get_initial_datasets(sparql: SPARQLWrapper):
                 dct:publisher ?pub ;
                 dcat:theme ?theme .
         FILTER(lang(?title) = "en")
+        {after_filter}
         }}
         GROUP BY ?dataset
-        LIMIT 500    
+        ORDER BY STR(?dataset)
+        LIMIT {limit}
     """
 
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
-
-    try:
-        results = sparql.query().convert()
-        if results["results"]["bindings"]:
-            datasets = [
-                {k: v.get("value", "") for k, v in result.items()}
-                for result in results["results"]["bindings"]
-            ]
-            logger.success(f"Fetched {len(datasets)} datasets from SPARQL endpoint")
-            return datasets
-        else:
-            logger.warning("No datasets found in SPARQL query results")
-    except Exception as e:
-        logger.error(f"Error querying initial datasets: {e}")
-
-    return []
-
-
-def get_dataset_details(dataset_uri: str) -> dict:
-    """Fetch additional details for a specific dataset."""
-    sparql = SPARQLWrapper(SPARQL_ENDPOINT)
-
+    results = client.query(query, "catalog", rate_limiter)
+    return [
+        {k: v.get("value", "") for k, v in result.items()}
+        for result in results["results"]["bindings"]
+    ]
+
+
+def iter_initial_datasets(
+    client: SparqlClient,
+    page_size: int = HARVEST_PAGE_SIZE,
+    max_datasets: Optional[int] = MAX_DATASETS,
+) -> Iterator[List[dict]]:
+    """Yield the catalog one page at a time until it or `max_datasets` runs out."""
+    rate_limiter = TokenBucket(REQUESTS_PER_SECOND)
+    after, fetched = None, 0
+
+    while max_datasets is None or fetched < max_datasets:
+        limit = (
+            page_size
+            if max_datasets is None
+            else min(page_size, max_datasets - fetched)
+        )
+        page = get_initial_datasets_page(client, after, limit, rate_limiter)
+        if not page:
+            return
+        fetched += len(page)
+        yield page
+        if len(page) < limit:
+            return
+        after = page[-1]["dataset"]
+
+
+def get_dataset_details(
+    client: SparqlClient,
+    dataset_uri: str,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> List[dict]:
+    """
+    Fetch additional details for a specific dataset: every result row, one per
+    distinct combination of distribution fields.
+    """
     query = f"""
     PREFIX dct: <http://purl.org/dc/terms/>
     PREFIX dcat: <http://www.w3.org/ns/dcat#>
@@ -94,91 +167,351 @@ def get_dataset_details(dataset_uri: str) -> dict:
     GROUP BY ?issued ?status ?accessURL ?byteSize ?downloadURL ?landingPage
     """
 
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
-
     try:
-        results = sparql.query().convert()
-        if results["results"]["bindings"]:
-            res = results["results"]["bindings"][0]
-            return {k: v.get("value", "") for k, v in res.items()}
+        results = client.query(query, "details", rate_limiter)
+        return [
+            {k: v.get("value", "") for k, v in binding.items()}
+            for binding in results["results"]["bindings"]
+        ]
     except Exception as e:
         logger.error(f"Error querying {dataset_uri}: {e}")
 
-    return {}
+    return []
 
 
-def save_initial_datasets():
-    """Fetch initial datasets from SPARQL and save to CSV."""
+def get_datasets_details(
+    client: SparqlClient,
+    dataset_uris: List[str],
+    rate_limiter: Optional[TokenBucket] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Fetch the details of many datasets in one request. Returns every result row
+    per dataset URI, one per distinct combination of distribution fields, in
+    the order the endpoint returned them. Errors are raised to the caller.
+    """
+    values_clause = " ".join(f"<{uri}>" for uri in dataset_uris)
+    query = f"""
+    PREFIX dct: <http://purl.org/dc/terms/>
+    PREFIX dcat: <http://www.w3.org/ns/dcat#>
+    PREFIX adms: <http://www.w3.org/ns/adms#>
+
+    SELECT ?dataset ?issued ?status ?accessURL ?byteSize ?downloadURL ?landingPage
+           (GROUP_CONCAT(DISTINCT ?keyword; separator=", ") AS ?keywords)
+    WHERE {{
+      VALUES ?dataset {{ {values_clause} }}
+
+      OPTIONAL {{ ?dataset dct:issued ?issued . }}
+      OPTIONAL {{ ?dataset adms:status ?status . }}
+      OPTIONAL {{ ?dataset dcat:landingPage ?landingPage . }}
+      OPTIONAL {{ ?dataset dcat:keyword ?keyword . }}
+
+      {{
+        OPTIONAL {{ ?dataset dcat:accessURL ?accessURL . }}
+        OPTIONAL {{ ?dataset dcat:downloadURL ?downloadURL . }}
+        OPTIONAL {{ ?dataset dcat:byteSize ?byteSize . }}
+      }}
+      UNION
+      {{
+        ?dataset dcat:distribution ?dist .
+        OPTIONAL {{ ?dist dcat:accessURL ?accessURL . }}
+        OPTIONAL {{ ?dist dcat:downloadURL ?downloadURL . }}
+        OPTIONAL {{ ?dist dcat:byteSize ?byteSize . }}
+      }}
+    }}
+    GROUP BY ?dataset ?issued ?status ?accessURL ?byteSize ?downloadURL ?landingPage
+    """
+
+    details = {uri: [] for uri in dataset_uris}
+    results = client.query(query, "details", rate_limiter)
+    for binding in results["results"]["bindings"]:
+        row = {k: v.get("value", "") for k, v in binding.items()}
+        details.setdefault(row.pop("dataset"), []).append(row)
+    return details
+
+
+def distribution_rows(dataset_uri: str, details: List[dict]) -> List[dict]:
+    """The distinct accessURL / downloadURL / byteSize combinations of a dataset."""
+    rows = {}
+    for row in details:
+        key = tuple(row.get(field, "") for field in DISTRIBUTION_FIELDNAMES[1:])
+        if any(key):
+            rows.setdefault(
+                key, dict(zip(DISTRIBUTION_FIELDNAMES, (dataset_uri, *key)))
+            )
+    return list(rows.values())
+
+
+def enrich_in_batches(
+    client: SparqlClient,
+    rows: List[dict],
+    rate_limiter: TokenBucket,
+    batch_size: int = INITIAL_BATCH_SIZE,
+) -> Iterator[Tuple[dict, List[dict]]]:
+    """
+    Yield (row, result rows of its dataset) for every input row, in input order,
+    querying the endpoint one batch of datasets at a time.
+    """
+    position, ceiling = 0, float(MAX_BATCH_SIZE)
+    while position < len(rows):
+        batch = rows[position : position + batch_size]
+        dataset_uris = [row["dataset"] for row in batch]
+
+        try:
+            details = get_datasets_details(client, dataset_uris, rate_limiter)
+        except Exception as e:
+            if len(batch) > 1:
+                batch_size = len(batch) // 2
+                ceiling = batch_size
+                logger.warning(
+                    f"Batch of {len(batch)} datasets failed ({e}), retrying with "
+                    f"{batch_size}"
+                )
+                continue
+            logger.error(f"Error querying {dataset_uris[0]}: {e}")
+            details = {}
+        else:
+            result_rows = sum(map(len, details.values()))
+            if result_rows >= MAX_RESULT_ROWS and len(batch) > 1:
+                batch_size = len(batch) // 2
+                ceiling = batch_size
+                logger.warning(
+                    f"Batch of {len(batch)} datasets hit the {MAX_RESULT_ROWS} row "
+                    f"limit, retrying with {batch_size}"
+                )
+                continue
+            rows_per_dataset = max(result_rows / len(batch), 1)
+            ceiling = min(MAX_BATCH_SIZE, ceiling * 1.25)
+            batch_size = max(
+                1,
+                min(
+                    int(ceiling),
+                    2 * len(batch),
+                    int(TARGET_RESULT_ROWS / rows_per_dataset),
+                ),
+            )
+
+        logger.info(f"Enriched {position + len(batch)}/{len(rows)} datasets")
+        for row in batch:
+            yield row, details.get(row["dataset"], [])
+        position += len(batch)
+
+
+def save_initial_datasets(
+    client: SparqlClient,
+    page_size: int = HARVEST_PAGE_SIZE,
+    max_datasets: Optional[int] = MAX_DATASETS,
+):
+    """
+    Harvest initial datasets from SPARQL page by page, appending each page to the
+    CSV as it arrives. The pages go to a .partial file that only replaces the
+    previous CSV once the harvest finished.
+    """
     logger.info(f"Fetching initial datasets from {SPARQL_ENDPOINT}...")
-    sparql = SPARQLWrapper(SPARQL_ENDPOINT)
+    partial_file = f"{INITIAL_DATASETS_FILE}.partial"
 
-    datasets = get_initial_datasets(sparql)
+    dataset_count = 0
+    try:
+        with open(partial_file, mode="w", encoding="utf-8", newline="") as outfile:
+            writer = csv.DictWriter(outfile, fieldnames=INITIAL_FIELDNAMES)
+            writer.writeheader()
+
+            for page in iter_initial_datasets(client, page_size, max_datasets):
+                writer.writerows(page)
+                dataset_count += len(page)
+                logger.info(f"Fetched {dataset_count} datasets so far")
+    except Exception as e:
+        logger.error(
+            f"Error harvesting initial datasets after {dataset_count} datasets: {e}. "
+            f"Keeping the previous {INITIAL_DATASETS_FILE}"
+        )
+        return
 
-    if not datasets:
+    if not dataset_count:
         logger.error("No datasets fetched. Aborting.")
+        os.remove(partial_file)
         return
 
-    try:
-        fieldnames = ["dataset", "datasetTitle", "publisher", "themes"]
-        with open(
-            INITIAL_DATASETS_FILE, mode="w", encoding="utf-8", newline=""
-        ) as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
+    os.replace(partial_file, INITIAL_DATASETS_FILE)
+    logger.success(f"Saved {dataset_count} datasets to {INITIAL_DATASETS_FILE}")
+    client.log_stats()
 
-            for dataset in datasets:
-                writer.writerow(dataset)
 
-        logger.success(f"Saved {len(datasets)} datasets to {INITIAL_DATASETS_FILE}")
-    except Exception as e:
-        logger.error(f"Error saving initial datasets: {e}")
+def _open_checkpoint(checkpoint: EnrichmentCheckpoint, resume: bool) -> bool:
+    """Resume from `checkpoint` if asked and possible; True when resuming."""
+    if resume and checkpoint.resume():
+        logger.info(
+            f"Resuming enrichment after {len(checkpoint.completed)} datasets "
+            f"recorded in {checkpoint.path}"
+        )
+        return True
+    checkpoint.reset()
+    return False
 
 
-def run_enrichment():
-    """Enrich datasets with additional details from SPARQL."""
+def run_enrichment(
+    client: SparqlClient,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    resume: bool = RESUME_ENRICHMENT,
+):
+    """
+    Enrich datasets with additional details from SPARQL. Up to `max_in_flight`
+    detail queries run at once and a token bucket keeps them to
+    `requests_per_second`. The enriched CSV keeps one row per dataset, using the
+    first result row; every distinct distribution is also written to
+    DISTRIBUTIONS_FILE. Rows are written in input order: each one as soon as it
+    and every row before it are done. Each written row is checkpointed, so with
+    `resume` an interrupted run only appends the datasets still missing.
+    """
+    fieldnames = ENRICHED_FIELDNAMES
+    rate_limiter = TokenBucket(requests_per_second, capacity=max_in_flight)
+
+    def enrich(row: dict) -> Tuple[dict, List[dict]]:
+        logger.info(f"Processing: {row['dataset']}...")
+        details = get_dataset_details(client, row["dataset"], rate_limiter)
+        if details:
+            row.update(details[0])
+        return (
+            {k: v for k, v in row.items() if k in fieldnames},
+            distribution_rows(row["dataset"], details),
+        )
+
     try:
-        with open(INITIAL_DATASETS_FILE, mode="r", encoding="utf-8") as infile:
+        with (
+            EnrichmentCheckpoint([OUTPUT_FILE, DISTRIBUTIONS_FILE]) as checkpoint,
+            open(INITIAL_DATASETS_FILE, mode="r", encoding="utf-8") as infile,
+        ):
             reader = csv.DictReader(infile)
-            fieldnames = [
-                "dataset",
-                "issued",
-                "status",
-                "accessURL",
-                "byteSize",
-                "downloadURL",
-                "landingPage",
-                "keywords",
-            ]
-
-            with open(OUTPUT_FILE, mode="w", encoding="utf-8", newline="") as outfile:
+            resuming = _open_checkpoint(checkpoint, resume)
+            mode = "a" if resuming else "w"
+
+            with (
+                open(OUTPUT_FILE, mode=mode, encoding="utf-8", newline="") as outfile,
+                open(
+                    DISTRIBUTIONS_FILE, mode=mode, encoding="utf-8", newline=""
+                ) as distributions_file,
+                ThreadPoolExecutor(max_workers=max_in_flight) as executor,
+            ):
                 writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
+                distribution_writer = csv.DictWriter(
+                    distributions_file, fieldnames=DISTRIBUTION_FIELDNAMES
+                )
+                if not resuming:
+                    writer.writeheader()
+                    distribution_writer.writeheader()
+
+                row_count = distribution_count = 0
+
+                def write(enriched: Tuple[dict, List[dict]]) -> None:
+                    nonlocal row_count, distribution_count
+                    enriched_row, distributions = enriched
+                    writer.writerow(enriched_row)
+                    distribution_writer.writerows(distributions)
+                    checkpoint.record(
+                        enriched_row["dataset"], [outfile, distributions_file]
+                    )
+                    row_count += 1
+                    distribution_count += len(distributions)
 
-                row_count = 0
+                # Queue up to twice the workers, so they stay busy while the
+                # oldest row is waited on.
+                pending = deque()
                 for row in reader:
-                    dataset_uri = row["dataset"]
-                    logger.info(f"Processing: {dataset_uri}...")
+                    if row["dataset"] in checkpoint.completed:
+                        continue
+                    pending.append(executor.submit(enrich, row))
+                    if len(pending) >= 2 * max_in_flight:
+                        write(pending.popleft().result())
+
+                while pending:
+                    write(pending.popleft().result())
+
+            checkpoint.remove()
+
+        logger.success(
+            f"Enrichment complete. Processed {row_count} datasets with "
+            f"{distribution_count} distributions. Results saved to {OUTPUT_FILE} "
+            f"and {DISTRIBUTIONS_FILE}"
+        )
+        client.log_stats()
+    except Exception as e:
+        logger.error(f"Error during enrichment: {e}")
 
-                    details = get_dataset_details(dataset_uri)
-                    row.update(details)
 
-                    filtered_row = {k: v for k, v in row.items() if k in fieldnames}
+def run_batched_enrichment(
+    client: SparqlClient,
+    initial_batch_size: int = INITIAL_BATCH_SIZE,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    resume: bool = RESUME_ENRICHMENT,
+):
+    """
+    Enrich datasets with many datasets per SPARQL request. The enriched CSV keeps
+    one row per dataset, using the first result row as before; every distinct
+    distribution is also written to DISTRIBUTIONS_FILE. Checkpointed like
+    run_enrichment.
+    """
+    rate_limiter = TokenBucket(requests_per_second)
 
-                    writer.writerow(filtered_row)
+    try:
+        with open(INITIAL_DATASETS_FILE, mode="r", encoding="utf-8") as infile:
+            rows = list(csv.DictReader(infile))
+
+        with EnrichmentCheckpoint([OUTPUT_FILE, DISTRIBUTIONS_FILE]) as checkpoint:
+            resuming = _open_checkpoint(checkpoint, resume)
+            rows = [row for row in rows if row["dataset"] not in checkpoint.completed]
+            mode = "a" if resuming else "w"
+
+            with (
+                open(OUTPUT_FILE, mode=mode, encoding="utf-8", newline="") as outfile,
+                open(
+                    DISTRIBUTIONS_FILE, mode=mode, encoding="utf-8", newline=""
+                ) as distributions_file,
+            ):
+                writer = csv.DictWriter(outfile, fieldnames=ENRICHED_FIELDNAMES)
+                distribution_writer = csv.DictWriter(
+                    distributions_file, fieldnames=DISTRIBUTION_FIELDNAMES
+                )
+                if not resuming:
+                    writer.writeheader()
+                    distribution_writer.writeheader()
+
+                row_count = distribution_count = 0
+                for row, details in enrich_in_batches(
+                    client, rows, rate_limiter, initial_batch_size
+                ):
+                    if details:
+                        row.update(details[0])
+                    writer.writerow(
+                        {k: v for k, v in row.items() if k in ENRICHED_FIELDNAMES}
+                    )
+                    distributions = distribution_rows(row["dataset"], details)
+                    distribution_writer.writerows(distributions)
+                    checkpoint.record(row["dataset"], [outfile, distributions_file])
                     row_count += 1
-                    time.sleep(0.5)
+                    distribution_count += len(distributions)
+
+            checkpoint.remove()
 
         logger.success(
-            f"Enrichment complete. Processed {row_count} datasets. Results saved to {OUTPUT_FILE}"
+            f"Enrichment complete. Processed {row_count} datasets with "
+            f"{distribution_count} distributions. Results saved to {OUTPUT_FILE} "
+            f"and {DISTRIBUTIONS_FILE}"
         )
+        client.log_stats()
     except Exception as e:
         logger.error(f"Error during enrichment: {e}")
 
 
 if __name__ == "__main__":
     logger.info("Starting dataset fetching process")
-    save_initial_datasets()
-    logger.info("\nStarting enrichment process...")
-    run_enrichment()
+    sparql_client = create_sparql_client()
+    try:
+        save_initial_datasets(sparql_client)
+        logger.info("\nStarting enrichment process...")
+        if ENRICHMENT_MODE == "batched":
+            run_batched_enrichment(sparql_client)
+        else:
+            run_enrichment(sparql_client)
+    finally:
+        sparql_client.close()
     logger.success("Process completed successfully!")
@@ -2,17 +2,30 @@ import csv
 import sys
 import re
 from pathlib import Path
-from SPARQLWrapper import SPARQLWrapper, JSON
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from logging_utils.app_logger import AppLogger
+from database.sparql_cache import SparqlCache
+from database.sparql_client import SparqlClient
+from database.theme_label_index import write_theme_label_index
 
 logger = AppLogger()
 
 INPUT_CSV = "../data/datasets_publishers_themes.csv"
 OUTPUT_CSV = "../data/datasets_with_theme_labels.csv"
+INDEX_CSV = "../data/theme_labels.csv"
+SPARQL_CACHE_FILE = str(
+    Path(__file__).parent.parent / "data" / ".cache" / "sparql.sqlite"
+)
 SPARQL_ENDPOINT = "https://publications.europa.eu/webapi/rdf/sparql"
+# Every language listed here becomes a theme_labels_<language> column.
+LANGUAGES = ["en", "it", "de"]
+
+
+def create_sparql_client() -> SparqlClient:
+    """The endpoint's client with the on-disk response cache; close() it when done."""
+    return SparqlClient(SPARQL_ENDPOINT, cache=SparqlCache(SPARQL_CACHE_FILE))
 
 
 def extract_theme_uris(themes_str: str) -> list[str]:
@@ -23,59 +36,47 @@ def extract_theme_uris(themes_str: str) -> list[str]:
     return [t for t in theme_list if t.startswith("http")]
 
 
-def fetch_theme_labels(sparql: SPARQLWrapper, theme_uris: list[str]) -> dict:
+def fetch_theme_labels(client: SparqlClient, theme_uris: list[str]) -> dict:
     if not theme_uris:
         return {}
 
     values_clause = " ".join([f"<{uri}>" for uri in theme_uris])
+    languages_clause = ", ".join([f'"{language}"' for language in LANGUAGES])
 
     query = f"""
         PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
         
-        SELECT ?theme ?labelEN ?labelIT ?labelDE
+        SELECT ?theme ?label (lang(?label) AS ?language)
         WHERE {{
           VALUES ?theme {{ {values_clause} }}
           
-          ?theme skos:prefLabel ?labelEN .
-          FILTER(lang(?labelEN) = "en")
-          
-          OPTIONAL {{
-            ?theme skos:prefLabel ?labelIT .
-            FILTER(lang(?labelIT) = "it")
-          }}
-
-          OPTIONAL {{
-            ?theme skos:prefLabel ?labelDE .
-            FILTER(lang(?labelDE) = "de")
-          }}
+          ?theme skos:prefLabel ?label .
+          FILTER(lang(?label) IN ({languages_clause}))
         }}
     """
 
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
-
     theme_labels = {}
 
     try:
-        results = sparql.query().convert()
+        results = client.query(query, "theme_labels")
 
         for binding in results["results"]["bindings"]:
             theme_uri = binding.get("theme", {}).get("value", "")
-            label_en = binding.get("labelEN", {}).get("value", "")
-            label_it = binding.get("labelIT", {}).get("value", "")
-            label_de = binding.get("labelDE", {}).get("value", "")
-
-            if theme_uri:
-                theme_labels[theme_uri] = {
-                    "en": label_en,
-                    "it": label_it,
-                    "de": label_de,
-                }
-                logger.debug(
-                    f"Fetched labels for {theme_uri}: EN='{label_en}', IT='{label_it}', DE='{label_de}'"
+            label = binding.get("label", {}).get("value", "")
+            language = binding.get("language", {}).get("value", "")
+
+            if theme_uri and language:
+                labels = theme_labels.setdefault(
+                    theme_uri, {lang: "" for lang in LANGUAGES}
                 )
+                labels[language] = label
+
+        for theme_uri, labels in theme_labels.items():
+            logger.debug(f"Fetched labels for {theme_uri}: {labels}")
 
-        logger.success(f"Fetched labels for {len(theme_labels)} themes")
+        logger.success(
+            f"Fetched labels for {len(theme_labels)} themes in {len(LANGUAGES)} languages"
+        )
         return theme_labels
 
     except Exception as e:
@@ -83,7 +84,7 @@ def fetch_theme_labels(sparql: SPARQLWrapper, theme_uris: list[str]) -> dict:
         return {}
 
 
-def process_datasets():
+def process_datasets(client: SparqlClient):
     try:
         with open(INPUT_CSV, "r", encoding="utf-8") as infile:
             reader = csv.DictReader(infile)
@@ -99,18 +100,14 @@ def process_datasets():
 
         logger.info(f"Found {len(unique_themes)} unique theme URIs")
 
-        sparql = SPARQLWrapper(SPARQL_ENDPOINT)
-        theme_labels = fetch_theme_labels(sparql, list(unique_themes))
+        # Sorted so that the query text, and with it its cache key, is stable.
+        theme_labels = fetch_theme_labels(client, sorted(unique_themes))
 
         if not theme_labels:
             logger.warning("No theme labels fetched. Continuing with empty labels.")
 
-        fieldnames = [
-            "dataset",
-            "themes",
-            "theme_labels_en",
-            "theme_labels_it",
-            "theme_labels_de",
+        fieldnames = ["dataset", "themes"] + [
+            f"theme_labels_{language}" for language in LANGUAGES
         ]
 
         with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as outfile:
@@ -121,27 +118,21 @@ def process_datasets():
                 themes_str = row.get("themes", "")
                 theme_uris = extract_theme_uris(themes_str)
 
-                labels_en = []
-                labels_it = []
-                labels_de = []
+                labels_by_language = {language: [] for language in LANGUAGES}
 
                 for theme_uri in theme_uris:
                     if theme_uri in theme_labels:
                         labels = theme_labels[theme_uri]
-                        if labels.get("en"):
-                            labels_en.append(labels["en"])
-                        if labels.get("it"):
-                            labels_it.append(labels["it"])
-                        if labels.get("de"):
-                            labels_de.append(labels["de"])
+                        for language in LANGUAGES:
+                            if labels.get(language):
+                                labels_by_language[language].append(labels[language])
 
                 enriched_row = {
                     "dataset": row.get("dataset", ""),
                     "themes": themes_str,
-                    "theme_labels_en": " | ".join(labels_en),
-                    "theme_labels_it": " | ".join(labels_it),
-                    "theme_labels_de": " | ".join(labels_de),
                 }
+                for language, labels in labels_by_language.items():
+                    enriched_row[f"theme_labels_{language}"] = " | ".join(labels)
 
                 writer.writerow(enriched_row)
 
@@ -150,11 +141,33 @@ def process_datasets():
 
         logger.success(f"Saved {len(datasets)} enriched datasets to {OUTPUT_CSV}")
 
+        # Written after OUTPUT_CSV so that main.py sees the index as current.
+        write_theme_label_index(
+            {
+                theme_uri: {
+                    language: label
+                    for language, label in theme_labels.get(theme_uri, {}).items()
+                    if label
+                }
+                for theme_uri in sorted(unique_themes)
+            },
+            LANGUAGES,
+            INDEX_CSV,
+        )
+        logger.success(
+            f"Saved labels of {len(unique_themes)} themes to index {INDEX_CSV}"
+        )
+        client.log_stats()
+
     except Exception as e:
         logger.error(f"Error processing datasets: {e}")
 
 
 if __name__ == "__main__":
     logger.info("Starting theme label enrichment process")
-    process_datasets()
+    sparql_client = create_sparql_client()
+    try:
+        process_datasets(sparql_client)
+    finally:
+        sparql_client.close()
     logger.success("Theme label enrichment completed")
@@ -0,0 +1,68 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Type, TypeVar
+import numpy as np
+from database.models import Dataset, Publisher, Theme
+
+T = TypeVar("T")
+
+
+def _intern(ids: Dict[str, int], instances: List[T], uri: str, instance: T) -> T:
+    index = ids.setdefault(uri, len(instances))
+    if index == len(instances):
+        instances.append(instance)
+    return instances[index]
+
+
+def _intern_ids(
+    ids: Dict[str, int], instances: List[T], uris: Iterable[str], model: Type[T]
+) -> np.ndarray:
+    def intern_id(uri: str) -> int:
+        if uri not in ids:
+            _intern(ids, instances, uri, model(uri=uri))
+        return ids[uri]
+
+    return np.fromiter(map(intern_id, uris), dtype=np.int64)
+
+
+@dataclass
+class InternRegistry:
+    """
+    One shared Publisher / Theme instance per distinct URI. Each URI gets a small
+    integer ID in the order it was first seen, so publishers[publisher_id(uri)] is
+    the shared instance and the IDs can stand in for the URIs when deduplicating
+    or exporting hub nodes.
+    """
+
+    publishers: List[Publisher] = field(default_factory=list)
+    themes: List[Theme] = field(default_factory=list)
+    _publisher_ids: Dict[str, int] = field(default_factory=dict, repr=False)
+    _theme_ids: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def publisher(self, publisher: Publisher) -> Publisher:
+        return _intern(self._publisher_ids, self.publishers, publisher.uri, publisher)
+
+    def theme(self, theme: Theme) -> Theme:
+        return _intern(self._theme_ids, self.themes, theme.uri, theme)
+
+    def publisher_id(self, uri: str) -> int:
+        return self._publisher_ids[uri]
+
+    def theme_id(self, uri: str) -> int:
+        return self._theme_ids[uri]
+
+    def publisher_ids(self, uris: Iterable[str]) -> np.ndarray:
+        """The IDs of already validated publisher URIs, registering new ones."""
+        return _intern_ids(self._publisher_ids, self.publishers, uris, Publisher)
+
+    def theme_ids(self, uris: Iterable[str]) -> np.ndarray:
+        """The IDs of already validated theme URIs, registering new ones."""
+        return _intern_ids(self._theme_ids, self.themes, uris, Theme)
+
+    def intern_dataset(self, dataset: Dataset) -> Dataset:
+        """Point the dataset at the shared instances of its publisher and themes."""
+        dataset.publisher = self.publisher(dataset.publisher)
+        dataset.themes = [self.theme(theme) for theme in dataset.themes]
+        return dataset
+
+    def intern_datasets(self, datasets: Iterable[Dataset]) -> List[Dataset]:
+        return [self.intern_dataset(dataset) for dataset in datasets]
@@ -0,0 +1,227 @@
+import csv
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+from database.batch_queries import HASHED_FIELDS, row_content_hash
+from database.bulk_import import BULK_IMPORT_DIR
+from database.csv_cache import cached_frame
+from database.normalization import merge_dataset_frames, normalize_datasets_frame
+from database.theme_label_index import THEME_LABEL_INDEX_CSV, load_theme_label_index
+
+DEFAULT_ROWS_PER_TRANSACTION = 1000
+
+INITIAL_CSV = Path("data/datasets_publishers_themes.csv")
+ENRICHED_CSV = Path("data/enriched_datasets.csv")
+DISTRIBUTIONS_CSV = Path("data/dataset_distributions.csv")
+THEME_LABELS_CSV = Path("data/datasets_with_theme_labels.csv")
+THEME_LABEL_INDEX = Path(THEME_LABEL_INDEX_CSV)
+# Written by stage_csv_files: the row_content_hash of every source row.
+DATASET_HASHES_CSV = Path("data/.cache/dataset_hashes.csv")
+
+DATASETS_CYPHER = Path("queries/datasets_and_relationships.cypher")
+THEME_LABELS_CYPHER = Path("queries/theme_labels.cypher")
+
+_NODE_LABEL_PATTERN = re.compile(r"\(\w*:(\w+)")
+_PARAMETER_PATTERN = re.compile(r"\$(\w+)")
+
+_THEMES = "[theme IN split(row.themes, '|') WHERE trim(theme) <> '' | trim(theme)]"
+
+
+@dataclass(frozen=True)
+class LoadCsvSource:
+    """How the statements for one node label read their parameters from a CSV row."""
+
+    csv_file: Path
+    preamble: str
+    bindings: Dict[str, str]
+
+
+# Keyed by the last node label a statement mentions, i.e. the node it creates or
+# the target of the relationship it connects to the Dataset.
+LOAD_CSV_SOURCES: Dict[str, LoadCsvSource] = {
+    "Dataset": LoadCsvSource(
+        DATASET_HASHES_CSV,
+        "",
+        {"uri": "row.dataset", "content_hash": "row.content_hash"},
+    ),
+    "Title": LoadCsvSource(
+        INITIAL_CSV,
+        "",
+        {
+            "value": "row.datasetTitle",
+            "title_value": "row.datasetTitle",
+            "dataset_uri": "row.dataset",
+        },
+    ),
+    "Publisher": LoadCsvSource(
+        INITIAL_CSV,
+        "",
+        {
+            "uri": "row.publisher",
+            "publisher_uri": "row.publisher",
+            "dataset_uri": "row.dataset",
+        },
+    ),
+    "Theme": LoadCsvSource(
+        INITIAL_CSV,
+        f"UNWIND {_THEMES} AS theme",
+        {"uri": "theme", "theme_uri": "theme", "dataset_uri": "row.dataset"},
+    ),
+    "LandingPage": LoadCsvSource(
+        ENRICHED_CSV,
+        "",
+        {
+            "url": "trim(row.landingPage)",
+            "landing_page_url": "trim(row.landingPage)",
+            "dataset_uri": "row.dataset",
+        },
+    ),
+    # Every distribution, not just the first one the enriched CSV keeps.
+    "DownloadURL": LoadCsvSource(
+        DISTRIBUTIONS_CSV,
+        "",
+        {
+            "url": "trim(row.downloadURL)",
+            "download_url": "trim(row.downloadURL)",
+            "dataset_uri": "row.dataset",
+        },
+    ),
+    # One index row per theme (see database.theme_label_index); blank labels are
+    # skipped by the non-empty conditions.
+    "ThemeLabel": LoadCsvSource(
+        THEME_LABEL_INDEX,
+        "UNWIND $languages AS language",
+        {
+            "theme_uri": "row.theme",
+            "title": "trim(row['theme_labels_' + language])",
+            "language": "language",
+        },
+    ),
+}
+
+
+def read_cypher_statements(cypher_file: Path) -> List[str]:
+    lines = [line.split("//")[0] for line in cypher_file.read_text().splitlines()]
+    return [
+        " ".join(stmt.split()) for stmt in "\n".join(lines).split(";") if stmt.strip()
+    ]
+
+
+def to_load_csv_statement(statement: str) -> str:
+    """Wrap a parameterized loader statement in LOAD CSV ... CALL IN TRANSACTIONS."""
+    labels = _NODE_LABEL_PATTERN.findall(statement)
+    if not labels or labels[-1] not in LOAD_CSV_SOURCES:
+        raise ValueError(f"No LOAD CSV source for statement: {statement}")
+
+    source = LOAD_CSV_SOURCES[labels[-1]]
+    parameters = list(dict.fromkeys(_PARAMETER_PATTERN.findall(statement)))
+    missing = [name for name in parameters if name not in source.bindings]
+    if missing:
+        raise ValueError(f"No LOAD CSV binding for {missing} in: {statement}")
+
+    bindings = ", ".join(f"{source.bindings[name]} AS {name}" for name in parameters)
+    conditions = " AND ".join(
+        f"{name} IS NOT NULL AND {name} <> ''" for name in parameters
+    )
+    body = _PARAMETER_PATTERN.sub(r"\1", statement)
+
+    clauses = [
+        f"LOAD CSV WITH HEADERS FROM 'file:///{source.csv_file.name}' AS row",
+        "CALL { WITH row",
+        source.preamble,
+        f"WITH {bindings} WHERE {conditions}",
+        body,
+        "} IN TRANSACTIONS OF $rows_per_transaction ROWS",
+    ]
+    return " ".join(clause for clause in clauses if clause)
+
+
+def build_load_csv_statements(
+    cypher_files: tuple[Path, ...] = (DATASETS_CYPHER, THEME_LABELS_CYPHER),
+) -> List[str]:
+    return [
+        to_load_csv_statement(statement)
+        for cypher_file in cypher_files
+        for statement in read_cypher_statements(cypher_file)
+    ]
+
+
+def theme_label_languages(theme_labels_csv: Path = THEME_LABEL_INDEX) -> List[str]:
+    with open(theme_labels_csv, mode="r", encoding="utf-8") as infile:
+        header = next(csv.reader(infile))
+    return [
+        column.removeprefix("theme_labels_")
+        for column in header
+        if column.startswith("theme_labels_")
+    ]
+
+
+def write_dataset_hashes_csv(path: Path = DATASET_HASHES_CSV) -> None:
+    """
+    Hash the merged source rows the way the Cypher writers do, since LOAD CSV
+    cannot compute row_content_hash on the server. The hashes are cached like the
+    normalized tables, so they are only computed again after a source CSV
+    changed, and reuse the normalized frame the other load modes cached.
+    """
+    sources = [str(INITIAL_CSV), str(ENRICHED_CSV)]
+
+    def normalize() -> pd.DataFrame:
+        return normalize_datasets_frame(
+            merge_dataset_frames(pd.read_csv(INITIAL_CSV), pd.read_csv(ENRICHED_CSV))
+        )
+
+    def hash_rows() -> pd.DataFrame:
+        normalized_df = cached_frame("normalized_datasets", sources, normalize)
+        return pd.DataFrame(
+            {
+                "dataset": normalized_df["uri"],
+                "content_hash": [
+                    row_content_hash(row)
+                    for row in normalized_df[HASHED_FIELDS].to_dict("records")
+                ],
+            }
+        )
+
+    hashes = cached_frame("dataset_hashes", sources, hash_rows)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    hashes.to_csv(path, index=False)
+
+
+def stage_csv_files(
+    import_dir: Path = BULK_IMPORT_DIR, symlink: bool = False
+) -> List[Path]:
+    """
+    Make the source CSVs visible to the server's import directory, refreshing the
+    theme label index and the dataset hashes first. Symlinks only work when the
+    link target is reachable from the server as well, so the files are copied by
+    default (and only when they changed).
+    """
+    load_theme_label_index(str(THEME_LABELS_CSV), str(THEME_LABEL_INDEX))
+    write_dataset_hashes_csv()
+    import_dir.mkdir(parents=True, exist_ok=True)
+    staged = []
+
+    for source in (
+        INITIAL_CSV,
+        ENRICHED_CSV,
+        DISTRIBUTIONS_CSV,
+        THEME_LABEL_INDEX,
+        DATASET_HASHES_CSV,
+    ):
+        target = import_dir / source.name
+        if symlink:
+            if target.is_symlink() or target.exists():
+                target.unlink()
+            target.symlink_to(source.resolve())
+        elif (
+            not target.exists()
+            or target.stat().st_size != source.stat().st_size
+            or target.stat().st_mtime < source.stat().st_mtime
+        ):
+            shutil.copy2(source, target)
+        staged.append(target)
+
+    return staged
@@ -0,0 +1,252 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from database.models import (
+    Dataset,
+    DatasetTitle,
+    Publisher,
+    Theme,
+    LandingPage,
+    DownloadURL,
+)
+from database.fast_validation import (
+    record_validation_error,
+    validate_dataset_records,
+)
+from database.interning import InternRegistry
+from logging_utils.app_logger import AppLogger
+
+# Columns of the frame returned by normalize_datasets_frame, in the order the
+# Dataset model declares them.
+NORMALIZED_COLUMNS = [
+    "uri",
+    "title",
+    "publisher",
+    "themes",
+    "landing_page",
+    "download_url",
+    "issued",
+    "status",
+    "access_url",
+    "byte_size",
+    "keywords",
+]
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(np.nan, index=df.index, dtype=object)
+
+
+def _none_series(index: pd.Index) -> pd.Series:
+    return pd.Series([None] * len(index), index=index, dtype=object)
+
+
+def _raw_or_none(column: pd.Series) -> pd.Series:
+    return column.astype(object).where(column.notna(), None)
+
+
+def _stripped(column: pd.Series) -> pd.Series:
+    """str(value).strip() for present values, "" for missing ones."""
+    return column.astype("string").str.strip().fillna("")
+
+
+def _stripped_or_none(column: pd.Series) -> pd.Series:
+    stripped = _stripped(column)
+    return stripped.astype(object).where(stripped != "", None)
+
+
+def normalize_themes(column: pd.Series) -> pd.Series:
+    """Split "|"-joined theme URIs into lists of stripped, non-empty URIs."""
+    # str() of a missing value is "nan", which the row-wise loader kept as a theme.
+    split = (
+        column.astype(object).where(column.notna(), "nan").astype(str).str.split("|")
+    )
+    owners = np.repeat(np.arange(len(split)), split.str.len().to_numpy())
+    parts = split.explode()
+    stripped = parts.str.strip()
+
+    # Most rows are already clean; only rebuild the lists that need stripping or
+    # contain empty entries.
+    themes = split.tolist()
+    dirty = ((stripped != parts) | (stripped == "")).to_numpy()
+    for position in np.unique(owners[dirty]):
+        themes[position] = [
+            theme.strip() for theme in themes[position] if theme.strip()
+        ]
+    return pd.Series(themes, index=column.index, dtype=object)
+
+
+def normalize_byte_sizes(column: pd.Series) -> pd.Series:
+    present = _stripped(column) != ""
+    byte_sizes = _none_series(column.index)
+
+    if pd.api.types.is_numeric_dtype(column):
+        # Non-finite sizes are passed through so that model validation rejects them.
+        finite = present & np.isfinite(column)
+        byte_sizes[finite] = np.trunc(column[finite]).astype("int64").tolist()
+        byte_sizes[present & ~finite] = column[present & ~finite]
+    else:
+        byte_sizes[present] = _stripped(column)[present]
+    return byte_sizes
+
+
+def normalize_keywords(column: pd.Series) -> pd.Series:
+    present = _stripped(column) != ""
+    keywords = _none_series(column.index)
+    keywords[present] = column[present].astype("string").str.split(", ")
+    return keywords
+
+
+def normalize_datasets_frame(merged_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean the merged initial/enriched CSV frame column by column into the fields of
+    the Dataset model. Missing optional values become None; title and publisher are
+    left as read so that model validation reports invalid rows.
+    """
+    if "datasetTitle" in merged_df.columns:
+        titles = merged_df["datasetTitle"]
+    elif "title" in merged_df.columns:
+        titles = merged_df["title"]
+    else:
+        titles = pd.Series("", index=merged_df.index, dtype=object)
+
+    if "themes" in merged_df.columns:
+        themes = normalize_themes(merged_df["themes"])
+    else:
+        themes = pd.Series([[] for _ in merged_df.index], index=merged_df.index)
+
+    return pd.DataFrame(
+        {
+            "uri": merged_df["dataset"].astype(object),
+            "title": titles.astype(object),
+            "publisher": (
+                merged_df["publisher"].astype(object)
+                if "publisher" in merged_df.columns
+                else ""
+            ),
+            "themes": themes,
+            "landing_page": _stripped_or_none(_column(merged_df, "landingPage")),
+            "download_url": _stripped_or_none(_column(merged_df, "downloadURL")),
+            "issued": _raw_or_none(_column(merged_df, "issued")),
+            "status": _raw_or_none(_column(merged_df, "status")),
+            "access_url": _raw_or_none(_column(merged_df, "accessURL")),
+            "byte_size": normalize_byte_sizes(_column(merged_df, "byteSize")),
+            "keywords": normalize_keywords(_column(merged_df, "keywords")),
+        },
+        index=merged_df.index,
+        columns=NORMALIZED_COLUMNS,
+    )
+
+
+def merge_dataset_frames(
+    initial_df: pd.DataFrame, enriched_df: pd.DataFrame
+) -> pd.DataFrame:
+    return initial_df.merge(
+        enriched_df, on="dataset", how="left", suffixes=("_initial", "_enriched")
+    )
+
+
+def distribution_download_urls(distributions_df: pd.DataFrame) -> List[Dict[str, str]]:
+    """
+    One {"dataset_uri", "download_url"} row per distinct download URL of each
+    dataset in the distributions CSV written by fetch_data.
+    """
+    download_urls = _stripped_or_none(_column(distributions_df, "downloadURL"))
+    rows = pd.DataFrame(
+        {"dataset_uri": distributions_df["dataset"], "download_url": download_urls}
+    )
+    return rows[rows["download_url"].notna()].drop_duplicates().to_dict("records")
+
+
+def build_dataset(row: Any) -> Dataset:
+    """Validate one row of a normalized frame (as produced by itertuples)."""
+    return Dataset(
+        uri=row.uri,
+        title=DatasetTitle(value=row.title),
+        publisher=Publisher(uri=row.publisher),
+        themes=[Theme(uri=theme) for theme in row.themes],
+        landing_page=(
+            LandingPage(url=row.landing_page) if row.landing_page is not None else None
+        ),
+        download_url=(
+            DownloadURL(url=row.download_url) if row.download_url is not None else None
+        ),
+        issued=row.issued,
+        status=row.status,
+        access_url=row.access_url,
+        byte_size=row.byte_size,
+        keywords=row.keywords,
+    )
+
+
+def dataset_records(normalized_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Nested Dataset records of a normalized frame, for validate_dataset_records."""
+    return [
+        {
+            "uri": uri,
+            "title": {"value": title},
+            "publisher": {"uri": publisher},
+            "themes": [{"uri": theme} for theme in themes],
+            "landing_page": {"url": landing_page} if landing_page is not None else None,
+            "download_url": {"url": download_url} if download_url is not None else None,
+            "issued": issued,
+            "status": status,
+            "access_url": access_url,
+            "byte_size": byte_size,
+            "keywords": keywords,
+        }
+        for (
+            uri,
+            title,
+            publisher,
+            themes,
+            landing_page,
+            download_url,
+            issued,
+            status,
+            access_url,
+            byte_size,
+            keywords,
+        ) in zip(*(normalized_df[column] for column in NORMALIZED_COLUMNS))
+    ]
+
+
+def build_datasets(
+    normalized_df: pd.DataFrame,
+    fast_validation: bool = False,
+    registry: Optional[InternRegistry] = None,
+) -> List[Dataset]:
+    """
+    Validate the rows of a normalized frame into Dataset models. Rows that fail
+    validation are logged with their row number (index + 2) and skipped.
+    With fast_validation the whole frame is validated as one list in pydantic-core
+    rather than row by row.
+    Publishers and themes are shared through `registry` (a new one if not given).
+    """
+    logger = AppLogger()
+    registry = registry if registry is not None else InternRegistry()
+
+    if fast_validation:
+        datasets, record_errors = validate_dataset_records(
+            dataset_records(normalized_df)
+        )
+        for position, errors in record_errors.items():
+            logger.error(
+                f"Failed to parse dataset at row {normalized_df.index[position] + 2}: "
+                f"{record_validation_error(errors)}"
+            )
+        return registry.intern_datasets(
+            dataset for dataset in datasets if dataset is not None
+        )
+
+    datasets = []
+    for row in normalized_df.itertuples():
+        try:
+            datasets.append(registry.intern_dataset(build_dataset(row)))
+        except Exception as e:
+            logger.error(f"Failed to parse dataset at row {row.Index + 2}: {e}")
+            continue
+
+    return datasets
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from database.batch_queries import DEFAULT_BATCH_SIZE, chunked
+from database.dataset_batch import DatasetBatch
+from database.fast_validation import record_validation_error, validate_dataset_records
+from database.normalization import dataset_records
+
+DEFAULT_VALIDATION_WORKERS = os.cpu_count() or 1
+DEFAULT_ROWS_PER_TASK = 10 * DEFAULT_BATCH_SIZE
+
+
+def _validate_rows(
+    normalized_df: pd.DataFrame,
+) -> Tuple[DatasetBatch, Dict[int, List[Dict[str, Any]]]]:
+    """
+    Worker: validate one row range of a normalized frame. Returns the valid rows
+    as a DatasetBatch and the raw errors of the others keyed by frame index.
+    Nothing is logged here, so that the parent can report errors in row order.
+    """
+    datasets, record_errors = validate_dataset_records(dataset_records(normalized_df))
+    valid = np.fromiter(
+        (dataset is not None for dataset in datasets), dtype=bool, count=len(datasets)
+    )
+    return DatasetBatch.from_normalized_frame(normalized_df[valid]), {
+        int(normalized_df.index[position]): errors
+        for position, errors in record_errors.items()
+    }
+
+
+def validate_frame_in_processes(
+    normalized_df: pd.DataFrame,
+    workers: int = DEFAULT_VALIDATION_WORKERS,
+    rows_per_task: int = DEFAULT_ROWS_PER_TASK,
+) -> Tuple[List[DatasetBatch], List[dict]]:
+    """
+    Validate a frame from normalize_datasets_frame in `workers` processes, one
+    task per `rows_per_task` rows. Returns one DatasetBatch per task and an error
+    record (row, error_type, message, dataset_uri) per invalid row, both in row
+    order whatever the number of workers. The validation log is written here, as
+    each error is collected.
+    """
+    frames = [
+        normalized_df.iloc[rows.start : rows.stop]
+        for rows in chunked(range(len(normalized_df)), rows_per_task)
+    ]
+
+    if workers > 1 and len(frames) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_validate_rows, frames))
+    else:
+        results = [_validate_rows(frame) for frame in frames]
+
+    batches, errors = [], []
+    for batch, row_errors in results:
+        batches.append(batch)
+        for index, record_errors in row_errors.items():
+            errors.append(
+                {
+                    "row": index + 2,
+                    "error_type": "ValueError",
+                    "message": str(record_validation_error(record_errors)),
+                    "dataset_uri": normalized_df.at[index, "uri"],
+                }
+            )
+
+    return batches, errors
@@ -0,0 +1,120 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens are added per second, up to `capacity`.
+    acquire() blocks until a token is available, so no more than `capacity`
+    requests start at once and the long-run request rate stays at `rate`.
+    """
+
+    rate: float
+    capacity: float = 1.0
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD limit on requests in flight. Each healthy response raises the limit by
+    1/limit, about one per round of requests; a throttled response halves it, and
+    so do `patience` responses in a row slower than `latency_tolerance` times
+    their baseline. The baseline is an EWMA of the latencies of each query class,
+    as a catalog page and a batch of details take very different times; since it
+    follows every response, only a sharp and sustained rise counts as slow. Only
+    requests sent after the last decrease can decrease the limit again, so one
+    slow burst halves it once rather than once per request in it.
+    """
+
+    initial: float = 4.0
+    minimum: float = 1.0
+    maximum: float = 32.0
+    latency_tolerance: float = 2.0
+    smoothing: float = 0.1
+    patience: int = 3
+    limit: float = field(init=False)
+    _in_flight: int = field(init=False, default=0, repr=False)
+    _baselines: Dict[str, float] = field(init=False, default_factory=dict, repr=False)
+    _slow_streaks: Dict[str, int] = field(init=False, default_factory=dict, repr=False)
+    _decreased_at: float = field(init=False, default=0.0, repr=False)
+    _condition: threading.Condition = field(
+        default_factory=threading.Condition, repr=False
+    )
+
+    def __post_init__(self):
+        self.limit = min(max(self.initial, self.minimum), self.maximum)
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to hand to release()."""
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(
+        self,
+        started: float,
+        query_class: str = "default",
+        overloaded: bool = False,
+        sample: bool = True,
+    ) -> None:
+        """
+        Free the slot taken at `started`. With sample=False the response tells
+        nothing about load (an error unrelated to it) and the limit is left alone.
+        """
+        now = time.monotonic()
+        latency = now - started
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                self._decrease(started, now)
+            elif sample:
+                baseline = self._baselines.get(query_class, latency)
+                if latency > self.latency_tolerance * baseline:
+                    streak = self._slow_streaks.get(query_class, 0) + 1
+                else:
+                    streak = 0
+                self._slow_streaks[query_class] = streak
+                self._baselines[query_class] = (
+                    baseline + (latency - baseline) * self.smoothing
+                )
+                if streak >= self.patience:
+                    self._decrease(started, now)
+                    self._slow_streaks[query_class] = 0
+                elif not streak:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _decrease(self, started: float, now: float) -> None:
+        if started >= self._decreased_at:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._decreased_at = now
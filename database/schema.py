@@ -0,0 +1,96 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from database.batch_queries import (
+    COLUMNAR_DATASET_STATEMENTS,
+    DATASET_BATCH_STATEMENTS,
+    DISTRIBUTION_BATCH_STATEMENTS,
+    HUB_NODE_STATEMENTS,
+    THEME_LABEL_BATCH_STATEMENTS,
+)
+from database.delta_sync import DELETE_DATASETS, DELETE_STALE_RELATIONSHIPS
+from database.load_csv import (
+    DATASETS_CYPHER,
+    THEME_LABELS_CYPHER,
+    read_cypher_statements,
+)
+
+INDEX_WAIT_TIMEOUT_SECONDS = 300
+
+AWAIT_INDEXES = "CALL db.awaitIndexes($timeout)"
+LIST_INDEX_KEYS = (
+    "SHOW INDEXES YIELD labelsOrTypes, properties, state, entityType "
+    "WHERE entityType = 'NODE' "
+    "RETURN labelsOrTypes, properties, state"
+)
+
+# Matches property-map node patterns such as (d:Dataset {uri: row.uri}) or
+# (:Title {value: value}) and captures the label and the map body.
+_KEYED_NODE_PATTERN = re.compile(r"\(\w*:(\w+)\s*\{([^}]*)\}\)")
+_MAP_KEY_PATTERN = re.compile(r"(\w+)\s*:")
+
+SchemaKey = Tuple[str, Tuple[str, ...]]
+
+
+def loader_statements() -> List[str]:
+    """Every MERGE/MATCH statement the loaders can run."""
+    statements = [query for _, query in DATASET_BATCH_STATEMENTS]
+    statements += [query for _, query in COLUMNAR_DATASET_STATEMENTS]
+    statements += [query for _, _, query in HUB_NODE_STATEMENTS]
+    statements += [query for _, query in DISTRIBUTION_BATCH_STATEMENTS]
+    statements += [query for _, query in THEME_LABEL_BATCH_STATEMENTS]
+    statements += [DELETE_STALE_RELATIONSHIPS, DELETE_DATASETS]
+    for cypher_file in (DATASETS_CYPHER, THEME_LABELS_CYPHER):
+        statements += read_cypher_statements(cypher_file)
+    return statements
+
+
+def derive_schema_keys(statements: Iterable[str]) -> Set[SchemaKey]:
+    """Collect the (label, properties) pairs used as MERGE/MATCH keys."""
+    keys = set()
+    for statement in statements:
+        for label, property_map in _KEYED_NODE_PATTERN.findall(statement):
+            properties = tuple(_MAP_KEY_PATTERN.findall(property_map))
+            if properties:
+                keys.add((label, properties))
+    return keys
+
+
+def _snake_case(label: str) -> str:
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", "_", label).lower()
+
+
+def constraint_statement(label: str, properties: Tuple[str, ...]) -> str:
+    name = f"{_snake_case(label)}_{'_'.join(properties)}_unique"
+    if len(properties) == 1:
+        requirement = f"n.{properties[0]}"
+    else:
+        requirement = "(" + ", ".join(f"n.{prop}" for prop in properties) + ")"
+    return (
+        f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+        f"FOR (n:{label}) REQUIRE {requirement} IS UNIQUE"
+    )
+
+
+def missing_schema_keys(
+    required: Set[SchemaKey], index_records: Iterable[Dict]
+) -> Dict[SchemaKey, str]:
+    """
+    Return the required keys without an ONLINE index, mapped to the state of the
+    index found for them ("missing" if there is none).
+    """
+    states = {}
+    for record in index_records:
+        labels = record["labelsOrTypes"] or []
+        properties = tuple(record["properties"] or [])
+        if len(labels) == 1:
+            states[(labels[0], properties)] = record["state"]
+
+    return {
+        key: states.get(key, "missing")
+        for key in sorted(required)
+        if states.get(key) != "ONLINE"
+    }
+
+
+def required_schema_keys() -> Set[SchemaKey]:
+    return derive_schema_keys(loader_statements())
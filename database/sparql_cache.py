@@ -0,0 +1,182 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from logging_utils.app_logger import AppLogger
+
+# Seconds a response stays fresh, per kind of query. Theme vocabularies hardly
+# ever change; the catalog itself does.
+QUERY_TTLS = {
+    "catalog": 24 * 3600,
+    "details": 7 * 24 * 3600,
+    "theme_labels": 90 * 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Hits only refresh an entry's access time for LRU eviction once it is older than
+# this, and the refreshed times are written in batches of ACCESS_FLUSH_SIZE.
+ACCESS_REFRESH_SECONDS = 3600
+ACCESS_FLUSH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    query_class TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response BLOB NOT NULL
+)
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so that re-indented copies of a query share a key."""
+    return " ".join(query.split())
+
+
+def cache_key(endpoint: str, query: str) -> str:
+    return hashlib.sha256(f"{endpoint}\n{normalize_query(query)}".encode()).hexdigest()
+
+
+class SparqlCache:
+    """
+    SQLite store of JSON SPARQL responses keyed by endpoint and normalized query.
+    Entries expire after the TTL of their query class; once the store is over
+    `max_bytes` the least recently used entries are evicted, with access times
+    kept to ACCESS_REFRESH_SECONDS. Safe to share between threads; close() writes
+    the access times still pending.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttls = QUERY_TTLS if ttls is None else ttls
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stale_hits": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        (self._total_bytes,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        self._accessed: Dict[str, float] = {}
+
+    def get(self, key: str, query_class: str, allow_stale: bool = False):
+        """The cached response, or None if missing or expired (unless allow_stale)."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT created, accessed, response FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            created, accessed, response = row
+            now = time.time()
+            if not allow_stale and now - created > self.ttls.get(
+                query_class, DEFAULT_TTL
+            ):
+                return None
+            if now - accessed > ACCESS_REFRESH_SECONDS:
+                self._accessed[key] = now
+                if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                    self._flush_accessed()
+                    self._connection.commit()
+        return json.loads(zlib.decompress(response))
+
+    def put(self, key: str, query_class: str, response: dict) -> None:
+        blob = zlib.compress(json.dumps(response).encode())
+        now = time.time()
+        with self._lock:
+            replaced = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query_class, now, now, len(blob), blob),
+            )
+            self._accessed.pop(key, None)
+            self._total_bytes += len(blob) - (replaced[0] if replaced else 0)
+            if self._total_bytes > self.max_bytes:
+                self._flush_accessed()
+                self._evict()
+            self._connection.commit()
+
+    def _flush_accessed(self) -> None:
+        self._connection.executemany(
+            "UPDATE responses SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _evict(self) -> None:
+        evicted = 0
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def query(
+        self,
+        endpoint: str,
+        query: str,
+        query_class: str,
+        fetch: Callable[[], dict],
+    ) -> dict:
+        """
+        Return the JSON result of `query` on `endpoint`: from the cache if a fresh
+        entry exists, otherwise from `fetch`, which is then stored. If `fetch`
+        fails and an expired entry is still stored, that entry is returned
+        instead of raising.
+        """
+        key = cache_key(endpoint, query)
+        response = self.get(key, query_class)
+        if response is not None:
+            self._count("hits")
+            return response
+
+        self._count("misses")
+        try:
+            response = fetch()
+        except Exception as e:
+            stale = self.get(key, query_class, allow_stale=True)
+            if stale is None:
+                raise
+            self._count("stale_hits")
+            AppLogger().warning(f"Using expired cached {query_class} response: {e}")
+            return stale
+
+        self.put(key, query_class, response)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_accessed()
+            self._connection.commit()
+            self._connection.close()
+
+    def log_stats(self) -> None:
+        AppLogger().info(
+            f"SPARQL cache {self.path}: {self.stats['hits']} hits, "
+            f"{self.stats['misses']} misses, {self.stats['stale_hits']} stale hits, "
+            f"{self.stats['evictions']} evictions"
+        )
@@ -0,0 +1,214 @@
+import gzip
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+from logging_utils.app_logger import AppLogger
+from database.rate_limiting import AdaptiveConcurrencyLimit, TokenBucket
+from database.sparql_cache import SparqlCache
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 120.0
+# 429 and 503 mean the endpoint wants less load; the others are worth a retry.
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = THROTTLE_STATUSES | {502, 504}
+USER_AGENT = "dataset-graph-loader (SPARQL client)"
+
+
+class SparqlError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class SparqlClient:
+    """
+    SPARQL client for one endpoint, safe to share between threads. Each thread
+    keeps one keep-alive connection, responses are requested gzipped, and queries
+    are POSTed so that long VALUES blocks fit. Throttling (429/503), gateway
+    errors and connection failures are retried with exponential backoff, or
+    after the server's Retry-After. A keep-alive connection the server dropped
+    while idle is reconnected once without counting as a failure. An
+    AdaptiveConcurrencyLimit caps requests in flight; only timeouts and
+    throttling count as overload. Responses go through `cache` when one is given;
+    only requests that miss it wait for the rate limiter or a concurrency slot.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        cache: Optional[SparqlCache] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+    ):
+        url = urlsplit(endpoint)
+        self.endpoint = endpoint
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.concurrency = concurrency or AdaptiveConcurrencyLimit()
+        self.stats = {"requests": 0, "retries": 0, "reconnects": 0}
+        self._connection_class = (
+            HTTPSConnection if url.scheme == "https" else HTTPConnection
+        )
+        self._netloc = url.netloc
+        self._path = url.path + (f"?{url.query}" if url.query else "")
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connection_class(self._netloc, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _send(self, connection, query: str):
+        connection.request(
+            "POST",
+            self._path,
+            body=urlencode({"query": query}),
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Accept": "application/sparql-results+json",
+                "Accept-Encoding": "gzip",
+                "User-Agent": USER_AGENT,
+            },
+        )
+        response = connection.getresponse()
+        return response, response.read()
+
+    def _post(self, query: str):
+        connection = self._connection()
+        reused = connection.sock is not None
+        while True:
+            try:
+                response, body = self._send(connection, query)
+                break
+            except (ConnectionResetError, BrokenPipeError):
+                # The next request on this connection reconnects. A reused socket
+                # was most likely closed by the server while idle: try a fresh one.
+                connection.close()
+                if not reused:
+                    raise
+                reused = False
+                with self._lock:
+                    self.stats["reconnects"] += 1
+            except (OSError, HTTPException):
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return response, body
+
+    def _fetch(
+        self, query: str, query_class: str, rate_limiter: Optional[TokenBucket]
+    ) -> dict:
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            started = self.concurrency.acquire()
+            with self._lock:
+                self.stats["requests"] += 1
+
+            retry_after = None
+            try:
+                response, body = self._post(query)
+            except (OSError, HTTPException) as e:
+                self.concurrency.release(
+                    started,
+                    query_class,
+                    overloaded=isinstance(e, TimeoutError),
+                    sample=False,
+                )
+                error = e
+            else:
+                self.concurrency.release(
+                    started,
+                    query_class,
+                    overloaded=response.status in THROTTLE_STATUSES,
+                    sample=response.status == 200,
+                )
+                if response.status == 200:
+                    return json.loads(body)
+                error = SparqlError(
+                    response.status, body[:200].decode("utf-8", "replace").strip()
+                )
+                if response.status not in RETRY_STATUSES:
+                    raise error
+                retry_after = retry_after_seconds(response.getheader("Retry-After"))
+
+            if attempt == self.max_retries:
+                raise error
+            delay = (
+                retry_after
+                if retry_after is not None
+                else min(MAX_BACKOFF, BACKOFF_BASE * 2**attempt)
+                * random.uniform(0.5, 1.0)
+            )
+            with self._lock:
+                self.stats["retries"] += 1
+            AppLogger().warning(
+                f"SPARQL request to {self.endpoint} failed ({error}), "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def query(
+        self,
+        query: str,
+        query_class: str,
+        rate_limiter: Optional[TokenBucket] = None,
+    ) -> dict:
+        """Return the JSON result of `query`; `query_class` picks the cache TTL."""
+        if self.cache is None:
+            return self._fetch(query, query_class, rate_limiter)
+        return self.cache.query(
+            self.endpoint,
+            query,
+            query_class,
+            lambda: self._fetch(query, query_class, rate_limiter),
+        )
+
+    def log_stats(self) -> None:
+        AppLogger().info(
+            f"SPARQL client {self.endpoint}: {self.stats['requests']} requests, "
+            f"{self.stats['retries']} retries, {self.stats['reconnects']} "
+            f"reconnects, concurrency limit "
+            f"{self.concurrency.limit:.1f}"
+        )
+        if self.cache is not None:
+            self.cache.log_stats()
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,115 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Sequence
+import pandas as pd
+from database.batch_queries import DEFAULT_BATCH_SIZE, chunked
+from database.dataset_batch import DatasetBatch
+from database.interning import InternRegistry
+from database.models import Dataset
+from database.normalization import (
+    build_datasets,
+    merge_dataset_frames,
+    normalize_datasets_frame,
+)
+from logging_utils.app_logger import AppLogger
+
+ENRICHED_TABLE = "enriched"
+# Older SQLite builds cap a statement at 999 bound parameters.
+MAX_LOOKUP_PARAMETERS = 900
+
+
+def index_enriched_csv(
+    enriched_csv_path: str,
+    connection: sqlite3.Connection,
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Copy the enriched CSV into an on-disk SQLite table indexed by dataset URI."""
+    indexed = 0
+    for chunk in pd.read_csv(enriched_csv_path, chunksize=chunk_size):
+        chunk.to_sql(ENRICHED_TABLE, connection, if_exists="append", index=False)
+        indexed += len(chunk)
+    connection.execute(
+        f"CREATE INDEX IF NOT EXISTS {ENRICHED_TABLE}_dataset "
+        f"ON {ENRICHED_TABLE} (dataset)"
+    )
+    connection.commit()
+    return indexed
+
+
+def lookup_enriched(
+    connection: sqlite3.Connection, uris: Sequence[str]
+) -> pd.DataFrame:
+    frames = []
+    for batch in chunked(uris, MAX_LOOKUP_PARAMETERS):
+        placeholders = ", ".join("?" for _ in batch)
+        frames.append(
+            pd.read_sql_query(
+                f"SELECT * FROM {ENRICHED_TABLE} "
+                f"WHERE dataset IN ({placeholders}) ORDER BY rowid",
+                connection,
+                params=list(batch),
+            )
+        )
+    if not frames:
+        return pd.read_sql_query(f"SELECT * FROM {ENRICHED_TABLE} LIMIT 0", connection)
+    return pd.concat(frames, ignore_index=True)
+
+
+def stream_normalized_frames(
+    initial_csv_path: str,
+    enriched_csv_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield normalized frames batch by batch. The initial CSV is read `batch_size`
+    rows at a time and each chunk is joined against the enriched CSV through an
+    on-disk index, so memory stays bounded by the batch size rather than the size
+    of the catalog. Frames are indexed by their row in the combined data, so row
+    numbers in validation errors match load_and_combine_datasets.
+    """
+    logger = AppLogger()
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        connection = sqlite3.connect(Path(index_dir) / "enriched.sqlite")
+        try:
+            indexed = index_enriched_csv(enriched_csv_path, connection, batch_size)
+            logger.info(f"Indexed {indexed} rows from enriched CSV")
+
+            offset = 0
+            for chunk in pd.read_csv(initial_csv_path, chunksize=batch_size):
+                uris = chunk["dataset"].dropna().unique().tolist()
+                merged_df = merge_dataset_frames(
+                    chunk, lookup_enriched(connection, uris)
+                )
+                merged_df.index = pd.RangeIndex(offset, offset + len(merged_df))
+                offset += len(merged_df)
+
+                yield normalize_datasets_frame(merged_df)
+        finally:
+            connection.close()
+
+
+def stream_datasets(
+    initial_csv_path: str,
+    enriched_csv_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[List[Dataset]]:
+    registry = InternRegistry()
+    for normalized_df in stream_normalized_frames(
+        initial_csv_path, enriched_csv_path, batch_size
+    ):
+        yield build_datasets(normalized_df, registry=registry)
+
+
+def stream_dataset_batches(
+    initial_csv_path: str,
+    enriched_csv_path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[DatasetBatch]:
+    """One DatasetBatch per chunk, all encoded with the same InternRegistry IDs."""
+    registry = InternRegistry()
+    for normalized_df in stream_normalized_frames(
+        initial_csv_path, enriched_csv_path, batch_size
+    ):
+        yield DatasetBatch.from_normalized_frame(normalized_df, registry)
@@ -0,0 +1,151 @@
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+from database.csv_cache import is_current, source_fingerprint
+from logging_utils.app_logger import AppLogger
+
+THEME_LABEL_COLUMN_PREFIX = "theme_labels_"
+# Written next to datasets_with_theme_labels.csv: one row per distinct theme with a
+# theme_labels_<language> column per language.
+THEME_LABEL_INDEX_CSV = "data/theme_labels.csv"
+THEME_COLUMN = "theme"
+# Stored next to the index: the fingerprint of the label CSV it was built from.
+SOURCE_FINGERPRINT_SUFFIX = ".source.json"
+
+
+def extract_theme_uris(themes_str: str) -> List[str]:
+    return [t for t in re.split(r"[\s|]+", themes_str.strip()) if t.startswith("http")]
+
+
+def build_theme_label_index(theme_labels_csv_path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Build theme -> {language: label} from the per-dataset label CSV in one pass
+    over its distinct theme/label combinations. A single-theme row labels its
+    theme directly; a multi-theme row only fills in labels for themes no
+    single-theme row labelled, and only where it lists one label per theme,
+    since the fetch script leaves out missing labels instead of padding them.
+    """
+    df = pd.read_csv(theme_labels_csv_path, dtype=str, keep_default_na=False)
+    label_columns = {
+        column.removeprefix(THEME_LABEL_COLUMN_PREFIX): column
+        for column in df.columns
+        if column.startswith(THEME_LABEL_COLUMN_PREFIX)
+    }
+
+    index: Dict[str, Dict[str, str]] = {}
+    multi_theme_rows = []
+    distinct = df[["themes", *label_columns.values()]].drop_duplicates()
+    for themes_str, *label_cells in distinct.itertuples(index=False):
+        theme_uris = extract_theme_uris(themes_str)
+        labels_by_language = {
+            language: [label.strip() for label in cell.split("|") if label.strip()]
+            for language, cell in zip(label_columns, label_cells)
+        }
+        for theme_uri in theme_uris:
+            index.setdefault(theme_uri, {})
+
+        if len(theme_uris) == 1:
+            for language, labels in labels_by_language.items():
+                if labels:
+                    index[theme_uris[0]][language] = labels[0]
+        elif len(theme_uris) > 1:
+            multi_theme_rows.append((theme_uris, labels_by_language))
+
+    for theme_uris, labels_by_language in multi_theme_rows:
+        for language, labels in labels_by_language.items():
+            if len(labels) == len(theme_uris):
+                for theme_uri, label in zip(theme_uris, labels):
+                    index[theme_uri].setdefault(language, label)
+
+    return {
+        theme_uri: {
+            language: labels[language]
+            for language in label_columns
+            if language in labels
+        }
+        for theme_uri, labels in index.items()
+    }
+
+
+def write_theme_label_index(
+    index: Dict[str, Dict[str, str]],
+    languages: List[str],
+    index_path: str = THEME_LABEL_INDEX_CSV,
+) -> None:
+    with open(index_path, "w", newline="", encoding="utf-8") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(
+            [THEME_COLUMN]
+            + [f"{THEME_LABEL_COLUMN_PREFIX}{language}" for language in languages]
+        )
+        for theme_uri, labels in index.items():
+            writer.writerow(
+                [theme_uri] + [labels.get(language, "") for language in languages]
+            )
+
+
+def read_theme_label_index(
+    index_path: str = THEME_LABEL_INDEX_CSV,
+) -> Dict[str, Dict[str, str]]:
+    with open(index_path, newline="", encoding="utf-8") as infile:
+        reader = csv.DictReader(infile)
+        return {
+            row[THEME_COLUMN]: {
+                column.removeprefix(THEME_LABEL_COLUMN_PREFIX): label
+                for column, label in row.items()
+                if column.startswith(THEME_LABEL_COLUMN_PREFIX) and label
+            }
+            for row in reader
+        }
+
+
+def _index_is_current(source: Path, index_file: Path) -> bool:
+    """
+    Whether the index was built from the current contents of `source`, according
+    to the size and sha256 recorded next to it. Without a source to compare
+    against, an existing index is used as it is.
+    """
+    fingerprint_file = Path(f"{index_file}{SOURCE_FINGERPRINT_SUFFIX}")
+    if not index_file.exists():
+        return False
+    if not source.exists():
+        return True
+    if not fingerprint_file.exists():
+        return False
+    fingerprint = json.loads(fingerprint_file.read_text())
+    return Path(fingerprint["path"]) == source and is_current(fingerprint)
+
+
+def load_theme_label_index(
+    theme_labels_csv_path: str, index_path: str = THEME_LABEL_INDEX_CSV
+) -> Dict[str, Dict[str, str]]:
+    """
+    Read the theme label index, rebuilding and saving it first if it is missing
+    or was built from a different version of the per-dataset label CSV.
+    """
+    logger = AppLogger()
+    source, index_file = Path(theme_labels_csv_path), Path(index_path)
+
+    if _index_is_current(source, index_file):
+        index = read_theme_label_index(index_path)
+        logger.info(f"Loaded theme label index from {index_path}")
+        return index
+
+    index = build_theme_label_index(theme_labels_csv_path)
+    languages = [
+        column.removeprefix(THEME_LABEL_COLUMN_PREFIX)
+        for column in pd.read_csv(theme_labels_csv_path, nrows=0).columns
+        if column.startswith(THEME_LABEL_COLUMN_PREFIX)
+    ]
+    write_theme_label_index(index, languages, index_path)
+    Path(f"{index_path}{SOURCE_FINGERPRINT_SUFFIX}").write_text(
+        json.dumps(source_fingerprint(source))
+    )
+    logger.info(
+        f"Built theme label index for {len(index)} themes from "
+        f"{theme_labels_csv_path} and saved it to {index_path}"
+    )
+    return index
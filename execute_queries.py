@@ -38,16 +38,20 @@ def format_result(record: Dict[str, Any]) -> Dict[str, Any]:
     return formatted
 
 
-def execute_query(driver, query_name: str, query: str, limit: int = 100) -> List[Dict]:
+def _collect_records(tx, query: str, limit: int) -> List[Dict]:
+    result = tx.run(query)
+    records = []
+    for i, record in enumerate(result):
+        if i >= limit:
+            break
+        records.append(dict(record))
+    result.consume()
+    return records
+
+
+def execute_query(session, query_name: str, query: str, limit: int = 100) -> List[Dict]:
     try:
-        with driver.session() as session:
-            result = session.run(query)
-            records = []
-            for i, record in enumerate(result):
-                if i >= limit:
-                    break
-                records.append(dict(record))
-            return records
+        return session.execute_read(_collect_records, query, limit)
     except Exception as e:
         logger.error(f"Error executing query '{query_name}': {e}")
         return []
@@ -55,6 +59,7 @@ def execute_query(driver, query_name: str, query: str, limit: int = 100) -> List
 
 def run_all_queries() -> None:
     database_manager = load_db_config()
+    session = database_manager.session()
 
     try:
         query_files = sorted(QUERIES_DIR.glob("*.cypher"))
@@ -76,7 +81,7 @@ def run_all_queries() -> None:
                 logger.warning(f"Skipping empty query: {query_name}")
                 continue
 
-            results = execute_query(database_manager.driver, query_name, query)
+            results = execute_query(session, query_name, query)
             all_results[query_name] = results
 
             if results:
@@ -107,6 +112,7 @@ def run_all_queries() -> None:
             logger.error(f"Failed to save results to JSON: {e}")
 
     finally:
+        session.close()
         database_manager.close()
         logger.success("All queries completed")
 
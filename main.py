@@ -1,110 +1,112 @@
+import asyncio
+import os
 import pandas as pd
+from database.async_database_manager import load_async_db_config
+from database.bulk_import import BULK_IMPORT_DIR, export_bulk_import_files
+from database.csv_cache import cached_frame
 from database.database_manager import load_db_config
-from database.models import (
-    Dataset,
-    DatasetTitle,
-    Publisher,
-    Theme,
-    LandingPage,
-    DownloadURL,
+from database.dataset_batch import DatasetBatch
+from database.interning import InternRegistry
+from database.models import Dataset
+from database.normalization import (
+    build_datasets,
+    distribution_download_urls,
+    merge_dataset_frames,
+    normalize_datasets_frame,
 )
+from database.parallel_validation import (
+    DEFAULT_VALIDATION_WORKERS,
+    validate_frame_in_processes,
+)
+from database.streaming import stream_dataset_batches
+from database.theme_label_index import THEME_LABEL_INDEX_CSV, load_theme_label_index
 from logging_utils.app_logger import AppLogger
-import re
 
 DEBUG = True
+# "sequential" issues one statement per node/relationship, "batched" writes
+# BATCH_SIZE datasets per UNWIND statement and "parallel" spreads those batches
+# over WORKERS concurrent sessions. "bulk_import" skips Cypher entirely and
+# writes neo4j-admin import files to BULK_IMPORT_DIR for a full offline rebuild.
+# "load_csv" stages the CSVs in the server's import directory and lets the server
+# read them with LOAD CSV ... CALL { } IN TRANSACTIONS OF BATCH_SIZE ROWS.
+# "sync" keeps the existing graph and only writes datasets whose content hash
+# changed, removing datasets and hub nodes that disappeared from the source.
+# "stream" reads the initial CSV BATCH_SIZE rows at a time and writes each
+# validated batch before reading the next, keeping memory bounded by BATCH_SIZE.
+# "processes" validates the combined CSV in VALIDATION_WORKERS processes and writes
+# the resulting column batches like "stream". "async" writes the batches on one
+# event loop through the async driver, up to WORKERS transactions at a time. Every
+# mode but "sequential" is opt-in.
+LOAD_MODE = "sequential"
+BATCH_SIZE = 1000
+WORKERS = 4
+VALIDATION_WORKERS = DEFAULT_VALIDATION_WORKERS
+# Keep the normalized CSV tables in data/.cache as Arrow files, rebuilt whenever a
+# source CSV changes, so that repeated runs skip CSV parsing.
+CSV_CACHE = True
+# Validate all rows as one list in pydantic-core instead of building one model per
+# row; invalid rows are reported and skipped either way.
+FAST_VALIDATION = False
+
+
+def read_and_merge_csvs(initial_csv_path: str, enriched_csv_path: str) -> pd.DataFrame:
+    logger = AppLogger()
+
+    initial_df = pd.read_csv(initial_csv_path)
+    enriched_df = pd.read_csv(enriched_csv_path)
+
+    logger.info(f"Loaded {len(initial_df)} rows from initial CSV")
+    logger.info(f"Loaded {len(enriched_df)} rows from enriched CSV")
+
+    merged_df = merge_dataset_frames(initial_df, enriched_df)
+
+    logger.info(f"Combined datasets into {len(merged_df)} rows")
+    return merged_df
+
+
+def load_normalized_datasets(
+    initial_csv_path: str, enriched_csv_path: str, use_cache: bool = False
+) -> pd.DataFrame:
+    def build() -> pd.DataFrame:
+        return normalize_datasets_frame(
+            read_and_merge_csvs(initial_csv_path, enriched_csv_path)
+        )
+
+    if not use_cache:
+        return build()
+    return cached_frame(
+        "normalized_datasets", [initial_csv_path, enriched_csv_path], build
+    )
 
 
 def load_and_combine_datasets(
-    initial_csv_path: str, enriched_csv_path: str
+    initial_csv_path: str,
+    enriched_csv_path: str,
+    fast_validation: bool = False,
+    registry: InternRegistry | None = None,
+    use_cache: bool = False,
 ) -> list[Dataset]:
     logger = AppLogger()
-    datasets = []
+    registry = registry if registry is not None else InternRegistry()
 
     try:
-        initial_df = pd.read_csv(initial_csv_path)
-        enriched_df = pd.read_csv(enriched_csv_path)
-
-        logger.info(f"Loaded {len(initial_df)} rows from initial CSV")
-        logger.info(f"Loaded {len(enriched_df)} rows from enriched CSV")
-
-        merged_df = initial_df.merge(
-            enriched_df, on="dataset", how="left", suffixes=("_initial", "_enriched")
-        )
-
-        logger.info(f"Combined datasets into {len(merged_df)} rows")
-
-        for idx, row in merged_df.iterrows():
-            try:
-                theme_uris = [
-                    Theme(uri=theme.strip())
-                    for theme in str(row.get("themes", "")).split("|")
-                    if theme.strip()
-                ]
-
-                landing_page = None
-                if (
-                    pd.notna(row.get("landingPage"))
-                    and str(row.get("landingPage", "")).strip()
-                ):
-                    try:
-                        landing_page = LandingPage(
-                            url=str(row.get("landingPage")).strip()
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to parse landingPage at row {idx + 2}: {e}"
-                        )
-
-                download_url = None
-                if (
-                    pd.notna(row.get("downloadURL"))
-                    and str(row.get("downloadURL", "")).strip()
-                ):
-                    try:
-                        download_url = DownloadURL(
-                            url=str(row.get("downloadURL")).strip()
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to parse downloadURL at row {idx + 2}: {e}"
-                        )
-
-                dataset = Dataset(
-                    uri=row["dataset"],
-                    title=DatasetTitle(
-                        value=row.get("datasetTitle", row.get("title", ""))
-                    ),
-                    publisher=Publisher(uri=row.get("publisher", "")),
-                    themes=theme_uris,
-                    landing_page=landing_page,
-                    download_url=download_url,
-                    issued=row.get("issued") if pd.notna(row.get("issued")) else None,
-                    status=row.get("status") if pd.notna(row.get("status")) else None,
-                    access_url=(
-                        row.get("accessURL") if pd.notna(row.get("accessURL")) else None
-                    ),
-                    byte_size=(
-                        int(row.get("byteSize"))
-                        if pd.notna(row.get("byteSize"))
-                        and str(row.get("byteSize", "")).strip()
-                        else None
-                    ),
-                    keywords=(
-                        str(row.get("keywords", "")).split(", ")
-                        if pd.notna(row.get("keywords"))
-                        and str(row.get("keywords", "")).strip()
-                        else None
-                    ),
-                )
-                datasets.append(dataset)
+        normalized_df = load_normalized_datasets(
+            initial_csv_path, enriched_csv_path, use_cache=use_cache
+        )
 
-            except Exception as e:
-                logger.error(f"Failed to parse dataset at row {idx + 2}: {e}")
-                continue
+        datasets = build_datasets(
+            normalized_df,
+            fast_validation=fast_validation,
+            registry=registry,
+        )
 
         logger.success(
             f"Created {len(datasets)} Dataset objects from combined CSV data"
         )
+        logger.info(
+            f"Shared {len(registry.publishers)} publishers and "
+            f"{len(registry.themes)} themes across datasets"
+        )
         return datasets
 
     except Exception as e:
@@ -112,56 +114,65 @@ def load_and_combine_datasets(
         return []
 
 
-def load_theme_labels(theme_labels_csv_path: str) -> dict:
+def load_and_combine_dataset_batches(
+    initial_csv_path: str,
+    enriched_csv_path: str,
+    workers: int = DEFAULT_VALIDATION_WORKERS,
+    use_cache: bool = False,
+) -> tuple[list[DatasetBatch], list[dict]]:
+    """
+    Parallel counterpart of load_and_combine_datasets: rows are validated in
+    `workers` processes and come back as column batches, in row order, together
+    with one error record per invalid row.
+    """
     logger = AppLogger()
-    theme_labels_map = {}
 
     try:
-        df = pd.read_csv(theme_labels_csv_path)
-        logger.info(f"Loaded theme labels from {theme_labels_csv_path}")
-
-        for idx, row in df.iterrows():
-            try:
-                themes_str = row.get("themes", "")
-                theme_uris = [
-                    t
-                    for t in re.split(r"[\s|]+", themes_str.strip())
-                    if t.startswith("http")
-                ]
-
-                for theme_uri in theme_uris:
-                    if theme_uri not in theme_labels_map:
-                        theme_labels_map[theme_uri] = {}
-
-                    label_en = row.get("theme_labels_en", "")
-                    label_it = row.get("theme_labels_it", "")
-                    label_de = row.get("theme_labels_de", "")
-
-                    if label_en and isinstance(label_en, str):
-                        labels_list = [
-                            l.strip() for l in str(label_en).split("|") if l.strip()
-                        ]
-                        if labels_list:
-                            theme_labels_map[theme_uri]["en"] = labels_list[0]
-
-                    if label_it and isinstance(label_it, str):
-                        labels_list = [
-                            l.strip() for l in str(label_it).split("|") if l.strip()
-                        ]
-                        if labels_list:
-                            theme_labels_map[theme_uri]["it"] = labels_list[0]
-
-                    if label_de and isinstance(label_de, str):
-                        labels_list = [
-                            l.strip() for l in str(label_de).split("|") if l.strip()
-                        ]
-                        if labels_list:
-                            theme_labels_map[theme_uri]["de"] = labels_list[0]
-
-            except Exception as e:
-                logger.warning(f"Failed to parse theme labels at row {idx + 2}: {e}")
-                continue
+        normalized_df = load_normalized_datasets(
+            initial_csv_path, enriched_csv_path, use_cache=use_cache
+        )
+
+        batches, errors = validate_frame_in_processes(normalized_df, workers=workers)
+        for error in errors:
+            logger.error(
+                f"Failed to parse dataset at row {error['row']}: {error['message']}"
+            )
+
+        logger.success(
+            f"Validated {sum(map(len, batches))} datasets from combined CSV data "
+            f"in {len(batches)} batches using {workers} processes"
+        )
+        return batches, errors
+
+    except Exception as e:
+        logger.error(f"Failed to load and combine CSV files: {e}")
+        return [], [{"error_type": "CSV Load Error", "message": str(e)}]
+
+
+def load_distributions(distributions_csv_path: str) -> list[dict]:
+    logger = AppLogger()
 
+    if not os.path.exists(distributions_csv_path):
+        logger.warning(f"Distributions CSV not found: {distributions_csv_path}")
+        return []
+
+    try:
+        rows = distribution_download_urls(pd.read_csv(distributions_csv_path))
+        logger.success(f"Loaded {len(rows)} distribution download URLs")
+        return rows
+
+    except Exception as e:
+        logger.error(f"Failed to load distributions CSV: {e}")
+        return []
+
+
+def load_theme_labels(
+    theme_labels_csv_path: str, index_path: str = THEME_LABEL_INDEX_CSV
+) -> dict:
+    logger = AppLogger()
+
+    try:
+        theme_labels_map = load_theme_label_index(theme_labels_csv_path, index_path)
         logger.success(f"Loaded labels for {len(theme_labels_map)} unique themes")
         return theme_labels_map
 
@@ -170,59 +181,264 @@ def load_theme_labels(theme_labels_csv_path: str) -> dict:
         return {}
 
 
+async def load_graph_async() -> int:
+    """The "async" load mode; returns the exit code."""
+    logger = AppLogger()
+    database_manager = load_async_db_config(max_concurrent_writes=WORKERS)
+
+    try:
+        if not await database_manager.verify_connectivity():
+            return 1
+
+        if DEBUG:
+            await database_manager.clear_graph()
+
+        if not await database_manager.load_constraints():
+            logger.error("Failed to load constraints. Exiting.")
+            return 1
+
+        datasets = load_and_combine_datasets(
+            "data/datasets_publishers_themes.csv",
+            "data/enriched_datasets.csv",
+            fast_validation=FAST_VALIDATION,
+            use_cache=CSV_CACHE,
+        )
+
+        if not datasets:
+            logger.error("No datasets loaded. Exiting.")
+            return 1
+
+        stats = await database_manager.create_dataset_nodes_and_relationships(
+            datasets, batch_size=BATCH_SIZE
+        )
+
+        logger.info("Graph creation statistics:")
+        logger.info(f"Datasets created: {stats['datasets_created']}")
+        logger.info(f"Publishers created: {stats['publishers_created']}")
+        logger.info(f"Themes created: {stats['themes_created']}")
+
+        if stats["errors"]:
+            logger.error(f"Encountered {len(stats['errors'])} errors during creation")
+            for error in stats["errors"][:5]:
+                logger.error(f"  - {error}")
+
+        logger.info("Loading distributions...")
+        distribution_rows = load_distributions("data/dataset_distributions.csv")
+
+        if distribution_rows:
+            distribution_stats = (
+                await database_manager.create_distribution_relationships(
+                    distribution_rows, batch_size=BATCH_SIZE
+                )
+            )
+            stats["errors"].extend(distribution_stats["errors"])
+        else:
+            logger.warning(
+                "No distributions loaded. Keeping one download URL per dataset."
+            )
+
+        logger.info("Loading theme labels...")
+        theme_labels_map = load_theme_labels("data/datasets_with_theme_labels.csv")
+
+        if theme_labels_map:
+            label_stats = (
+                await database_manager.create_theme_label_nodes_and_relationships(
+                    theme_labels_map
+                )
+            )
+            logger.info(f"Theme labels created: {label_stats['theme_labels_created']}")
+            stats["errors"].extend(label_stats["errors"])
+        else:
+            logger.warning(
+                "No theme labels loaded. Skipping theme label node creation."
+            )
+
+        logger.success("Process completed")
+        return 1 if stats["errors"] else 0
+
+    finally:
+        await database_manager.close()
+
+
 if __name__ == "__main__":
     logger = AppLogger()
 
+    if LOAD_MODE == "bulk_import":
+        registry = InternRegistry()
+        datasets = load_and_combine_datasets(
+            "data/datasets_publishers_themes.csv",
+            "data/enriched_datasets.csv",
+            fast_validation=FAST_VALIDATION,
+            use_cache=CSV_CACHE,
+            registry=registry,
+        )
+        theme_labels_map = load_theme_labels("data/datasets_with_theme_labels.csv")
+        export_stats = export_bulk_import_files(
+            datasets,
+            theme_labels_map,
+            distribution_rows=load_distributions("data/dataset_distributions.csv"),
+            registry=registry,
+        )
+
+        if export_stats["errors"]:
+            exit(1)
+
+        logger.info(f"Node files: {export_stats['nodes']}")
+        logger.info(f"Relationship files: {export_stats['relationships']}")
+        logger.info(
+            "Stop the database, run the import command below inside the container, "
+            "then start it again and run load_constraints():\n"
+            f"{export_stats['command']}"
+        )
+        logger.success(f"Bulk import files written to {BULK_IMPORT_DIR}")
+        exit(0)
+
+    if LOAD_MODE == "async":
+        exit(asyncio.run(load_graph_async()))
+
     database_manager = load_db_config()
 
-    if DEBUG:
-        database_manager.clear_graph()
+    if DEBUG and LOAD_MODE != "sync":
+        database_manager.clear_graph_batched()
 
     if not database_manager.load_constraints():
         logger.error("Failed to load constraints. Exiting.")
         database_manager.close()
         exit(1)
 
-    datasets = load_and_combine_datasets(
-        "data/datasets_publishers_themes.csv", "data/enriched_datasets.csv"
-    )
-
-    if not datasets:
-        logger.error("No datasets loaded. Exiting.")
+    if LOAD_MODE == "load_csv":
+        load_csv_stats = database_manager.create_graph_with_load_csv(
+            rows_per_transaction=BATCH_SIZE
+        )
+        logger.info(f"Nodes created: {load_csv_stats['nodes_created']}")
+        logger.info(f"Relationships created: {load_csv_stats['relationships_created']}")
         database_manager.close()
-        exit(1)
+        exit(1 if load_csv_stats["errors"] else 0)
 
-    stats = database_manager.create_dataset_nodes_and_relationships(datasets)
-
-    logger.info("Graph creation statistics:")
-    logger.info(f"Datasets created: {stats['datasets_created']}")
-    logger.info(f"Titles created: {stats['titles_created']}")
-    logger.info(f"Publishers created: {stats['publishers_created']}")
-    logger.info(f"Themes created: {stats['themes_created']}")
-    logger.info(f"Landing pages created: {stats['landing_pages_created']}")
-    logger.info(f"Download URLs created: {stats['download_urls_created']}")
-    logger.info(f"HAS_TITLE relationships: {stats['has_title_relationships']}")
-    logger.info(f"PUBLISHED_BY relationships: {stats['published_by_relationships']}")
-    logger.info(f"HAS_THEME relationships: {stats['has_theme_relationships']}")
-    logger.info(
-        f"HAS_LANDING_PAGE relationships: {stats['has_landing_page_relationships']}"
-    )
-    logger.info(
-        f"HAS_DOWNLOAD_URL relationships: {stats['has_download_url_relationships']}"
-    )
+    datasets = []
+    if LOAD_MODE == "processes":
+        dataset_batches, _ = load_and_combine_dataset_batches(
+            "data/datasets_publishers_themes.csv",
+            "data/enriched_datasets.csv",
+            workers=VALIDATION_WORKERS,
+            use_cache=CSV_CACHE,
+        )
+
+        if not dataset_batches:
+            logger.error("No datasets loaded. Exiting.")
+            database_manager.close()
+            exit(1)
+    elif LOAD_MODE != "stream":
+        datasets = load_and_combine_datasets(
+            "data/datasets_publishers_themes.csv",
+            "data/enriched_datasets.csv",
+            fast_validation=FAST_VALIDATION,
+            use_cache=CSV_CACHE,
+        )
+
+        if not datasets:
+            logger.error("No datasets loaded. Exiting.")
+            database_manager.close()
+            exit(1)
+
+    if LOAD_MODE == "sync":
+        stats = database_manager.sync_dataset_nodes_and_relationships(
+            datasets, batch_size=BATCH_SIZE
+        )
+
+        logger.info("Graph sync statistics:")
+        logger.info(f"Datasets added: {stats['datasets_added']}")
+        logger.info(f"Datasets updated: {stats['datasets_updated']}")
+        logger.info(f"Datasets deleted: {stats['datasets_deleted']}")
+        logger.info(f"Datasets unchanged: {stats['datasets_unchanged']}")
+        logger.info(f"Relationships removed: {stats['relationships_removed']}")
+    else:
+        if LOAD_MODE == "processes":
+            stats = database_manager.create_dataset_nodes_and_relationships_streamed(
+                dataset_batches
+            )
+        elif LOAD_MODE == "stream":
+            stats = database_manager.create_dataset_nodes_and_relationships_streamed(
+                stream_dataset_batches(
+                    "data/datasets_publishers_themes.csv",
+                    "data/enriched_datasets.csv",
+                    batch_size=BATCH_SIZE,
+                )
+            )
+        elif LOAD_MODE == "batched":
+            stats = database_manager.create_dataset_nodes_and_relationships_batched(
+                datasets, batch_size=BATCH_SIZE
+            )
+        elif LOAD_MODE == "parallel":
+            stats = database_manager.create_dataset_nodes_and_relationships_parallel(
+                datasets, batch_size=BATCH_SIZE, workers=WORKERS
+            )
+        else:
+            stats = database_manager.create_dataset_nodes_and_relationships(datasets)
+
+        logger.info("Graph creation statistics:")
+        logger.info(f"Datasets created: {stats['datasets_created']}")
+        logger.info(f"Titles created: {stats['titles_created']}")
+        logger.info(f"Publishers created: {stats['publishers_created']}")
+        logger.info(f"Themes created: {stats['themes_created']}")
+        logger.info(f"Landing pages created: {stats['landing_pages_created']}")
+        logger.info(f"Download URLs created: {stats['download_urls_created']}")
+        logger.info(f"HAS_TITLE relationships: {stats['has_title_relationships']}")
+        logger.info(
+            f"PUBLISHED_BY relationships: {stats['published_by_relationships']}"
+        )
+        logger.info(f"HAS_THEME relationships: {stats['has_theme_relationships']}")
+        logger.info(
+            f"HAS_LANDING_PAGE relationships: {stats['has_landing_page_relationships']}"
+        )
+        logger.info(
+            f"HAS_DOWNLOAD_URL relationships: {stats['has_download_url_relationships']}"
+        )
 
     if stats["errors"]:
         logger.error(f"Encountered {len(stats['errors'])} errors during creation")
         for error in stats["errors"][:5]:
             logger.error(f"  - {error}")
 
+    logger.info("Loading distributions...")
+    distribution_rows = load_distributions("data/dataset_distributions.csv")
+
+    if distribution_rows:
+        distribution_stats = database_manager.create_distribution_relationships_batched(
+            distribution_rows, batch_size=BATCH_SIZE
+        )
+
+        logger.info("Distribution statistics:")
+        logger.info(
+            f"Download URLs created: {distribution_stats['download_urls_created']}"
+        )
+        logger.info(
+            "HAS_DOWNLOAD_URL relationships: "
+            f"{distribution_stats['has_download_url_relationships']}"
+        )
+
+        if distribution_stats["errors"]:
+            logger.error(
+                f"Encountered {len(distribution_stats['errors'])} errors during "
+                "distribution creation"
+            )
+    else:
+        logger.warning("No distributions loaded. Keeping one download URL per dataset.")
+
     logger.info("Loading theme labels...")
     theme_labels_map = load_theme_labels("data/datasets_with_theme_labels.csv")
 
     if theme_labels_map:
-        label_stats = database_manager.create_theme_label_nodes_and_relationships(
-            theme_labels_map
-        )
+        if LOAD_MODE in ("batched", "parallel", "sync", "stream", "processes"):
+            label_stats = (
+                database_manager.create_theme_label_nodes_and_relationships_batched(
+                    theme_labels_map
+                )
+            )
+        else:
+            label_stats = database_manager.create_theme_label_nodes_and_relationships(
+                theme_labels_map
+            )
 
         logger.info("Theme label creation statistics:")
         logger.info(f"Theme labels created: {label_stats['theme_labels_created']}")
@@ -1,5 +1,7 @@
-// Creates a Dataset node keyed by its uri if it does not exist.
-MERGE (d:Dataset {uri: $uri});
+// Creates a Dataset node keyed by its uri if it does not exist and stores the
+// content hash that LOAD_MODE = "sync" compares against.
+MERGE (d:Dataset {uri: $uri})
+SET d.content_hash = $content_hash;
 
 // Creates a Title node for the dataset title value if it does not exist.
 MERGE (t:Title {value: $value});
@@ -17,3 +17,18 @@ REQUIRE t.uri IS UNIQUE;
 CREATE CONSTRAINT theme_label_unique IF NOT EXISTS
 FOR (tl:ThemeLabel)
 REQUIRE (tl.title, tl.language) IS UNIQUE;
+
+// Ensures Title nodes have a unique value.
+CREATE CONSTRAINT title_value_unique IF NOT EXISTS
+FOR (t:Title)
+REQUIRE t.value IS UNIQUE;
+
+// Ensures LandingPage nodes have a unique url.
+CREATE CONSTRAINT landing_page_url_unique IF NOT EXISTS
+FOR (lp:LandingPage)
+REQUIRE lp.url IS UNIQUE;
+
+// Ensures DownloadURL nodes have a unique url.
+CREATE CONSTRAINT download_url_url_unique IF NOT EXISTS
+FOR (du:DownloadURL)
+REQUIRE du.url IS UNIQUE;
@@ -1,3 +1,7 @@
-// Deletes all nodes and relationships from the graph.
+// Deletes all relationships, then all nodes, in bounded transactions.
+// DatabaseManager.clear_graph_batched runs the same statements label by label.
+MATCH ()-[r]->()
+CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS;
+
 MATCH (n)
-DETACH DELETE n;
+CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS;
@@ -0,0 +1,184 @@
+import asyncio
+import sys
+from neo4j import SummaryCounters
+from database.async_database_manager import AsyncDatabaseManager
+from database.database_manager import DEFAULT_FETCH_SIZE
+from logging_utils.app_logger import AppLogger
+from main import load_and_combine_datasets
+
+INITIAL_CSV = "data/datasets_publishers_themes.csv"
+ENRICHED_CSV = "data/enriched_datasets.csv"
+BATCH_SIZE = 50
+MAX_CONCURRENT_WRITES = 3
+
+
+class _FakeSummary:
+    def __init__(self, nodes_created: int):
+        self.counters = SummaryCounters({"nodes-created": nodes_created})
+
+
+class _FakeResult:
+    def __init__(self, nodes_created: int):
+        self.summary = _FakeSummary(nodes_created)
+
+    async def consume(self) -> _FakeSummary:
+        return self.summary
+
+
+class _FakeTransaction:
+    """Reports one node per Dataset row or hub value a MERGE statement receives."""
+
+    def __init__(self, driver: "_FakeDriver"):
+        self.driver = driver
+
+    async def run(self, query: str, parameters: dict) -> _FakeResult:
+        if "MERGE (d:Dataset" in query:
+            if self.driver.failing_uri in (row["uri"] for row in parameters["rows"]):
+                raise RuntimeError("rejected batch")
+            return _FakeResult(len(parameters["rows"]))
+        return _FakeResult(len(parameters.get("values", [])))
+
+
+class _FakeSession:
+    """Records how many write transactions and event loop tasks exist at once."""
+
+    def __init__(self, driver: "_FakeDriver"):
+        self.driver = driver
+
+    async def __aenter__(self) -> "_FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def execute_write(self, work, *args):
+        driver = self.driver
+        driver.active += 1
+        driver.peak_active = max(driver.peak_active, driver.active)
+        driver.peak_tasks = max(driver.peak_tasks, len(asyncio.all_tasks()))
+        try:
+            await asyncio.sleep(0.001)
+            return await work(_FakeTransaction(driver), *args)
+        finally:
+            driver.active -= 1
+
+
+class _FakeDriver:
+    def __init__(self, failing_uri: str | None = None):
+        self.failing_uri = failing_uri
+        self.active = 0
+        self.peak_active = 0
+        self.peak_tasks = 0
+
+    def session(self, **kwargs) -> _FakeSession:
+        return _FakeSession(self)
+
+    async def close(self) -> None:
+        pass
+
+
+class _QuietLogger:
+    """Drops every message, so expected errors stay out of the error log."""
+
+    def __getattr__(self, name: str):
+        return lambda msg: None
+
+
+def fake_database_manager(
+    driver: _FakeDriver, logger: AppLogger | _QuietLogger | None = None
+) -> AsyncDatabaseManager:
+    """
+    An AsyncDatabaseManager around `driver`. __post_init__ is skipped, since it
+    would create a real driver.
+    """
+    database_manager = object.__new__(AsyncDatabaseManager)
+    database_manager.uri = "neo4j://localhost:7687"
+    database_manager.username = "neo4j"
+    database_manager.password = "unused"
+    database_manager.max_concurrent_writes = MAX_CONCURRENT_WRITES
+    database_manager.database = None
+    database_manager.fetch_size = DEFAULT_FETCH_SIZE
+    database_manager.driver = driver
+    database_manager.logger = logger if logger is not None else AppLogger()
+    database_manager._write_slots = asyncio.Semaphore(MAX_CONCURRENT_WRITES)
+    return database_manager
+
+
+async def load(
+    datasets: list, driver: _FakeDriver, logger: _QuietLogger | None = None
+) -> dict:
+    database_manager = fake_database_manager(driver, logger)
+    try:
+        return await database_manager.create_dataset_nodes_and_relationships(
+            datasets, batch_size=BATCH_SIZE
+        )
+    finally:
+        await database_manager.close()
+
+
+def check_bounded_batches(datasets: list) -> bool:
+    """
+    All batches are written, but never more than MAX_CONCURRENT_WRITES
+    transactions run at once and only that many worker tasks exist besides the
+    main one, however many batches there are.
+    """
+    logger = AppLogger()
+    driver = _FakeDriver()
+    stats = asyncio.run(load(datasets, driver))
+    batches = -(-len(datasets) // BATCH_SIZE)
+
+    ok = True
+    if stats["errors"] or stats["datasets_created"] != len(datasets):
+        logger.warning(
+            f"Created {stats['datasets_created']} of {len(datasets)} datasets, "
+            f"errors: {stats['errors']}"
+        )
+        ok = False
+    if driver.peak_active > MAX_CONCURRENT_WRITES:
+        logger.warning(
+            f"{driver.peak_active} transactions ran at once, "
+            f"limit {MAX_CONCURRENT_WRITES}"
+        )
+        ok = False
+    if driver.peak_tasks > MAX_CONCURRENT_WRITES + 1:
+        logger.warning(
+            f"{driver.peak_tasks} tasks existed at once for {batches} batches, "
+            f"limit {MAX_CONCURRENT_WRITES + 1}"
+        )
+        ok = False
+
+    if ok:
+        logger.success(
+            f"{batches} batches written with at most {driver.peak_active} "
+            f"transactions and {driver.peak_tasks} tasks at once"
+        )
+    return ok
+
+
+def check_failed_batch(datasets: list) -> bool:
+    """A failing batch is reported in the stats; the other batches are written."""
+    logger = AppLogger()
+    driver = _FakeDriver(failing_uri=datasets[BATCH_SIZE].uri)
+    stats = asyncio.run(load(datasets, driver, _QuietLogger()))
+
+    expected = len(datasets) - BATCH_SIZE
+    if len(stats["errors"]) != 1 or stats["datasets_created"] != expected:
+        logger.warning(
+            f"Expected 1 error and {expected} datasets, got {stats['errors']} and "
+            f"{stats['datasets_created']}"
+        )
+        return False
+
+    logger.success("A failing batch is reported without stopping the others")
+    return True
+
+
+if __name__ == "__main__":
+    logger = AppLogger()
+    datasets = load_and_combine_datasets(INITIAL_CSV, ENRICHED_CSV)
+    results = []
+    logger.info("TEST: Async loader writes a bounded number of batches at once")
+    results.append(check_bounded_batches(datasets))
+    logger.info("TEST: Async loader reports failed batches")
+    results.append(check_failed_batch(datasets))
+    sys.exit(0 if all(results) else 1)
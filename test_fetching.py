@@ -0,0 +1,403 @@
+import csv
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+import database.fetch_data as fetch_data
+from database.checkpoint import EnrichmentCheckpoint
+from database.sparql_cache import SparqlCache
+from database.sparql_client import SparqlClient, SparqlError, retry_after_seconds
+from logging_utils.app_logger import AppLogger
+
+DATASET_COUNT = 60
+DATASET_URI = "http://example.org/dataset/{}"
+
+
+def _bindings(rows: list[dict]) -> dict:
+    return {
+        "results": {
+            "bindings": [
+                {key: {"value": value} for key, value in row.items()} for row in rows
+            ]
+        }
+    }
+
+
+class _FakeCatalogClient:
+    """
+    Answers the queries of fetch_data from a synthetic catalog. Each request
+    takes a random moment so that concurrent requests finish out of order, and
+    the most requests running at once are recorded. A query for `interrupt_at`
+    raises KeyboardInterrupt, like a killed run.
+    """
+
+    def __init__(self, interrupt_at: str | None = None):
+        self.interrupt_at = interrupt_at
+        self.uris = sorted(DATASET_URI.format(i) for i in range(DATASET_COUNT))
+        self.active = 0
+        self.peak_active = 0
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def query(self, query: str, query_class: str, rate_limiter=None) -> dict:
+        if query_class == "catalog":
+            return self._catalog_page(query)
+
+        uris = re.findall(r"<(http://example\.org/dataset/\d+)>", query)
+        if self.interrupt_at in uris:
+            raise KeyboardInterrupt
+        with self._lock:
+            delay = self._random.uniform(0, 0.01)
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        time.sleep(delay)
+        with self._lock:
+            self.active -= 1
+
+        rows = []
+        for uri in uris:
+            number = uri.rsplit("/", 1)[1]
+            for distribution in ("csv", "json"):
+                rows.append(
+                    {
+                        "dataset": uri,
+                        "issued": f"2020-01-{int(number) % 28 + 1:02d}",
+                        "accessURL": f"{uri}/{distribution}",
+                        "byteSize": number,
+                        "keywords": "a, b",
+                    }
+                )
+        if "VALUES ?dataset" not in query:
+            rows = [{k: v for k, v in row.items() if k != "dataset"} for row in rows]
+        return _bindings(rows)
+
+    def _catalog_page(self, query: str) -> dict:
+        after = re.search(r'FILTER\(STR\(\?dataset\) > "([^"]*)"\)', query)
+        limit = int(re.search(r"LIMIT (\d+)", query).group(1))
+        uris = [uri for uri in self.uris if after is None or uri > after.group(1)]
+        return _bindings(
+            [
+                {
+                    "dataset": uri,
+                    "datasetTitle": f"Title {uri}",
+                    "publisher": "http://example.org/publisher",
+                    "themes": "http://example.org/theme",
+                }
+                for uri in uris[:limit]
+            ]
+        )
+
+    def log_stats(self) -> None:
+        pass
+
+
+@contextmanager
+def _fetch_files(tmp_dir: Path, name: str):
+    """Point fetch_data's input and output files into `tmp_dir`."""
+    saved = (
+        fetch_data.INITIAL_DATASETS_FILE,
+        fetch_data.OUTPUT_FILE,
+        fetch_data.DISTRIBUTIONS_FILE,
+    )
+    fetch_data.INITIAL_DATASETS_FILE = str(tmp_dir / "initial.csv")
+    fetch_data.OUTPUT_FILE = str(tmp_dir / f"{name}_enriched.csv")
+    fetch_data.DISTRIBUTIONS_FILE = str(tmp_dir / f"{name}_distributions.csv")
+    try:
+        yield
+    finally:
+        (
+            fetch_data.INITIAL_DATASETS_FILE,
+            fetch_data.OUTPUT_FILE,
+            fetch_data.DISTRIBUTIONS_FILE,
+        ) = saved
+
+
+def _write_initial_csv(path: Path, uris: list[str]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fetch_data.INITIAL_FIELDNAMES)
+        writer.writeheader()
+        for uri in uris:
+            writer.writerow({"dataset": uri, "datasetTitle": "t", "publisher": "p"})
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as infile:
+        return infile.read()
+
+
+def check_keyset_paging(logger: AppLogger) -> bool:
+    client = _FakeCatalogClient()
+    pages = list(fetch_data.iter_initial_datasets(client, 7, None))
+    uris = [row["dataset"] for page in pages for row in page]
+    capped = list(fetch_data.iter_initial_datasets(client, 7, 20))
+
+    if uris != client.uris or len(pages) != 9:
+        logger.error(f"Paging returned {len(uris)} datasets in {len(pages)} pages")
+        return False
+    if sum(map(len, capped)) != 20:
+        logger.error("Paging ignored max_datasets")
+        return False
+    logger.success(f"Paged {len(uris)} datasets in {len(pages)} keyset pages")
+    return True
+
+
+def check_enrichment_order(logger: AppLogger, tmp_dir: Path) -> bool:
+    """
+    Concurrent and batched enrichment write one row per dataset, in input order,
+    and every distribution of each dataset.
+    """
+    uris = _FakeCatalogClient().uris
+    random.Random(1).shuffle(uris)
+    _write_initial_csv(tmp_dir / "initial.csv", uris)
+
+    outputs, distributions = {}, {}
+    for name, run in (
+        ("concurrent", fetch_data.run_enrichment),
+        ("batched", fetch_data.run_batched_enrichment),
+    ):
+        client = _FakeCatalogClient()
+        with _fetch_files(tmp_dir, name):
+            run(client, resume=False)
+            with open(fetch_data.OUTPUT_FILE, encoding="utf-8") as infile:
+                outputs[name] = list(csv.DictReader(infile))
+            with open(fetch_data.DISTRIBUTIONS_FILE, encoding="utf-8") as infile:
+                distributions[name] = list(csv.DictReader(infile))
+        if client.peak_active > fetch_data.MAX_IN_FLIGHT:
+            logger.error(
+                f"{client.peak_active} {name} detail queries ran at once, "
+                f"limit {fetch_data.MAX_IN_FLIGHT}"
+            )
+            return False
+
+    for name, rows in outputs.items():
+        if [row["dataset"] for row in rows] != uris:
+            logger.error(f"{name} enrichment wrote rows out of input order")
+            return False
+    if outputs["concurrent"] != outputs["batched"]:
+        logger.error("Concurrent and batched enrichment wrote different rows")
+        return False
+    if distributions["concurrent"] != distributions["batched"]:
+        logger.error("Concurrent and batched enrichment wrote different distributions")
+        return False
+    if len(distributions["concurrent"]) != 2 * len(uris):
+        logger.error(
+            f"Enrichment wrote {len(distributions['concurrent'])} distributions "
+            f"for {len(uris)} datasets with two each"
+        )
+        return False
+    logger.success(
+        f"Both enrichment modes wrote {len(uris)} rows in input order with "
+        f"{len(distributions['concurrent'])} distributions"
+    )
+    return True
+
+
+def check_checkpoint_resume(logger: AppLogger, tmp_dir: Path) -> bool:
+    """
+    Interrupt each enrichment mode halfway, leave a torn row at the end of its
+    outputs, then resume: the outputs must match an uninterrupted run.
+    """
+    uris = _FakeCatalogClient().uris
+    _write_initial_csv(tmp_dir / "initial.csv", uris)
+
+    for name, run in (
+        ("concurrent", fetch_data.run_enrichment),
+        ("batched", fetch_data.run_batched_enrichment),
+    ):
+        with _fetch_files(tmp_dir, f"{name}_reference"):
+            run(_FakeCatalogClient(), resume=False)
+            expected = [
+                _read(fetch_data.OUTPUT_FILE),
+                _read(fetch_data.DISTRIBUTIONS_FILE),
+            ]
+
+        with _fetch_files(tmp_dir, f"{name}_resumed"):
+            outputs = [fetch_data.OUTPUT_FILE, fetch_data.DISTRIBUTIONS_FILE]
+            try:
+                run(_FakeCatalogClient(interrupt_at=uris[len(uris) // 2]), resume=True)
+            except KeyboardInterrupt:
+                pass
+            else:
+                logger.error(f"{name} enrichment was not interrupted")
+                return False
+
+            for path in outputs:
+                if os.path.exists(path):
+                    with open(path, "a", encoding="utf-8") as outfile:
+                        outfile.write('http://example.org/dataset/torn,"2020-')
+
+            run(_FakeCatalogClient(), resume=True)
+            resumed = [_read(path) for path in outputs[: len(expected)]]
+            if os.path.exists(f"{fetch_data.OUTPUT_FILE}.checkpoint"):
+                logger.error(f"{name} enrichment left its checkpoint behind")
+                return False
+
+        if resumed != expected:
+            logger.error(f"Resumed {name} enrichment differs from a full run")
+            return False
+        logger.success(f"Resumed {name} enrichment matches an uninterrupted run")
+
+    with EnrichmentCheckpoint([str(tmp_dir / "locked.csv")]):
+        try:
+            with EnrichmentCheckpoint([str(tmp_dir / "locked.csv")]):
+                logger.error("Two runs opened the same checkpoint")
+                return False
+        except RuntimeError:
+            pass
+    return True
+
+
+class _SparqlHandler(BaseHTTPRequestHandler):
+    """
+    Answers with gzipped JSON echoing the query. Statuses queued in
+    `server.responses` are sent first; idle keep-alive connections are
+    dropped after `timeout` seconds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 0.5
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        query = parse_qs(body.decode())["query"][0]
+        self.server.requests.append(query)
+        status = self.server.responses.pop(0) if self.server.responses else 200
+
+        if status != 200:
+            payload = b"try again later"
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "2")
+        else:
+            payload = json.dumps(_bindings([{"query": query}])).encode()
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(payload)
+                self.send_response(200)
+                self.send_header("Content-Encoding", "gzip")
+            else:
+                self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@contextmanager
+def _sparql_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SparqlHandler)
+    server.requests, server.responses = [], []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_port}/sparql"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def check_sparql_client(logger: AppLogger, tmp_dir: Path) -> bool:
+    if (
+        retry_after_seconds("3") != 3.0
+        or retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") != 0.0
+    ):
+        logger.error("Retry-After values are parsed wrongly")
+        return False
+
+    with _sparql_server() as (server, endpoint):
+        client = SparqlClient(endpoint)
+        try:
+            # Decompressing the gzipped body is what makes the echo readable.
+            echoed = client.query("SELECT 1", "details")["results"]["bindings"]
+            if echoed != [{"query": {"value": "SELECT 1"}}]:
+                logger.error(f"Unexpected gzipped response: {echoed}")
+                return False
+
+            server.responses[:] = [429]
+            started = time.monotonic()
+            client.query("SELECT 2", "details")
+            waited = time.monotonic() - started
+            # Without Retry-After the first backoff is at most BACKOFF_BASE.
+            if waited < 2 or client.stats["retries"] != 1:
+                logger.error(f"429 was retried after {waited:.1f}s, not Retry-After")
+                return False
+
+            server.responses[:] = [400]
+            try:
+                client.query("SELECT 3", "details")
+                logger.error("A 400 response did not raise")
+                return False
+            except SparqlError as e:
+                if e.status != 400 or client.stats["retries"] != 1:
+                    logger.error(f"A 400 response was retried or misreported: {e}")
+                    return False
+
+            reconnects, limit = client.stats["reconnects"], client.concurrency.limit
+            time.sleep(2 * _SparqlHandler.timeout)
+            client.query("SELECT 4", "details")
+            if (
+                client.stats["reconnects"] != reconnects + 1
+                or client.concurrency.limit < limit
+            ):
+                logger.error(
+                    f"Dropped keep-alive connection: {client.stats}, limit "
+                    f"{limit:.1f} -> {client.concurrency.limit:.1f}"
+                )
+                return False
+        finally:
+            client.close()
+        logger.success(
+            "SPARQL client decompressed gzip, waited for Retry-After, raised on "
+            "400 and reconnected a dropped keep-alive connection"
+        )
+
+        requests = len(server.requests)
+        cache_file = str(tmp_dir / "sparql.sqlite")
+        client = SparqlClient(endpoint, cache=SparqlCache(cache_file))
+        try:
+            first = client.query("SELECT 5", "details")
+            cached = client.query("  SELECT   5 ", "details")
+        finally:
+            client.close()
+        if first != cached or len(server.requests) != requests + 1:
+            logger.error("A repeated query was not answered from the cache")
+            return False
+
+        server.responses[:] = [400]
+        expired = SparqlCache(cache_file, ttls={"details": -1})
+        client = SparqlClient(endpoint, cache=expired)
+        try:
+            stale = client.query("SELECT 5", "details")
+        finally:
+            client.close()
+        if stale != first or expired.stats["stale_hits"] != 1:
+            logger.error("A failed refresh did not fall back to the expired entry")
+            return False
+        logger.success("SPARQL cache answered repeats and fell back when stale")
+    return True
+
+
+if __name__ == "__main__":
+    logger = AppLogger()
+    logger.info("TEST: SPARQL fetching, enrichment and checkpoints")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = [
+            check_keyset_paging(logger),
+            check_enrichment_order(logger, Path(tmp_dir)),
+            check_checkpoint_resume(logger, Path(tmp_dir)),
+            check_sparql_client(logger, Path(tmp_dir)),
+        ]
+
+    logger.info(f"FETCHING CHECKS: {sum(results)}/{len(results)} passed")
+    sys.exit(0 if all(results) else 1)
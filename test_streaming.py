@@ -0,0 +1,140 @@
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+from neo4j import SummaryCounters
+from database.database_manager import DEFAULT_FETCH_SIZE, DatabaseManager
+from database.streaming import stream_dataset_batches
+from logging_utils.app_logger import AppLogger
+
+INITIAL_CSV = "data/datasets_publishers_themes.csv"
+ENRICHED_CSV = "data/enriched_datasets.csv"
+BATCH_SIZE = 1000
+SMALL_ROWS = 5_000
+LARGE_ROWS = 50_000
+# Ten times the rows may not need more than this much more peak memory.
+MAX_PEAK_GROWTH = 1.5
+
+
+class _FakeResult:
+    def __init__(self, nodes_created: int):
+        self.counters = SummaryCounters({"nodes-created": nodes_created})
+
+    def consume(self) -> "_FakeResult":
+        return self
+
+
+class _FakeTransaction:
+    """Accepts every statement and reports one Dataset node per streamed uri."""
+
+    def run(self, query: str, parameters: dict) -> _FakeResult:
+        created = len(parameters.get("uris", [])) if "MERGE (d:Dataset" in query else 0
+        return _FakeResult(created)
+
+
+class _FakeSession:
+    def __enter__(self) -> "_FakeSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def execute_write(self, work, *args):
+        return work(_FakeTransaction(), *args)
+
+
+class _FakeDriver:
+    def session(self, **kwargs) -> _FakeSession:
+        return _FakeSession()
+
+    def close(self) -> None:
+        pass
+
+
+def fake_database_manager() -> DatabaseManager:
+    """
+    A DatabaseManager around _FakeDriver. __post_init__ is skipped, since it would
+    try to connect to a real server and log the failure.
+    """
+    database_manager = object.__new__(DatabaseManager)
+    database_manager.uri = "neo4j://localhost:7687"
+    database_manager.username = "neo4j"
+    database_manager.password = "unused"
+    database_manager.database = None
+    database_manager.fetch_size = DEFAULT_FETCH_SIZE
+    database_manager.driver = _FakeDriver()
+    database_manager.logger = AppLogger()
+    return database_manager
+
+
+def write_synthetic_csvs(output_dir: Path, rows: int) -> tuple[str, str]:
+    """Repeat the bundled CSVs up to `rows` rows with unique dataset URIs."""
+    paths = []
+    for source in (INITIAL_CSV, ENRICHED_CSV):
+        df = pd.read_csv(source)
+        repeated = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).head(rows)
+        repeated["dataset"] = repeated["dataset"] + "/" + repeated.index.astype(str)
+        path = output_dir / Path(source).name
+        repeated.to_csv(path, index=False)
+        paths.append(str(path))
+    return paths[0], paths[1]
+
+
+def measure_streamed_load(
+    initial_csv: str, enriched_csv: str, batch_size: int = BATCH_SIZE
+) -> tuple[dict, int]:
+    """Stream the CSVs into a fake driver; returns the stats and peak traced bytes."""
+    database_manager = fake_database_manager()
+
+    tracemalloc.start()
+    try:
+        stats = database_manager.create_dataset_nodes_and_relationships_streamed(
+            stream_dataset_batches(initial_csv, enriched_csv, batch_size=batch_size)
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return stats, peak
+
+
+def check_stream_memory_ceiling() -> bool:
+    """
+    Stream SMALL_ROWS and LARGE_ROWS synthetic rows with the same BATCH_SIZE. The
+    peak memory of the stream mode must depend on the batch size, not on the
+    number of rows, so the larger load may only need MAX_PEAK_GROWTH times more.
+    """
+    logger = AppLogger()
+    peaks = {}
+
+    for rows in (SMALL_ROWS, LARGE_ROWS):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            initial_csv, enriched_csv = write_synthetic_csvs(Path(tmp_dir), rows)
+            stats, peaks[rows] = measure_streamed_load(initial_csv, enriched_csv)
+
+        logger.info(
+            f"Streamed {rows} rows in batches of {BATCH_SIZE}: "
+            f"{stats['datasets_created']} datasets, peak {peaks[rows] / 1e6:.1f} MB"
+        )
+        if stats["errors"] or stats["datasets_created"] != rows:
+            logger.error(f"Streamed load of {rows} rows failed: {stats['errors'][:3]}")
+            return False
+
+    growth = peaks[LARGE_ROWS] / peaks[SMALL_ROWS]
+    if growth > MAX_PEAK_GROWTH:
+        logger.error(
+            f"Peak memory grew {growth:.2f}x for {LARGE_ROWS // SMALL_ROWS}x the rows "
+            f"(allowed {MAX_PEAK_GROWTH}x)"
+        )
+        return False
+
+    logger.success(
+        f"Peak memory grew {growth:.2f}x for {LARGE_ROWS // SMALL_ROWS}x the rows"
+    )
+    return True
+
+
+if __name__ == "__main__":
+    logger = AppLogger()
+    logger.info("TEST: Stream mode memory ceiling")
+    sys.exit(0 if check_stream_memory_ceiling() else 1)
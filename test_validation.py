@@ -1,73 +1,176 @@
 import pandas as pd
 from database.database_manager import load_db_config
+from database.dataset_batch import DatasetBatch
+from database.fast_validation import record_validation_error, validate_dataset_records
+from database.interning import InternRegistry
 from database.models import Dataset, DatasetTitle, Publisher, Theme
+from database.normalization import NORMALIZED_COLUMNS, normalize_themes
+from database.parallel_validation import (
+    DEFAULT_VALIDATION_WORKERS,
+    validate_frame_in_processes,
+)
 from logging_utils.app_logger import AppLogger
 
 
-def load_and_validate_datasets(csv_path: str) -> tuple[list[Dataset], list[dict]]:
-    logger = AppLogger()
-    valid_datasets = []
+def _validate_frame_fast(
+    df: pd.DataFrame, logger: AppLogger, registry: InternRegistry
+) -> tuple[list[Dataset], list[dict]]:
+    records = [
+        {
+            "uri": uri,
+            "title": {"value": title},
+            "publisher": {"uri": publisher},
+            "themes": [{"uri": theme} for theme in themes],
+        }
+        for uri, title, publisher, themes in zip(
+            df["dataset"],
+            df["datasetTitle"],
+            df["publisher"],
+            normalize_themes(df["themes"]),
+        )
+    ]
+    datasets, record_errors = validate_dataset_records(records)
+
     errors = []
+    for position, dataset in enumerate(datasets):
+        row_num = df.index[position] + 2
+        if dataset is not None:
+            logger.debug(f"Row {row_num}: Successfully validated dataset")
+            continue
+
+        e = record_validation_error(record_errors[position])
+        logger.error(f"Row {row_num}: Value error - {e}")
+        errors.append(
+            {
+                "row": row_num,
+                "error_type": "ValueError",
+                "message": str(e),
+                "dataset_uri": df["dataset"].iloc[position],
+            }
+        )
+
+    return (
+        registry.intern_datasets(
+            dataset for dataset in datasets if dataset is not None
+        ),
+        errors,
+    )
+
+
+def _normalized_test_frame(df: pd.DataFrame) -> pd.DataFrame:
+    frame = pd.DataFrame(
+        {column: [None] * len(df) for column in NORMALIZED_COLUMNS},
+        index=df.index,
+        dtype=object,
+    )
+    frame["uri"] = df["dataset"].astype(object)
+    frame["title"] = df["datasetTitle"].astype(object)
+    frame["publisher"] = df["publisher"].astype(object)
+    frame["themes"] = normalize_themes(df["themes"])
+    return frame
+
+
+def validate_datasets_in_processes(
+    csv_path: str, workers: int = DEFAULT_VALIDATION_WORKERS
+) -> tuple[list[DatasetBatch], list[dict]]:
+    """
+    Parallel counterpart of load_and_validate_datasets: rows are validated in
+    `workers` processes and the valid ones come back as column batches, in row
+    order, with the same error records.
+    """
+    logger = AppLogger()
 
     try:
         df = pd.read_csv(csv_path)
         logger.info(f"Loaded {len(df)} rows from test CSV file")
 
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-            try:
-                theme_uris = [
-                    Theme(uri=theme.strip())
-                    for theme in str(row["themes"]).split("|")
-                    if theme.strip()
-                ]
-
-                dataset = Dataset(
-                    uri=row["dataset"],
-                    title=DatasetTitle(value=row["datasetTitle"]),
-                    publisher=Publisher(uri=row["publisher"]),
-                    themes=theme_uris,
-                )
-                valid_datasets.append(dataset)
-                logger.debug(f"Row {row_num}: Successfully validated dataset")
-
-            except AssertionError as e:
-                error_msg = f"Row {row_num}: Validation assertion failed - {e}"
-                logger.error(error_msg)
-                errors.append(
-                    {
-                        "row": row_num,
-                        "error_type": "AssertionError",
-                        "message": str(e),
-                        "dataset_uri": row.get("dataset", "N/A"),
-                    }
-                )
+        batches, errors = validate_frame_in_processes(
+            _normalized_test_frame(df), workers=workers
+        )
+        for error in errors:
+            logger.error(f"Row {error['row']}: Value error - {error['message']}")
 
-            except ValueError as e:
-                error_msg = f"Row {row_num}: Value error - {e}"
-                logger.error(error_msg)
-                errors.append(
-                    {
-                        "row": row_num,
-                        "error_type": "ValueError",
-                        "message": str(e),
-                        "dataset_uri": row.get("dataset", "N/A"),
-                    }
-                )
+        logger.success(
+            f"Validated {sum(map(len, batches))} datasets, "
+            f"encountered {len(errors)} errors using {workers} processes"
+        )
+        return batches, errors
 
-            except Exception as e:
-                error_msg = (
-                    f"Row {row_num}: Failed to parse dataset - {type(e).__name__}: {e}"
-                )
-                logger.error(error_msg)
-                errors.append(
-                    {
-                        "row": row_num,
-                        "error_type": type(e).__name__,
-                        "message": str(e),
-                        "dataset_uri": row.get("dataset", "N/A"),
-                    }
-                )
+    except Exception as e:
+        logger.error(f"Failed to load CSV file: {e}")
+        return [], [{"error_type": "CSV Load Error", "message": str(e)}]
+
+
+def load_and_validate_datasets(
+    csv_path: str,
+    fast_validation: bool = False,
+    registry: InternRegistry | None = None,
+) -> tuple[list[Dataset], list[dict]]:
+    logger = AppLogger()
+    registry = registry if registry is not None else InternRegistry()
+    valid_datasets = []
+    errors = []
+
+    try:
+        df = pd.read_csv(csv_path)
+        logger.info(f"Loaded {len(df)} rows from test CSV file")
+
+        if fast_validation:
+            valid_datasets, errors = _validate_frame_fast(df, logger, registry)
+        else:
+            for idx, row in df.iterrows():
+                row_num = idx + 2
+                try:
+                    theme_uris = [
+                        Theme(uri=theme.strip())
+                        for theme in str(row["themes"]).split("|")
+                        if theme.strip()
+                    ]
+
+                    dataset = Dataset(
+                        uri=row["dataset"],
+                        title=DatasetTitle(value=row["datasetTitle"]),
+                        publisher=Publisher(uri=row["publisher"]),
+                        themes=theme_uris,
+                    )
+                    valid_datasets.append(registry.intern_dataset(dataset))
+                    logger.debug(f"Row {row_num}: Successfully validated dataset")
+
+                except AssertionError as e:
+                    error_msg = f"Row {row_num}: Validation assertion failed - {e}"
+                    logger.error(error_msg)
+                    errors.append(
+                        {
+                            "row": row_num,
+                            "error_type": "AssertionError",
+                            "message": str(e),
+                            "dataset_uri": row.get("dataset", "N/A"),
+                        }
+                    )
+
+                except ValueError as e:
+                    error_msg = f"Row {row_num}: Value error - {e}"
+                    logger.error(error_msg)
+                    errors.append(
+                        {
+                            "row": row_num,
+                            "error_type": "ValueError",
+                            "message": str(e),
+                            "dataset_uri": row.get("dataset", "N/A"),
+                        }
+                    )
+
+                except Exception as e:
+                    error_msg = f"Row {row_num}: Failed to parse dataset - {type(e).__name__}: {e}"
+                    logger.error(error_msg)
+                    errors.append(
+                        {
+                            "row": row_num,
+                            "error_type": type(e).__name__,
+                            "message": str(e),
+                            "dataset_uri": row.get("dataset", "N/A"),
+                        }
+                    )
 
         logger.success(
             f"Validated {len(valid_datasets)} datasets, encountered {len(errors)} errors"